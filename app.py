@@ -2,7 +2,14 @@
 
 La descarga corre en un hilo aparte y comunica el progreso por una Queue.
 El hilo de Tk solo consume la cola vía `after`, así la ventana no se congela
-y el botón "Cancelar" puede detener el proceso en limpio.
+y el botón "Cancelar" puede detener el proceso en limpio. Además de un
+evento por URL terminada llegan eventos de bytes (ya coalescidos por el
+`Downloader`) para que la barra avance durante los videos largos.
+
+Con lotes de miles de URLs cada vuelta de la cola tiene un presupuesto de
+tiempo y aplica los cambios de golpe (una actualización de barra y estado
+por vuelta), la tabla de resultados solo pinta las filas visibles y el
+sondeo se espacia mientras no llega nada.
 """
 
 from __future__ import annotations
@@ -10,21 +17,132 @@ from __future__ import annotations
 import queue
 import sys
 import threading
+import time
 import tkinter as tk
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
-from typing import Optional
+from typing import Any, Optional, Sequence
 
 from bajador_yt import DownloadConfig, Downloader, __version__
 from bajador_yt.config import SUPPORTED_BROWSERS
 from bajador_yt.constants import AUDIO_FORMATS, MODES, QUALITY_LEVELS, VIDEO_FORMATS
 from bajador_yt.csv_utils import extract_links_from_text
 from bajador_yt.downloader import summarize
-from bajador_yt.ffmpeg_utils import detect_ffmpeg_path
+from bajador_yt.ffmpeg_utils import check_audio_encoder, ffmpeg_capabilities
 from bajador_yt.logger import get_logger, setup_logger
-from bajador_yt.models import DownloadResult
+from bajador_yt.models import ByteProgress, DownloadResult
+from bajador_yt.timing import human_bytes
+from bajador_yt.validators import dedupe_urls
 
 POLL_INTERVAL_MS = 100
+# Sin mensajes el sondeo se duplica hasta este tope; vuelve a 100 ms al llegar uno.
+MAX_POLL_INTERVAL_MS = 800
+# Tiempo máximo por vuelta de la cola; lo que sobre se procesa en la siguiente.
+DRAIN_BUDGET_S = 0.03
+
+
+class ResultTable:
+    """Treeview virtualizado: el modelo guarda todas las filas y solo se pintan las visibles.
+
+    Con miles de filas un Treeview con un item por fila se vuelve lento;
+    aquí tiene tantos items como caben en pantalla y al desplazarse se
+    reescriben sus valores. Mientras la vista esté al final sigue a las
+    filas nuevas. Por eso la selección se guarda como índice del modelo y
+    `render` la vuelve a poner en el item que muestra esa fila.
+    """
+
+    def __init__(self, parent: tk.Misc, columns: Sequence[tuple[str, int, str]]) -> None:
+        self.rows: list[tuple[str, ...]] = []
+        self.offset = 0
+        self.follow = True
+        self.capacity = 7
+        # Índice en `rows` de la fila seleccionada.
+        self.selected: Optional[int] = None
+        self._items: list[str] = []
+        # Selección que puso `render`; su <<TreeviewSelect>> no es un clic.
+        self._applied: tuple[str, ...] = ()
+        self.tree = ttk.Treeview(
+            parent, columns=[col for col, _, _ in columns], show='headings', height=self.capacity
+        )
+        for col, width, anchor in columns:
+            self.tree.heading(col, text=col.upper() if col == '#' else col.title())
+            self.tree.column(col, width=width, minwidth=30, anchor=anchor, stretch=(col == 'url'))
+        self.scrollbar = ttk.Scrollbar(parent, orient='vertical', command=self._on_scrollbar)
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll_to(self.offset - 3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_to(self.offset + 3))
+
+    def extend(self, rows: Sequence[tuple[str, ...]]) -> None:
+        if not rows:
+            return
+        self.rows.extend(rows)
+        if self.follow:
+            self.offset = self._last_offset()
+        self.render()
+
+    def clear(self) -> None:
+        self.rows = []
+        self.offset = 0
+        self.follow = True
+        self.selected = None
+        self.render()
+
+    def selection_changed(self) -> Optional[tuple[str, ...]]:
+        """Para <<TreeviewSelect>>: guarda qué fila del modelo eligió el
+        usuario y la devuelve (None si no hay ninguna)."""
+        current = self.tree.selection()
+        if current and current != self._applied and current[0] in self._items:
+            self.selected = self.offset + self._items.index(current[0])
+            self._applied = current
+        if self.selected is None or self.selected >= len(self.rows):
+            return None
+        return self.rows[self.selected]
+
+    def scroll_to(self, offset: int) -> None:
+        self.offset = max(0, min(offset, self._last_offset()))
+        self.follow = self.offset >= self._last_offset()
+        self.render()
+
+    def render(self) -> None:
+        visible = self.rows[self.offset:self.offset + self.capacity]
+        while len(self._items) < len(visible):
+            self._items.append(self.tree.insert('', tk.END))
+        while len(self._items) > len(visible):
+            self.tree.delete(self._items.pop())
+        for item, row in zip(self._items, visible):
+            self.tree.item(item, values=row)
+        slot = -1 if self.selected is None else self.selected - self.offset
+        wanted = (self._items[slot],) if 0 <= slot < len(self._items) else ()
+        if wanted != self.tree.selection():
+            self._applied = wanted
+            self.tree.selection_set(wanted)
+        total = len(self.rows) or 1
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.capacity) / total))
+
+    def _last_offset(self) -> int:
+        return max(0, len(self.rows) - self.capacity)
+
+    def _on_scrollbar(self, action: str, *args: Any) -> None:
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * len(self.rows)))
+        elif action == 'scroll':
+            step = self.capacity if args[1] == 'pages' else 1
+            self.scroll_to(self.offset + int(args[0]) * step)
+
+    def _on_wheel(self, event: tk.Event) -> None:
+        # Windows y macOS: múltiplos de ±120 (macOS da valores pequeños).
+        self.scroll_to(self.offset - (3 if event.delta > 0 else -3))
+
+    def _on_resize(self, event: tk.Event) -> None:
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        # Descuenta la fila de cabeceras.
+        capacity = max(1, event.height // row_height - 1)
+        if capacity != self.capacity:
+            self.capacity = capacity
+            if self.follow:
+                self.offset = self._last_offset()
+            self.render()
 
 
 class BajadorApp:
@@ -39,6 +157,12 @@ class BajadorApp:
         self.cancel_event = threading.Event()
         self.worker: Optional[threading.Thread] = None
         self.results: list[DownloadResult] = []
+        # Fracción descargada de cada URL en curso; se suma a la barra.
+        self.in_flight: dict[str, float] = {}
+        self.completed = 0
+        # Total del lote según el último callback: crece al expandir playlists.
+        self.total = 0
+        self.poll_interval = POLL_INTERVAL_MS
 
         self.log = get_logger('gui')
 
@@ -95,6 +219,12 @@ class BajadorApp:
             options_row,
             text='Thumbnail',
             variable=self.embed_thumbnail_var,
+        ).pack(side='left', padx=(0, 16))
+        self.resume_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            options_row,
+            text='Reanudar lote',
+            variable=self.resume_var,
         ).pack(side='left')
 
         format_row = tk.Frame(root)
@@ -181,7 +311,8 @@ class BajadorApp:
         ffmpeg_frame = tk.Frame(root)
         ffmpeg_frame.pack(padx=16, pady=(0, 12), fill='x')
         tk.Label(ffmpeg_frame, text='FFmpeg (opcional):').pack(side='left')
-        detected = detect_ffmpeg_path() or ''
+        ffmpeg = ffmpeg_capabilities()
+        detected = ffmpeg.ffmpeg if ffmpeg is not None else ''
         self.ffmpeg_path_var = tk.StringVar(value=detected)
         tk.Entry(ffmpeg_frame, textvariable=self.ffmpeg_path_var, width=52).pack(
             side='left', padx=(8, 6)
@@ -201,7 +332,7 @@ class BajadorApp:
         )
         self.cancel_button.pack(side='left')
 
-        self.progress_var = tk.IntVar(value=0)
+        self.progress_var = tk.DoubleVar(value=0)
         self.progress_bar = ttk.Progressbar(
             root, orient='horizontal', mode='determinate', length=720, variable=self.progress_var
         )
@@ -214,23 +345,15 @@ class BajadorApp:
         tree_frame = tk.Frame(results_frame)
         tree_frame.pack(fill='both', expand=True)
 
-        columns = ('#', 'url', 'status', 'message')
-        self.results_list = ttk.Treeview(
-            tree_frame, columns=columns, show='headings', height=7
-        )
-        for col, width, anchor in (
+        self.results_table = ResultTable(tree_frame, (
             ('#', 30, 'center'),
             ('url', 380, 'w'),
             ('status', 90, 'center'),
             ('message', 220, 'w'),
-        ):
-            self.results_list.heading(col, text=col.upper() if col == '#' else col.title())
-            self.results_list.column(col, width=width, minwidth=30, anchor=anchor, stretch=(col == 'url'))
-
-        scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.results_list.yview)
-        self.results_list.configure(yscrollcommand=scrollbar.set)
+        ))
+        self.results_list = self.results_table.tree
         self.results_list.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
+        self.results_table.scrollbar.pack(side='right', fill='y')
         self.results_list.bind('<<TreeviewSelect>>', self._on_row_select)
 
         detail_frame = tk.Frame(root)
@@ -304,8 +427,10 @@ class BajadorApp:
                 embed_thumbnail=bool(self.embed_thumbnail_var.get()),
                 cookies_from_browser=(self.cookies_browser_var.get().strip() or None),
                 cookies_file=(self.cookies_file_var.get().strip() or None),
+                resume=bool(self.resume_var.get()),
             )
             cfg.validate()
+            check_audio_encoder(cfg, ffmpeg_capabilities(cfg.ffmpeg_path))
             return cfg
         except Exception as exc:
             messagebox.showerror('Configuración inválida', str(exc))
@@ -322,19 +447,25 @@ class BajadorApp:
         if config is None:
             return
 
+        urls, duplicates = dedupe_urls(urls, allow_playlist=config.allow_playlist)
         Path(config.output_folder).mkdir(parents=True, exist_ok=True)
-        self.results_list.delete(*self.results_list.get_children())
+        self.results_table.clear()
         self.progress_bar.configure(maximum=len(urls))
         self.progress_var.set(0)
-        self.status_var.set(f'Descargando 0/{len(urls)}…')
+        skipped_note = f' ({duplicates} duplicadas descartadas)' if duplicates else ''
+        self.status_var.set(f'Descargando 0/{len(urls)}…{skipped_note}')
         self.cancel_event = threading.Event()
         self.download_button.configure(state='disabled')
         self.cancel_button.configure(state='normal')
         self.results = []
+        self.in_flight = {}
+        self.completed = 0
+        self.total = len(urls)
 
         downloader = Downloader(
             config,
             progress_callback=self._progress_callback,
+            byte_progress_callback=self._byte_progress_callback,
             cancel_event=self.cancel_event,
         )
 
@@ -344,10 +475,13 @@ class BajadorApp:
                 self.progress_queue.put(('done', results))
             except Exception as exc:
                 self.progress_queue.put(('crash', exc))
+            finally:
+                downloader.close()
 
         self.worker = threading.Thread(target=worker, daemon=True)
         self.worker.start()
-        self.root.after(POLL_INTERVAL_MS, self._drain_queue)
+        self.poll_interval = POLL_INTERVAL_MS
+        self.root.after(self.poll_interval, self._drain_queue)
 
     def _cancel_download(self) -> None:
         if not (self.worker and self.worker.is_alive()):
@@ -359,50 +493,95 @@ class BajadorApp:
     def _progress_callback(self, result: DownloadResult, index: int, total: int) -> None:
         self.progress_queue.put(('progress', (result, index, total)))
 
+    def _byte_progress_callback(self, progress: ByteProgress) -> None:
+        self.progress_queue.put(('bytes', progress))
+
     def _drain_queue(self) -> None:
+        """Procesa la cola hasta agotar el presupuesto y pinta una sola vez."""
+        deadline = time.perf_counter() + DRAIN_BUDGET_S
+        rows: list[tuple[str, ...]] = []
+        last: Optional[tuple[str, object]] = None
+        handled = 0
         try:
-            while True:
+            while time.perf_counter() < deadline:
                 kind, payload = self.progress_queue.get_nowait()
-                if kind == 'progress':
+                handled += 1
+                if kind == 'bytes':
+                    self.in_flight[payload.url] = payload.fraction or 0.0
+                    last = (kind, payload)
+                elif kind == 'progress':
                     result, index, total = payload
-                    self._append_result_row(index, result)
-                    self.progress_var.set(index)
-                    self.status_var.set(f'Procesado {index}/{total}: {result.status}')
+                    rows.append((str(index), result.url, result.status, result.message))
+                    self.in_flight.pop(result.url, None)
+                    self.completed = index
+                    self.total = total
+                    last = (kind, payload)
                 elif kind == 'done':
+                    self._render(rows, last)
                     self.results = list(payload)
                     self._finish_download()
                     return
                 elif kind == 'crash':
+                    self._render(rows, last)
                     messagebox.showerror('Error inesperado', str(payload))
                     self._finish_download()
                     return
         except queue.Empty:
             pass
-
-        if self.worker and self.worker.is_alive():
-            self.root.after(POLL_INTERVAL_MS, self._drain_queue)
+        self._render(rows, last)
+
+        backlog = not self.progress_queue.empty()
+        if backlog or (self.worker and self.worker.is_alive()):
+            if backlog:
+                # Se agotó el presupuesto: se cede a Tk y se sigue enseguida.
+                self.poll_interval = 1
+            elif handled:
+                self.poll_interval = POLL_INTERVAL_MS
+            else:
+                self.poll_interval = min(self.poll_interval * 2, MAX_POLL_INTERVAL_MS)
+            self.root.after(self.poll_interval, self._drain_queue)
         else:
             self._finish_download()
 
-    def _on_row_select(self, event: object = None) -> None:
-        selected = self.results_list.selection()
-        if not selected:
+    def _render(self, rows: list[tuple[str, ...]], last: Optional[tuple[str, object]]) -> None:
+        """Aplica de una vez las filas nuevas, la barra y el último estado."""
+        if last is None:
             return
-        values = self.results_list.item(selected[0], 'values')
-        if not values:
+        self.results_table.extend(rows)
+        if self.total != float(self.progress_bar.cget('maximum')):
+            self.progress_bar.configure(maximum=self.total)
+        self.progress_var.set(self.completed + sum(self.in_flight.values()))
+        kind, payload = last
+        if kind == 'bytes':
+            self.status_var.set(self._bytes_status(payload))
+        else:
+            result, index, total = payload
+            self.status_var.set(f'Procesado {index}/{total}: {result.status}')
+
+    def _bytes_status(self, progress: ByteProgress) -> str:
+        """Tamaño descargado, velocidad y ETA de la última descarga con progreso."""
+        parts = [human_bytes(progress.downloaded)]
+        if progress.fraction is not None:
+            parts[0] += f' ({progress.fraction:.0%})'
+        if progress.speed:
+            parts.append(f'{human_bytes(progress.speed)}/s')
+        if progress.eta is not None:
+            minutes, seconds = divmod(int(progress.eta), 60)
+            parts.append(f'ETA {minutes}:{seconds:02d}')
+        return f'Descargando {progress.url} — ' + ' · '.join(parts)
+
+    def _on_row_select(self, event: object = None) -> None:
+        # Los items del Treeview se reutilizan al desplazarse: la fila sale del modelo.
+        row = self.results_table.selection_changed()
+        if row is None:
             return
-        _, url, status, message = values
+        _, url, status, message = row
         text = f'URL: {url}\nEstado: {status}\nMensaje: {message}'
         self.detail_text.configure(state='normal')
         self.detail_text.delete('1.0', tk.END)
         self.detail_text.insert('1.0', text)
         self.detail_text.configure(state='disabled')
 
-    def _append_result_row(self, index: int, result: DownloadResult) -> None:
-        self.results_list.insert(
-            '', tk.END, values=(str(index), result.url, result.status, result.message)
-        )
-
     def _finish_download(self) -> None:
         self.download_button.configure(state='normal')
         self.cancel_button.configure(state='disabled')
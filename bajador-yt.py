@@ -2,31 +2,89 @@
 """CLI de Bajador YT.
 
 Carga configuración desde JSON, acepta overrides por argumentos, usa logging
-estructurado y muestra una barra de progreso con tqdm.
+estructurado y muestra con tqdm una barra de videos terminados y, debajo,
+una barra de bytes por worker.
+
+yt-dlp y tqdm se importan solo en las ramas que descargan: `--help` y
+`--validate-only` arrancan sin cargarlos (ver tests/test_startup.py).
 """
 
 from __future__ import annotations
 
 import argparse
+import itertools
 import sys
+import threading
 from pathlib import Path
-from typing import Optional
-
-from tqdm import tqdm
+from typing import Any, Iterator, Optional
 
-from bajador_yt import DownloadConfig, Downloader, load_config
-from bajador_yt.config import SUPPORTED_BROWSERS
-from bajador_yt.constants import AUDIO_FORMATS, MODES, QUALITY_LEVELS, VIDEO_FORMATS
-from bajador_yt.csv_utils import CsvFormatError, extract_links_from_csv
-from bajador_yt.downloader import summarize
+from bajador_yt import DownloadConfig, load_config
+from bajador_yt.archive import ArchiveIndex, archive_path_for
+from bajador_yt.config import SUPPORTED_BROWSERS, ConfigError
+from bajador_yt.constants import AUDIO_FORMATS, MODES, POSTPROCESS_BACKENDS, QUALITY_LEVELS, VIDEO_FORMATS
+from bajador_yt.csv_utils import CsvFormatError, iter_links_from_csv
+from bajador_yt.ffmpeg_utils import check_audio_encoder, ffmpeg_capabilities
 from bajador_yt.logger import get_logger, setup_logger
-from bajador_yt.validators import is_valid_youtube_url
+from bajador_yt.metacache import MetadataCache
+from bajador_yt.models import ByteProgress
+from bajador_yt.timing import format_performance, summarize_performance
+from bajador_yt.validators import UrlDeduper, is_valid_youtube_url
 
 EXIT_OK = 0
 EXIT_WITH_ERRORS = 1
 EXIT_BAD_USAGE = 2
 
 
+def parse_rate(value: str) -> int:
+    """Convierte '500K', '4M' o un entero en bytes por segundo."""
+    from yt_dlp.utils import parse_bytes
+
+    rate = parse_bytes(value)
+    if rate is None:
+        raise argparse.ArgumentTypeError(f'Ritmo no válido: {value!r} (usa p. ej. 500K o 4M).')
+    return rate
+
+
+class WorkerBars:
+    """Una barra tqdm de bytes por worker, bajo la barra de videos.
+
+    Cada worker reutiliza su línea: al empezar otro archivo la barra se
+    reinicia con el nuevo total. Los eventos llegan ya coalescidos desde
+    el `Downloader` (ver `byte_progress_interval`).
+    """
+
+    def __init__(self, tqdm_cls: Any) -> None:
+        self._tqdm = tqdm_cls
+        self._bars: dict[str, Any] = {}
+        self._files: dict[str, tuple[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, progress: ByteProgress) -> None:
+        with self._lock:
+            bar = self._bars.get(progress.worker)
+            if bar is None:
+                bar = self._tqdm(
+                    total=progress.total, position=len(self._bars) + 1, leave=False,
+                    unit='B', unit_scale=True, unit_divisor=1024,
+                )
+                self._bars[progress.worker] = bar
+            current = (progress.url, progress.filename)
+            if self._files.get(progress.worker) != current:
+                self._files[progress.worker] = current
+                bar.reset(total=progress.total)
+                name = Path(progress.filename).name if progress.filename else progress.url
+                bar.set_description_str(name[:32], refresh=False)
+            # El total estimado de los formatos fragmentados cambia en marcha.
+            bar.total = progress.total
+            bar.update(progress.downloaded - bar.n)
+
+    def close(self) -> None:
+        with self._lock:
+            for bar in self._bars.values():
+                bar.close()
+            self._bars.clear()
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog='bajador-yt',
@@ -43,6 +101,26 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument('--ffmpeg', dest='ffmpeg_path', help='Ruta al ejecutable de FFmpeg.')
     parser.add_argument('--parallel', dest='parallel_downloads', type=int,
                         help='Número de descargas en paralelo (>=1).')
+    parser.add_argument('--pipeline', action='store_true', default=None,
+                        help='Separa resolución, descarga y ffmpeg en etapas con pools propios.')
+    parser.add_argument('--resolve-workers', dest='resolve_workers', type=int,
+                        help='Workers de la etapa de metadatos (modo pipeline).')
+    parser.add_argument('--fetch-workers', dest='fetch_workers', type=int,
+                        help='Workers de la etapa de descarga (0 = --parallel).')
+    parser.add_argument('--postprocess-workers', dest='postprocess_workers', type=int,
+                        help='Workers de ffmpeg (0 = nº de CPUs).')
+    parser.add_argument('--postprocess-backend', dest='postprocess_backend',
+                        choices=sorted(POSTPROCESS_BACKENDS),
+                        help='Dónde corre ffmpeg: hilos o pool de procesos (process implica --pipeline).')
+    parser.add_argument('--requests-per-second', dest='requests_per_second', type=float,
+                        help='Tope de peticiones de metadatos por segundo entre todos los workers '
+                             '(se reduce solo ante HTTP 403; 0 = sin límite).')
+    parser.add_argument('--max-rate', dest='max_bytes_per_second', type=parse_rate,
+                        help='Ancho de banda total, p. ej. 500K o 4M (0 = sin límite).')
+    parser.add_argument('--connections', dest='connections_per_file', type=int,
+                        help='Conexiones HTTP por archivo (peticiones con Range en paralelo).')
+    parser.add_argument('--concurrent-streams', dest='concurrent_streams', action='store_true', default=None,
+                        help='En modo video, descarga video y audio a la vez en vez de uno tras otro.')
     parser.add_argument('--retries', dest='max_retries', type=int,
                         help='Reintentos por URL ante errores recuperables.')
     parser.add_argument('--retry-backoff', dest='retry_backoff', type=float,
@@ -67,53 +145,87 @@ def build_parser() -> argparse.ArgumentParser:
     )
     parser.add_argument('--cookies-file', dest='cookies_file',
                         help='Ruta a un cookies.txt exportado (formato Netscape).')
+    parser.add_argument('--archive-file', dest='archive_file',
+                        help='Índice de descargas (por defecto .bajador-archive.jsonl en la salida).')
+    parser.add_argument('--journal-file', dest='journal_file',
+                        help='Journal del lote (por defecto .bajador-journal.jsonl en la salida).')
+    parser.add_argument('--resume', action='store_true', default=None,
+                        help='Reanuda el último lote: salta las URLs ya terminadas según el journal.')
+    parser.add_argument('--sync', action='store_true', default=None,
+                        help='Sincroniza playlists/canales: solo descarga las entradas nuevas '
+                             'desde la última ejecución (implica --allow-playlist).')
+    parser.add_argument('--sync-state-file', dest='sync_state_file',
+                        help='Estado de sync (por defecto .bajador-sync.json en la salida).')
+    parser.add_argument('--rebuild-archive', action='store_true',
+                        help='Reconstruye el índice a partir de la carpeta de salida y termina.')
+    parser.add_argument('--serve', action='store_true',
+                        help='Arranca el servidor local de trabajos en vez de descargar y termina con Ctrl+C.')
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección de escucha de --serve.')
+    parser.add_argument('--port', type=int, default=8765, help='Puerto de --serve.')
+    parser.add_argument('--socket', dest='socket_path',
+                        help='Con --serve, escucha en este socket Unix en vez de TCP.')
+    parser.add_argument('--metrics-port', dest='metrics_port', type=int,
+                        help='Sirve métricas OpenMetrics en http://127.0.0.1:PUERTO/metrics.')
+    parser.add_argument('--metrics-file', dest='metrics_file',
+                        help='Reescribe las métricas en este archivo cada metrics_interval segundos.')
     parser.add_argument('--log-file', dest='log_file', help='Ruta del archivo de log.')
     parser.add_argument('--verbose', '-v', action='store_true', default=None,
                         help='Activa logging detallado (DEBUG).')
     parser.add_argument('--validate-only', action='store_true',
                         help='Solo valida las URLs sin descargar.')
+    parser.add_argument('--deep', action='store_true',
+                        help='Con --validate-only, comprueba además que cada video resuelve '
+                             '(usa la caché de metadatos si puede).')
+    parser.add_argument('--no-metadata-cache', dest='metadata_cache', action='store_false', default=None,
+                        help='No usa ni guarda la caché de metadatos de extract_info.')
     parser.add_argument('--no-progress', action='store_true',
                         help='Desactiva la barra tqdm (útil en CI o logs).')
     return parser
 
 
-def gather_urls(args: argparse.Namespace, config: DownloadConfig, log) -> Optional[list[str]]:
+def gather_urls(args: argparse.Namespace, config: DownloadConfig, log) -> Optional[Iterator[str]]:
     """Reúne URLs según prioridad: --urls > --csv > csv_file de config.
 
     Si el usuario pasa --urls, ignora el CSV por defecto; así se evita mezclar
-    URLs ad-hoc con la lista persistente.
+    URLs ad-hoc con la lista persistente. El CSV se lee en streaming: la
+    deduplicación la hace `download_many` según llegan las filas.
     """
-    urls: list[str] = []
-
     if args.urls:
-        urls.extend(args.urls)
-    elif args.csv:
+        return iter(args.urls)
+
+    csv_path: Optional[Path] = None
+    if args.csv:
         csv_path = Path(args.csv)
         if not csv_path.exists():
             log.error('El CSV indicado no existe: %s', csv_path)
             return None
-        try:
-            urls.extend(extract_links_from_csv(csv_path))
-        except CsvFormatError as exc:
-            log.error('%s', exc)
-            return None
-    elif config.csv_file:
+    elif config.csv_file and Path(config.csv_file).exists():
         csv_path = Path(config.csv_file)
-        if csv_path.exists():
-            try:
-                urls.extend(extract_links_from_csv(csv_path))
-            except CsvFormatError as exc:
-                log.error('%s', exc)
-                return None
-
-    # Eliminar duplicados conservando el orden.
-    seen: set[str] = set()
-    unique: list[str] = []
-    for u in urls:
-        if u and u not in seen:
-            seen.add(u)
-            unique.append(u)
-    return unique
+    if csv_path is None:
+        return iter(())
+
+    try:
+        return iter_links_from_csv(csv_path)
+    except CsvFormatError as exc:
+        log.error('%s', exc)
+        return None
+
+
+def rebuild_archive(config: DownloadConfig, log) -> int:
+    """Regenera el índice de descargas escaneando `output_folder`."""
+    if not Path(config.output_folder).is_dir():
+        log.error('La carpeta de salida no existe: %s', config.output_folder)
+        return EXIT_BAD_USAGE
+    ffmpeg = ffmpeg_capabilities(config.ffmpeg_path)
+    index = ArchiveIndex(archive_path_for(config))
+    # La caché de metadatos da el ID de los archivos con el nombre antiguo `Título.ext`.
+    titles = MetadataCache.for_config(config).titles() if config.metadata_cache else None
+    indexed, unmatched = index.rebuild(
+        config, ffprobe_path=ffmpeg.ffprobe if ffmpeg is not None else None, titles=titles,
+    )
+    log.info('Índice reconstruido en %s: %d archivos indexados, %d sin ID reconocible.',
+             index.path, indexed, unmatched)
+    return EXIT_OK
 
 
 def main(argv: Optional[list[str]] = None) -> int:
@@ -133,6 +245,15 @@ def main(argv: Optional[list[str]] = None) -> int:
         'video_format': args.video_format,
         'ffmpeg_path': args.ffmpeg_path,
         'parallel_downloads': args.parallel_downloads,
+        'pipeline': args.pipeline,
+        'resolve_workers': args.resolve_workers,
+        'fetch_workers': args.fetch_workers,
+        'postprocess_workers': args.postprocess_workers,
+        'postprocess_backend': args.postprocess_backend,
+        'requests_per_second': args.requests_per_second,
+        'max_bytes_per_second': args.max_bytes_per_second,
+        'connections_per_file': args.connections_per_file,
+        'concurrent_streams': args.concurrent_streams,
         'max_retries': args.max_retries,
         'retry_backoff': args.retry_backoff,
         'skip_existing': args.skip_existing,
@@ -141,9 +262,19 @@ def main(argv: Optional[list[str]] = None) -> int:
         'embed_thumbnail': args.embed_thumbnail,
         'cookies_from_browser': args.cookies_from_browser,
         'cookies_file': args.cookies_file,
+        'archive_file': args.archive_file,
+        'journal_file': args.journal_file,
+        'metadata_cache': args.metadata_cache,
+        'resume': args.resume,
+        'sync': args.sync,
+        'sync_state_file': args.sync_state_file,
+        'metrics_port': args.metrics_port,
+        'metrics_file': args.metrics_file,
         'log_file': args.log_file,
         'verbose': args.verbose,
     }
+    if args.sync and args.allow_playlist is None:
+        overrides['allow_playlist'] = True
     try:
         config = config.merged(overrides)
         config.validate()
@@ -154,36 +285,93 @@ def main(argv: Optional[list[str]] = None) -> int:
     setup_logger(verbose=config.verbose, log_file=config.log_file)
     log = get_logger()
 
+    if not args.validate_only and not args.rebuild_archive:
+        # Antes de descargar nada: un mp3 sin libmp3lame fallaría en cada URL.
+        try:
+            check_audio_encoder(config, ffmpeg_capabilities(config.ffmpeg_path))
+        except ConfigError as exc:
+            print(f'Configuración inválida: {exc}', file=sys.stderr)
+            return EXIT_BAD_USAGE
+
+    if args.rebuild_archive:
+        return rebuild_archive(config, log)
+
+    if args.serve:
+        from bajador_yt.server import serve
+
+        try:
+            serve(config, host=args.host, port=args.port, socket_path=args.socket_path)
+        except OSError as exc:
+            log.error('No se pudo arrancar el servidor: %s', exc)
+            return EXIT_BAD_USAGE
+        return EXIT_OK
+
     urls = gather_urls(args, config, log)
     if urls is None:
         return EXIT_BAD_USAGE
-    if not urls:
+    first = next(urls, None)
+    if first is None:
         log.error('No se proporcionaron URLs. Usa --urls o --csv.')
         return EXIT_BAD_USAGE
+    urls = itertools.chain((first,), urls)
 
     if args.validate_only:
-        bad = 0
-        for url in urls:
-            ok = is_valid_youtube_url(url)
-            print(f'{"OK " if ok else "NO "} {url}')
-            if not ok:
-                bad += 1
-        log.info('Validación completa. %d válidas, %d inválidas.', len(urls) - bad, bad)
+        deduper = UrlDeduper(allow_playlist=config.allow_playlist)
+        checked = bad = 0
+        prober = None
+        if args.deep:
+            from bajador_yt.downloader import Downloader
+
+            prober = Downloader(config)
+        try:
+            for url in deduper.filter(urls):
+                checked += 1
+                ok = is_valid_youtube_url(url)
+                detail = ''
+                if ok and prober is not None:
+                    probed = prober.probe(url)
+                    ok = probed.status == 'success'
+                    detail = f' — {probed.message}'
+                print(f'{"OK " if ok else "NO "} {url}{detail}')
+                if not ok:
+                    bad += 1
+        finally:
+            if prober is not None:
+                prober.close()
+        if deduper.duplicates:
+            log.info('Se descartaron %d URLs duplicadas (mismo video o playlist).', deduper.duplicates)
+        log.info('Validación completa. %d válidas, %d inválidas.', checked - bad, bad)
         return EXIT_OK if bad == 0 else EXIT_WITH_ERRORS
 
+    from tqdm import tqdm
+
+    from bajador_yt.downloader import Downloader, summarize
+
     pbar: Optional[tqdm] = None
+    bars: Optional[WorkerBars] = None
     if not args.no_progress:
-        pbar = tqdm(total=len(urls), desc='Descargando', unit='video', leave=True)
+        # El total se va conociendo según se lee la entrada.
+        pbar = tqdm(total=None, desc='Descargando', unit='video', leave=True)
+        bars = WorkerBars(tqdm)
 
     def progress(result, index, total):
         if pbar is not None:
+            if pbar.total != total:
+                pbar.total = total
             pbar.update(1)
             pbar.set_postfix_str(f'{result.status} · {result.url[:40]}')
 
-    downloader = Downloader(config, progress_callback=progress)
+    downloader = Downloader(
+        config,
+        progress_callback=progress,
+        byte_progress_callback=bars.update if bars is not None else None,
+    )
     try:
         results = downloader.download_many(urls)
     finally:
+        downloader.close()
+        if bars is not None:
+            bars.close()
         if pbar is not None:
             pbar.close()
 
@@ -197,6 +385,8 @@ def main(argv: Optional[list[str]] = None) -> int:
         summary['error'],
         summary['cancelled'],
     )
+    for line in format_performance(summarize_performance(results)):
+        log.info('%s', line)
     for r in results:
         if r.status in ('error', 'invalid'):
             log.warning('[%s] %s — %s', r.status, r.url, r.message)
@@ -1,15 +1,33 @@
-"""Bajador YT — descarga de audio y video desde YouTube."""
+"""Bajador YT — descarga de audio y video desde YouTube.
+
+`Downloader` y `AsyncDownloader` se cargan al primer acceso: importan yt-dlp,
+que es lo más lento del arranque, y validar URLs o leer la configuración no
+lo necesita.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
 
 from .config import DownloadConfig, load_config
 from .constants import AUDIO_FORMATS, MODES, QUALITY_LEVELS, VIDEO_FORMATS
-from .downloader import Downloader
 from .models import DownloadResult
 
+if TYPE_CHECKING:
+    from .aio import AsyncDownloader
+    from .downloader import Downloader
+
+_LAZY = {
+    'AsyncDownloader': '.aio',
+    'Downloader': '.downloader',
+}
+
 __all__ = [
     'AUDIO_FORMATS',
     'MODES',
     'QUALITY_LEVELS',
     'VIDEO_FORMATS',
+    'AsyncDownloader',
     'DownloadConfig',
     'DownloadResult',
     'Downloader',
@@ -17,3 +35,18 @@ __all__ = [
 ]
 
 __version__ = '2.0.0'
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,185 @@
+"""API asyncio sobre `Downloader`.
+
+yt-dlp es bloqueante, así que cada URL activa sigue ocupando un hilo; lo que
+cambia es que solo hay `parallel_downloads` hilos y las URLs pendientes no
+existen como tareas hasta que el semáforo deja sitio. Los resultados se
+producen como iterador asíncrono según terminan y la cancelación es la de
+asyncio: cancelar la tarea consumidora (o cerrar el iterador) detiene el lote.
+El backoff de los reintentos y las pausas del circuit breaker se esperan con
+`asyncio.sleep`, sin ocupar hilos; si el breaker aborta, se deja de leer la
+entrada.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
+
+from .config import DownloadConfig
+from .downloader import Batch, Downloader, ProgressCallback, RetryLater
+from .errors import classify_error
+from .models import DownloadResult
+from .progress import ByteProgressCallback
+
+UrlSource = Union[Iterable[str], AsyncIterable[str]]
+
+_DONE = object()
+
+
+class AsyncDownloader:
+    """Descargas concurrentes desde asyncio, sin `threading.Event`.
+
+    Uso::
+
+        async with AsyncDownloader(config) as downloader:
+            async for result in downloader.download_many(urls):
+                ...
+
+    Tras cancelar un lote la instancia queda cerrada, igual que `Downloader`.
+    Las playlists se expanden (y con `sync` solo entran las entradas nuevas)
+    igual que en `Downloader.download_many`. El modo pipeline no aplica: cada
+    URL pasa por `Downloader.admit` y `Downloader.download_attempt`.
+    """
+
+    def __init__(
+        self,
+        config: DownloadConfig,
+        *,
+        progress_callback: Optional[ProgressCallback] = None,
+        byte_progress_callback: Optional[ByteProgressCallback] = None,
+    ) -> None:
+        self._cancel = threading.Event()
+        self._downloader = Downloader(
+            config,
+            progress_callback=progress_callback,
+            byte_progress_callback=byte_progress_callback,
+            cancel_event=self._cancel,
+        )
+        self.config = self._downloader.config
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.parallel_downloads, thread_name_prefix='bajador-async',
+        )
+        self._limit = asyncio.Semaphore(config.parallel_downloads)
+
+    async def __aenter__(self) -> 'AsyncDownloader':
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Libera hilos e instancias de YoutubeDL sin bloquear el event loop."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        await asyncio.get_running_loop().run_in_executor(None, self._downloader.close)
+
+    async def download_one(self, url: str) -> DownloadResult:
+        """Descarga una URL; espera turno en el semáforo compartido."""
+        async with self._limit:
+            return await self._run(url)
+
+    async def download_many(self, urls: UrlSource) -> AsyncIterator[DownloadResult]:
+        """Produce un `DownloadResult` por URL única según van terminando.
+
+        Acepta iterables normales o asíncronos; se consumen a medida que hay
+        hueco, así una lista enorme no crea miles de tareas de golpe.
+        """
+        # Sin `total`: el progreso cuenta lo leído según llega (entrada en streaming).
+        batch = self._downloader.open_batch()
+        done: asyncio.Queue = asyncio.Queue()
+        try:
+            feeder = asyncio.create_task(self._feed(urls, batch, done))
+            try:
+                while True:
+                    result = await done.get()
+                    if result is _DONE:
+                        break
+                    yield result
+                await feeder
+            finally:
+                if not feeder.done():
+                    self._cancel.set()
+                    feeder.cancel()
+                    await asyncio.gather(feeder, return_exceptions=True)
+        finally:
+            batch.close()
+            if self._cancel.is_set():
+                # Como `Downloader.download_many`: al cancelar se sueltan
+                # cookies y conexiones de inmediato.
+                self._downloader.close()
+
+    async def _feed(self, urls: UrlSource, batch: Batch, done: asyncio.Queue) -> None:
+        tasks: set[asyncio.Task] = set()
+        loop = asyncio.get_running_loop()
+
+        async def run(url: str) -> None:
+            try:
+                await done.put(batch.emit(await self._run(url)))
+            finally:
+                self._limit.release()
+
+        try:
+            async for raw in _aiter(urls):
+                if raw and self._downloader.is_collection(raw):
+                    # Listar la playlist bloquea: fuera del event loop.
+                    items = await loop.run_in_executor(None, list, batch.expand([raw]))
+                else:
+                    items = list(batch.expand([raw]))
+                for item in items:
+                    if isinstance(item, DownloadResult):
+                        await done.put(item)  # ya emitido: reanudado o playlist fallida
+                        continue
+                    await self._limit.acquire()
+                    if self._downloader.stopped:
+                        self._limit.release()
+                        break
+                    task = asyncio.create_task(run(item))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if self._downloader.stopped:
+                    break
+            if tasks:
+                await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        await done.put(_DONE)
+
+    async def _run(self, url: str) -> DownloadResult:
+        loop = asyncio.get_running_loop()
+        attempt, waited = 1, 0.0
+        try:
+            while True:
+                wait = self._downloader.admit(url)
+                while wait:
+                    # Circuito abierto: se espera sin hacer peticiones.
+                    await asyncio.sleep(wait)
+                    wait = self._downloader.admit(url)
+                if wait is None:
+                    return self._downloader.stopped_result(url)
+                outcome = await loop.run_in_executor(
+                    self._executor, self._downloader.download_attempt, url, attempt, waited,
+                )
+                if not isinstance(outcome, RetryLater):
+                    return outcome
+                await asyncio.sleep(outcome.delay)
+                attempt, waited = outcome.attempt, outcome.delay
+        except asyncio.CancelledError:
+            self._cancel.set()
+            raise
+        except Exception as exc:  # pragma: no cover — download_attempt ya captura
+            return DownloadResult(
+                url=url, status='error', message=str(exc), category=classify_error(exc),
+            )
+
+
+async def _aiter(urls: UrlSource) -> AsyncIterator[str]:
+    if hasattr(urls, '__aiter__'):
+        async for url in urls:  # type: ignore[union-attr]
+            yield url
+    else:
+        for url in urls:  # type: ignore[union-attr]
+            yield url
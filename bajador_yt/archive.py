@@ -0,0 +1,169 @@
+"""Índice persistente de descargas para saltar URLs sin tocar la red.
+
+El índice es un JSONL append-only en la carpeta de salida: cada línea asocia
+una clave (ID de video + modo + formato + calidad) con el archivo generado.
+Se carga una sola vez por `Downloader`; las búsquedas son un dict + un stat.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterator, Mapping, Optional
+
+from .config import DownloadConfig
+from .logger import get_logger
+from .validators import extract_video_id
+
+ARCHIVE_FILENAME = '.bajador-archive.jsonl'
+
+_BRACKET_ID = re.compile(r'\[([A-Za-z0-9_-]{11})\]')
+_URL_IN_TEXT = re.compile(r'https?://[^\s"\'<>]+')
+
+
+def archive_key(video_id: str, config: DownloadConfig) -> str:
+    """Clave del índice: el mismo video en otro formato/calidad es otra entrada."""
+    if config.mode == 'audio':
+        return f'{video_id}:audio:{config.audio_format}:{config.audio_quality}'
+    return f'{video_id}:video:{config.video_format}:best'
+
+
+def archive_path_for(config: DownloadConfig) -> Path:
+    if config.archive_file:
+        return Path(config.archive_file)
+    return Path(config.output_folder) / ARCHIVE_FILENAME
+
+
+class ArchiveIndex:
+    """Mapa clave → ruta respaldado por un JSONL append-only.
+
+    Las líneas corruptas (p. ej. una escritura cortada por un crash) se
+    ignoran al cargar; la última entrada de una clave gana.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._entries: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._log = get_logger('archive')
+
+    @classmethod
+    def for_config(cls, config: DownloadConfig) -> 'ArchiveIndex':
+        return cls(archive_path_for(config)).load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def load(self) -> 'ArchiveIndex':
+        self._entries.clear()
+        if not self.path.exists():
+            return self
+        with self.path.open(encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                    self._entries[record['key']] = record['path']
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return self
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Devuelve la ruta registrada si el archivo sigue existiendo."""
+        path = self._entries.get(key)
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def add(self, key: str, path: str) -> None:
+        with self._lock:
+            if self._entries.get(key) == path:
+                return
+            self._entries[key] = path
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open('a', encoding='utf-8') as handle:
+                handle.write(json.dumps({'key': key, 'path': path}, ensure_ascii=False) + '\n')
+
+    def rebuild(
+        self,
+        config: DownloadConfig,
+        *,
+        ffprobe_path: Optional[str] = None,
+        titles: Optional[Mapping[str, str]] = None,
+    ) -> tuple[int, int]:
+        """Reconstruye el índice escaneando `output_folder`.
+
+        El ID se recupera del nombre (`Título [ID].ext`), de `titles` (ID →
+        título, p. ej. de la caché de metadatos) para los nombres antiguos
+        `Título.ext`, o de las etiquetas que escribe `write_metadata` (leídas
+        con ffprobe si está disponible). Devuelve (indexados, sin ID
+        reconocible). Reemplaza el archivo de forma atómica.
+        """
+        ext = config.audio_format if config.mode == 'audio' else config.video_format
+        legacy = _legacy_names(titles) if titles else {}
+        entries: dict[str, str] = {}
+        unmatched = 0
+        for media in _iter_media_files(Path(config.output_folder), ext):
+            video_id = _video_id_from_name(media.name) or legacy.get(media.stem)
+            if video_id is None and ffprobe_path:
+                video_id = _video_id_from_tags(media, ffprobe_path)
+            if video_id is None:
+                unmatched += 1
+                self._log.debug('Sin ID reconocible: %s', media)
+                continue
+            entries[archive_key(video_id, config)] = str(media)
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with tmp.open('w', encoding='utf-8') as handle:
+                for key, path in entries.items():
+                    handle.write(json.dumps({'key': key, 'path': path}, ensure_ascii=False) + '\n')
+            os.replace(tmp, self.path)
+            self._entries = entries
+        return len(entries), unmatched
+
+
+def _iter_media_files(folder: Path, ext: str) -> Iterator[Path]:
+    if not folder.is_dir():
+        return
+    suffix = f'.{ext}'
+    for entry in sorted(folder.iterdir()):
+        if entry.is_file() and entry.suffix.lower() == suffix:
+            yield entry
+
+
+def _video_id_from_name(name: str) -> Optional[str]:
+    match = _BRACKET_ID.search(name)
+    return match.group(1) if match else None
+
+
+def _legacy_names(titles: Mapping[str, str]) -> dict[str, str]:
+    """Nombre sin extensión que daba `%(title)s.%(ext)s` → ID."""
+    from yt_dlp.utils import sanitize_filename
+
+    # Mismo saneado que yt-dlp con `restrictfilenames` (ver `_build_ydl_opts`).
+    return {sanitize_filename(title, restricted=True): video_id for video_id, title in titles.items()}
+
+
+def _video_id_from_tags(media: Path, ffprobe_path: str) -> Optional[str]:
+    try:
+        proc = subprocess.run(
+            [ffprobe_path, '-v', 'quiet', '-print_format', 'json', '-show_format', str(media)],
+            capture_output=True, text=True, timeout=30, check=False,
+        )
+        tags = json.loads(proc.stdout or '{}').get('format', {}).get('tags', {})
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+    for value in tags.values():
+        for url in _URL_IN_TEXT.findall(str(value)):
+            video_id = extract_video_id(url)
+            if video_id:
+                return video_id
+    return None
@@ -0,0 +1,175 @@
+"""Circuit breaker de lote: deja de enviar URLs cuando casi todo falla igual.
+
+Cuando YouTube responde 403 (o la red cae) a todas las peticiones, seguir
+recorriendo el lote solo alarga la espera y empeora el bloqueo. El breaker
+mira la mezcla de categorías de `classify_error` en los últimos intentos:
+
+- Si los fallos de red/403 dominan la ventana, se abre: `download_many` no
+  envía trabajo durante `cooldown` segundos. Después deja pasar una única
+  URL de sonda; si sale bien se cierra, y si vuelve a fallar igual se abre
+  de nuevo con el doble de espera.
+- Si se repite un fallo del entorno (sin runtime de JS, cookies bloqueadas),
+  todas las URLs fallarían igual: el lote se aborta. El postprocesado también
+  falla por URL (stream corrupto, fusión fallida), así que solo aborta si
+  falla varias veces seguidas, sin ningún otro resultado entre medias.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Optional
+
+from .logger import get_logger
+
+#: Categorías que pausan el envío: el problema es pasajero y afecta a todo.
+PAUSE_CATEGORIES = frozenset({'forbidden', 'network', 'timeout'})
+#: Categorías que abortan el lote: ninguna URL saldrá bien hasta arreglar el entorno.
+ABORT_CATEGORIES = frozenset({'js_runtime', 'cookie_locked'})
+#: Abortan solo si se repiten seguidas: también hay fallos propios de una URL.
+STREAK_ABORT_CATEGORIES = frozenset({'postprocessing'})
+
+
+class CircuitBreaker:
+    """Estado `closed` → `open` → `half_open` (una sonda) → `closed`, o abortado."""
+
+    def __init__(
+        self,
+        window: int = 20,
+        *,
+        trip_ratio: float = 0.8,
+        fatal_after: int = 3,
+        cooldown: float = 60.0,
+        max_cooldown: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if window < 1:
+            raise ValueError('window debe ser >= 1.')
+        self.window = window
+        self.trip_ratio = trip_ratio
+        self.min_samples = max(1, window // 2)
+        self.fatal_after = fatal_after
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._log = get_logger('breaker')
+        self.reset()
+
+    def reset(self) -> None:
+        """Vuelve a `closed` con la ventana vacía (al empezar un lote)."""
+        with self._lock:
+            self._outcomes: deque[Optional[str]] = deque(maxlen=self.window)
+            self.state = 'closed'
+            self.aborted: Optional[str] = None
+            self._cooldown = self.base_cooldown
+            self._until = 0.0
+            self._probe: Optional[str] = None
+            self._streak: tuple[Optional[str], int] = (None, 0)
+
+    def record(self, category: Optional[str]) -> None:
+        """Anota el resultado de un intento (`None` = éxito)."""
+        with self._lock:
+            if self.aborted is not None:
+                return
+            self._outcomes.append(category)
+            last, streak = self._streak
+            self._streak = (category, streak + 1 if category == last else 1)
+            if category in ABORT_CATEGORIES:
+                failures = self._outcomes.count(category)
+            elif category in STREAK_ABORT_CATEGORIES:
+                failures = self._streak[1]
+            else:
+                failures = 0
+            if failures >= self.fatal_after:
+                self.aborted = category
+                self._log.error(
+                    'Se aborta el lote: %d intentos recientes fallaron por %s; '
+                    'las URLs restantes fallarían igual.', failures, category,
+                )
+                return
+            if self.state == 'half_open':
+                if category is None:
+                    self._close()
+                elif category in PAUSE_CATEGORIES:
+                    self._open(min(self.max_cooldown, self._cooldown * 2))
+                else:
+                    # Un fallo propio de la URL no dice nada del bloqueo: otra sonda.
+                    self._probe = None
+                return
+            if self.state == 'closed' and self._tripped():
+                self._open(self._cooldown)
+
+    def ready(self) -> bool:
+        """¿Se puede enviar una URL ahora? No cambia el estado."""
+        with self._lock:
+            return self._ready()
+
+    def admit(self, url: str) -> None:
+        """Marca el envío de `url`; con el circuito medio abierto es la sonda."""
+        with self._lock:
+            self._admit(url)
+
+    def try_admit(self, url: str) -> bool:
+        """`ready()` + `admit(url)` de una vez, para cuando envían varios hilos:
+        con el circuito medio abierto solo uno se lleva la sonda."""
+        with self._lock:
+            if not self._ready():
+                return False
+            self._admit(url)
+            return True
+
+    def release(self, url: str) -> None:
+        """La URL terminó; si era la sonda y no hizo ninguna petición
+        (p. ej. ya estaba en el índice), se deja pasar otra."""
+        with self._lock:
+            if self.state == 'half_open' and self._probe == url:
+                self._probe = None
+
+    def retry_in(self) -> Optional[float]:
+        """Segundos hasta que termine la pausa, o None si no hay pausa que esperar."""
+        with self._lock:
+            if self.state != 'open' or self.aborted is not None:
+                return None
+            return max(0.0, self._until - self._clock())
+
+    def _ready(self) -> bool:
+        if self.aborted is not None:
+            return False
+        if self.state == 'open':
+            return self._clock() >= self._until
+        return not (self.state == 'half_open' and self._probe is not None)
+
+    def _admit(self, url: str) -> None:
+        if self.state == 'open' and self._clock() >= self._until:
+            self.state = 'half_open'
+            self._log.info('Circuito medio abierto: se prueba con %s.', url)
+        if self.state == 'half_open':
+            self._probe = url
+
+    def _tripped(self) -> bool:
+        if len(self._outcomes) < self.min_samples:
+            return False
+        failures = sum(1 for category in self._outcomes if category in PAUSE_CATEGORIES)
+        return failures >= self.trip_ratio * len(self._outcomes)
+
+    def _open(self, cooldown: float) -> None:
+        mix = Counter(category for category in self._outcomes if category is not None)
+        self._log.warning(
+            'Circuito abierto: %s en los últimos %d intentos; se pausa el envío %.0f s.',
+            ', '.join(f'{category}×{count}' for category, count in mix.most_common()),
+            len(self._outcomes), cooldown,
+        )
+        self.state = 'open'
+        self._cooldown = cooldown
+        self._until = self._clock() + cooldown
+        self._probe = None
+        self._outcomes.clear()
+
+    def _close(self) -> None:
+        self._log.info('La sonda salió bien: circuito cerrado, se reanuda el lote.')
+        self.state = 'closed'
+        self._cooldown = self.base_cooldown
+        self._probe = None
+        self._outcomes.clear()
@@ -7,7 +7,7 @@ from dataclasses import asdict, dataclass, fields, replace
 from pathlib import Path
 from typing import Any, Optional
 
-from .constants import AUDIO_FORMATS, MODES, QUALITY_LEVELS, VIDEO_FORMATS
+from .constants import AUDIO_FORMATS, MODES, POSTPROCESS_BACKENDS, QUALITY_LEVELS, VIDEO_FORMATS
 
 SUPPORTED_BROWSERS: frozenset[str] = frozenset(
     {'chrome', 'firefox', 'edge', 'brave', 'opera', 'vivaldi', 'chromium', 'safari'}
@@ -33,13 +33,37 @@ class DownloadConfig:
     allow_playlist: bool = False
     max_retries: int = 3
     retry_backoff: float = 2.0
+    breaker_window: int = 20
+    breaker_cooldown: float = 60.0
     parallel_downloads: int = 1
+    pipeline: bool = False
+    resolve_workers: int = 2
+    fetch_workers: int = 0
+    postprocess_workers: int = 0
+    postprocess_backend: str = 'thread'
+    requests_per_second: float = 0.0
+    max_bytes_per_second: int = 0
+    connections_per_file: int = 1
+    concurrent_streams: bool = False
     log_file: Optional[str] = None
     verbose: bool = False
     write_metadata: bool = False
     embed_thumbnail: bool = False
     cookies_from_browser: Optional[str] = None
     cookies_file: Optional[str] = None
+    archive_file: Optional[str] = None
+    journal_file: Optional[str] = None
+    metadata_cache: bool = True
+    metadata_cache_dir: Optional[str] = None
+    metadata_format_ttl: int = 3 * 3600
+    metadata_info_ttl: int = 7 * 24 * 3600
+    metadata_cache_max_mb: int = 256
+    resume: bool = False
+    sync: bool = False
+    sync_state_file: Optional[str] = None
+    metrics_port: int = 0
+    metrics_file: Optional[str] = None
+    metrics_interval: float = 15.0
 
     def merged(self, overrides: dict[str, Any]) -> 'DownloadConfig':
         """Devuelve una nueva instancia con los overrides aplicados."""
@@ -67,8 +91,35 @@ class DownloadConfig:
             raise ConfigError('max_retries debe ser >= 1.')
         if self.retry_backoff <= 0:
             raise ConfigError('retry_backoff debe ser > 0.')
+        if self.breaker_window < 0:
+            raise ConfigError('breaker_window debe ser >= 0 (0 = sin circuit breaker).')
+        if self.breaker_cooldown <= 0:
+            raise ConfigError('breaker_cooldown debe ser > 0.')
         if self.parallel_downloads < 1:
             raise ConfigError('parallel_downloads debe ser >= 1.')
+        if self.resolve_workers < 1:
+            raise ConfigError('resolve_workers debe ser >= 1.')
+        if self.fetch_workers < 0 or self.postprocess_workers < 0:
+            raise ConfigError('fetch_workers y postprocess_workers deben ser >= 0 (0 = automático).')
+        if self.requests_per_second < 0 or self.max_bytes_per_second < 0:
+            raise ConfigError('requests_per_second y max_bytes_per_second deben ser >= 0 (0 = sin límite).')
+        if self.connections_per_file < 1:
+            raise ConfigError('connections_per_file debe ser >= 1.')
+        if self.metadata_format_ttl < 0 or self.metadata_info_ttl < 0:
+            raise ConfigError('metadata_format_ttl y metadata_info_ttl deben ser >= 0.')
+        if self.metadata_cache_max_mb < 1:
+            raise ConfigError('metadata_cache_max_mb debe ser >= 1.')
+        if not 0 <= self.metrics_port <= 65535:
+            raise ConfigError('metrics_port debe estar entre 0 y 65535 (0 = sin endpoint).')
+        if self.metrics_interval <= 0:
+            raise ConfigError('metrics_interval debe ser > 0.')
+        if self.sync and not self.allow_playlist:
+            raise ConfigError('sync necesita allow_playlist: sincroniza playlists y canales.')
+        if self.postprocess_backend not in POSTPROCESS_BACKENDS:
+            raise ConfigError(
+                f"postprocess_backend debe ser uno de {sorted(POSTPROCESS_BACKENDS)}; "
+                f"recibido: {self.postprocess_backend!r}"
+            )
         if self.cookies_from_browser is not None and self.cookies_from_browser not in SUPPORTED_BROWSERS:
             raise ConfigError(
                 f"cookies_from_browser debe ser uno de {sorted(SUPPORTED_BROWSERS)} "
@@ -4,6 +4,7 @@ AUDIO_FORMATS: frozenset[str] = frozenset({'mp3', 'm4a', 'opus', 'wav'})
 VIDEO_FORMATS: frozenset[str] = frozenset({'mp4', 'mkv', 'webm'})
 QUALITY_LEVELS: frozenset[str] = frozenset({'128', '192', '256', '320'})
 MODES: frozenset[str] = frozenset({'audio', 'video'})
+POSTPROCESS_BACKENDS: frozenset[str] = frozenset({'thread', 'process'})
 
 DOWNLOAD_STATUSES: frozenset[str] = frozenset(
     {'success', 'skipped', 'invalid', 'error', 'cancelled'}
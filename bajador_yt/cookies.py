@@ -0,0 +1,104 @@
+"""Cookie jar compartido por todos los YoutubeDL de un `Downloader`.
+
+yt-dlp carga las cookies la primera vez que cada instancia de YoutubeDL las
+necesita: con `cookies_from_browser` eso significa copiar y descifrar la base
+de datos del navegador por cada worker (y de nuevo al recrear los pools), lo
+que es lento y falla con `cookie_locked` mientras Chrome la tiene abierta.
+Aquí se cargan una vez y todas las instancias comparten el mismo jar
+(`http.cookiejar` es thread-safe). Solo se vuelve a leer el navegador tras un
+`login_required`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import yt_dlp
+from yt_dlp.cookies import CookieLoadError, YoutubeDLCookieJar, load_cookies
+
+from .config import DownloadConfig
+from .logger import get_logger
+
+CookieLoader = Callable[[Optional[str], Optional[tuple[str, ...]], Any], YoutubeDLCookieJar]
+
+
+class SharedCookieJar:
+    """Carga perezosa y única de `cookies_from_browser`/`cookies_file`."""
+
+    #: Segundos mínimos entre dos recargas: una ola de `login_required` en
+    #: varios workers a la vez solo relee el navegador una vez.
+    min_refresh_interval = 30.0
+
+    def __init__(
+        self,
+        browser: Optional[str],
+        cookie_file: Optional[str],
+        *,
+        loader: CookieLoader = load_cookies,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.browser = browser
+        self.cookie_file = cookie_file
+        self._loader = loader
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jar: Optional[YoutubeDLCookieJar] = None
+        self._loaded_at = 0.0
+        self.loads = 0
+        self._log = get_logger('cookies')
+
+    @classmethod
+    def for_config(cls, config: DownloadConfig) -> Optional['SharedCookieJar']:
+        if not config.cookies_from_browser and not config.cookies_file:
+            return None
+        return cls(config.cookies_from_browser, config.cookies_file)
+
+    def jar(self) -> YoutubeDLCookieJar:
+        """El jar compartido; la primera llamada lo carga."""
+        with self._lock:
+            if self._jar is None:
+                self._jar = self._load()
+            return self._jar
+
+    def new_ydl(self, opts: dict[str, Any]) -> yt_dlp.YoutubeDL:
+        """Construye un YoutubeDL que usa el jar compartido en vez de cargar el suyo."""
+        # El jar se carga antes: si falla no queda una instancia a medio
+        # crear cuyo close() intentaría cargar y guardar cookies.
+        jar = self.jar()
+        ydl = yt_dlp.YoutubeDL(opts)
+        # `YoutubeDL.cookiejar` es un cached_property: con el valor ya en el
+        # __dict__ de la instancia, yt-dlp nunca llama a load_cookies.
+        ydl.__dict__['cookiejar'] = jar
+        return ydl
+
+    def refresh(self) -> bool:
+        """Relee las cookies (tras un `login_required`) sobre el mismo jar,
+        para que las instancias ya creadas vean las nuevas. Devuelve False
+        si la última carga es demasiado reciente."""
+        with self._lock:
+            if self._jar is None or self._clock() - self._loaded_at < self.min_refresh_interval:
+                return False
+            fresh = self._load()
+            self._jar.clear()
+            for cookie in fresh:
+                self._jar.set_cookie(cookie)
+            self._log.info('Cookies recargadas tras un error de inicio de sesión.')
+            return True
+
+    def _load(self) -> YoutubeDLCookieJar:
+        spec = (self.browser,) if self.browser else None
+        try:
+            jar = self._loader(self.cookie_file, spec, None)
+        except CookieLoadError as error:
+            # Igual que YoutubeDL.cookiejar: el fallo llega como DownloadError
+            # con el mensaje original, que `classify_error` reconoce.
+            cause = error.__context__ or error
+            raise yt_dlp.utils.DownloadError(
+                f'ERROR: {cause}', (type(cause), cause, cause.__traceback__),
+            ) from cause
+        self._loaded_at = self._clock()
+        self.loads += 1
+        self._log.debug('Cookies cargadas (%d) de %s.', len(jar), self.browser or self.cookie_file)
+        return jar
@@ -4,27 +4,49 @@ from __future__ import annotations
 
 import csv
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 
 
 class CsvFormatError(ValueError):
     """El CSV no contiene la columna esperada."""
 
 
-def extract_links_from_csv(csv_file: str | Path) -> List[str]:
-    """Lee un CSV con columna 'link' y devuelve las URLs no vacías.
+def iter_links_from_csv(csv_file: str | Path) -> Iterator[str]:
+    """Como `extract_links_from_csv` pero fila a fila, sin cargar el archivo.
 
-    Lanza CsvFormatError si falta la columna 'link' para que el usuario
-    reciba feedback claro en vez de una lista vacía silenciosa.
+    La cabecera se valida al llamar (no al iterar), así CsvFormatError llega
+    antes de empezar a descargar. El archivo se cierra al agotar o cerrar el
+    iterador.
     """
     path = Path(csv_file)
-    with path.open(newline='', encoding='utf-8') as handle:
+    handle = path.open(newline='', encoding='utf-8')
+    try:
         reader = csv.DictReader(handle)
         if reader.fieldnames is None or 'link' not in reader.fieldnames:
             raise CsvFormatError(
                 f"El CSV '{path}' debe tener una columna 'link' en la cabecera."
             )
-        return [row['link'].strip() for row in reader if row.get('link') and row['link'].strip()]
+    except BaseException:
+        handle.close()
+        raise
+    return _iter_link_rows(reader, handle)
+
+
+def _iter_link_rows(reader: csv.DictReader, handle) -> Iterator[str]:
+    with handle:
+        for row in reader:
+            link = row.get('link')
+            if link and link.strip():
+                yield link.strip()
+
+
+def extract_links_from_csv(csv_file: str | Path) -> List[str]:
+    """Lee un CSV con columna 'link' y devuelve las URLs no vacías.
+
+    Lanza CsvFormatError si falta la columna 'link' para que el usuario
+    reciba feedback claro en vez de una lista vacía silenciosa.
+    """
+    return list(iter_links_from_csv(csv_file))
 
 
 def extract_links_from_text(urls_text: str) -> List[str]:
@@ -5,54 +5,343 @@ from __future__ import annotations
 import os
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import urllib.request
+from collections.abc import Sized
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
-from typing import Any, Callable, Iterable, List, Optional
+from typing import Any, Callable, Iterable, Iterator, List, Optional
 
 import yt_dlp
 
+from . import postprocess, rangefetch
+from .archive import ArchiveIndex, archive_key
+from .breaker import CircuitBreaker
 from .config import DownloadConfig
-from .errors import classify_error, is_retryable, user_friendly_message
-from .ffmpeg_utils import detect_ffmpeg_path, validate_ffmpeg_path
+from .cookies import SharedCookieJar
+from .errors import classify_error, is_retryable, needs_fresh_formats, retry_delay, user_friendly_message
+from .ffmpeg_utils import check_audio_encoder, ffmpeg_capabilities, validate_ffmpeg_path
+from .journal import BatchJournal, is_finished
 from .logger import get_logger
+from .metacache import MetadataCache
+from .metrics import DownloaderMetrics, MetricsExporter
 from .models import DownloadResult
-from .validators import is_valid_youtube_url
+from .pipeline import Stage, StagedPipeline
+from .progress import ByteProgressCallback, ProgressGate, byte_progress
+from .ratelimit import AdaptiveRateLimiter, TokenBucket
+from .retryqueue import RetryQueue
+from .syncstate import SyncState
+from .timing import UrlTimer
+from .validators import (
+    UrlDeduper,
+    canonical_youtube_url,
+    dedupe_urls,
+    extract_playlist_id,
+    extract_video_id,
+    is_valid_youtube_url,
+)
 
 ProgressCallback = Callable[[DownloadResult, int, int], None]
 
+#: Nombre de los archivos descargados. El `[ID]` permite que
+#: `ArchiveIndex.rebuild` reconozca el video sin metadatos ni red.
+OUTPUT_TEMPLATE = '%(title)s [%(id)s].%(ext)s'
+#: Nombre de versiones anteriores; el skip sigue reconociéndolo para no
+#: volver a descargar una biblioteca ya existente.
+LEGACY_OUTPUT_TEMPLATE = '%(title)s.%(ext)s'
+
+
+class _YoutubeDLPool:
+    """Instancias de YoutubeDL de larga vida, prestadas en exclusiva.
+
+    Construir un YoutubeDL recarga extractores, relee el cookie jar y crea
+    un pool HTTP nuevo; aquí se crean bajo demanda (como mucho una por hilo
+    concurrente) y se reutilizan entre URLs y reintentos. YoutubeDL no es
+    thread-safe, así que cada instancia la usa un solo hilo a la vez.
+    """
+
+    def __init__(self, factory: Callable[[], yt_dlp.YoutubeDL]) -> None:
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._idle: list[yt_dlp.YoutubeDL] = []
+        self._generation = 0
+        self.created = 0
+
+    @contextmanager
+    def lease(self) -> Iterator[yt_dlp.YoutubeDL]:
+        with self._lock:
+            ydl = self._idle.pop() if self._idle else None
+            generation = self._generation
+        if ydl is None:
+            ydl = self._factory()
+            with self._lock:
+                self.created += 1
+        try:
+            yield ydl
+        finally:
+            with self._lock:
+                keep = generation == self._generation
+                if keep:
+                    self._idle.append(ydl)
+            if not keep:
+                _close_quietly(ydl)
+
+    def close(self) -> None:
+        """Cierra las instancias libres; las prestadas se cierran al devolverse."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._generation += 1
+        for ydl in idle:
+            _close_quietly(ydl)
+
+
+def _close_quietly(ydl: yt_dlp.YoutubeDL) -> None:
+    try:
+        ydl.close()
+    except Exception:  # pragma: no cover — cierre best-effort
+        pass
+
+
+class Batch:
+    """Un lote de URLs abierto con `Downloader.open_batch`.
+
+    Reúne lo que comparten `download_many`, `AsyncDownloader` y el modo
+    servidor: `expand` filtra duplicados, sustituye cada playlist por sus
+    entradas (con `sync`, solo las nuevas) y reemite lo que el journal ya da
+    por terminado; `emit` anota cada resultado (métricas, estado de sync,
+    journal) y llama a `progress_callback` con su índice en el lote.
+
+    Con una entrada de tamaño conocido (`total`) el progreso es exacto; con
+    un iterador (CSV en streaming) el total es lo leído hasta ahora y va
+    creciendo. Se cierra con `close()` o usándolo como context manager.
+    """
+
+    def __init__(
+        self,
+        downloader: 'Downloader',
+        *,
+        total: Optional[int] = None,
+        journal: Optional[BatchJournal] = None,
+        replayed: Optional[dict[str, DownloadResult]] = None,
+    ) -> None:
+        self.deduper = UrlDeduper(allow_playlist=downloader.config.allow_playlist)
+        self.read = 0
+        self.emitted = 0
+        self.exhausted = False
+        self._downloader = downloader
+        self._total = total
+        self._journal = journal
+        self._replayed = replayed or {}
+        # Entrada → ID de su playlist, hasta que se emite su resultado.
+        self._playlist_of: dict[str, str] = {}
+        # ID de playlist → URL de la colección con la que se guarda en el estado de sync.
+        self._collection_of: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> 'Batch':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def expand(self, urls: Iterable[str]) -> Iterator[str | DownloadResult]:
+        """URLs listas para descargar, o resultados ya emitidos.
+
+        Los resultados son entradas que el journal da por terminadas y
+        playlists que no se pudieron listar. Listar una playlist hace
+        peticiones: desde asyncio hay que consumirlo en un executor. Se
+        puede llamar varias veces sobre el mismo lote.
+        """
+        self.exhausted = False
+        for item in self._downloader._expand_playlists(self.deduper.filter(urls), self):
+            self.read += 1
+            done = self._replayed.get(item) if isinstance(item, str) else None
+            yield item if done is None else self.emit(done, record=False)
+        self.exhausted = True
+
+    def emit(self, result: DownloadResult, *, record: bool = True) -> DownloadResult:
+        """Anota y notifica un resultado; lo devuelve etiquetado con su
+        playlist y sus tiempos. Con `record=False` no se escribe en el journal."""
+        playlist_id = self._playlist_of.pop(result.url, None)
+        if playlist_id is not None and result.playlist_id is None:
+            result = replace(result, playlist_id=playlist_id)
+        collection = self._collection_of.get(result.playlist_id) if result.playlist_id else None
+        result = self._downloader._observe(result, collection=collection)
+        # Los resultados llegan de varios hilos; el lock mantiene los índices consecutivos.
+        with self._lock:
+            self.emitted += 1
+            index = self.emitted
+            total = self.total(index)
+            if record and self._journal is not None:
+                self._journal.record(result)
+            self._downloader._notify(result, index, total)
+        return result
+
+    def total(self, index: int) -> int:
+        if self._total is not None:
+            return self._total
+        return max(self.read, index)
+
+    def unread(self) -> Optional[int]:
+        """URLs que quedan sin leer; None si la entrada no tiene tamaño conocido."""
+        if self.exhausted:
+            return 0
+        if self._total is not None:
+            return max(0, self._total - self.read)
+        return None
+
+    def close(self) -> None:
+        """Cierra el journal y guarda el estado de sync."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._downloader._batches_lock:
+            self._downloader._open_batches -= 1
+        if self._journal is not None:
+            self._journal.close()
+        if self._downloader._sync_state is not None:
+            self._downloader._sync_state.save()
+
 
 class Downloader:
     """Envuelve yt-dlp con reintentos, skip, threading y callback de progreso."""
 
+    #: Tareas en vuelo por worker en modo paralelo: lo justo para que ningún
+    #: hilo espere a que se lea la siguiente URL.
+    inflight_per_worker = 2
+    #: En modo sync, entradas conocidas seguidas tras las que se deja de
+    #: listar un feed ordenado de más nuevo a más viejo.
+    sync_stop_after = 10
+    #: Segundos mínimos entre dos `ByteProgress` del mismo archivo.
+    byte_progress_interval = 0.25
+
     def __init__(
         self,
         config: DownloadConfig,
         *,
         progress_callback: Optional[ProgressCallback] = None,
+        byte_progress_callback: Optional[ByteProgressCallback] = None,
         cancel_event: Optional[threading.Event] = None,
     ) -> None:
         config.validate()
         self.config = config
         self.progress_callback = progress_callback
+        self.byte_progress_callback = byte_progress_callback
+        self._byte_gate = ProgressGate(self.byte_progress_interval)
         self.cancel_event = cancel_event
         self._log = get_logger('downloader')
-        self._ffmpeg_path = (
-            validate_ffmpeg_path(config.ffmpeg_path) or detect_ffmpeg_path()
-        )
-        if config.ffmpeg_path and not self._ffmpeg_path:
+        # Ruta, versión y encoders se sondean una vez por proceso (y se
+        # guardan en disco por mtime del binario).
+        self._ffmpeg = ffmpeg_capabilities(config.ffmpeg_path)
+        self._ffmpeg_path = self._ffmpeg.ffmpeg if self._ffmpeg is not None else None
+        if config.ffmpeg_path and not validate_ffmpeg_path(config.ffmpeg_path):
             self._log.warning(
                 "FFmpeg configurado en %s no existe; usando detección automática.",
                 config.ffmpeg_path,
             )
+        check_audio_encoder(config, self._ffmpeg)
+        # El índice se carga una vez: en re-ejecuciones la mayoría de URLs se
+        # resuelven aquí sin construir ningún YoutubeDL.
+        self._archive: Optional[ArchiveIndex] = (
+            ArchiveIndex.for_config(config) if config.skip_existing else None
+        )
+        # Reintentos y re-ejecuciones reutilizan el info dict en vez de
+        # volver a llamar a extract_info.
+        self._metacache: Optional[MetadataCache] = (
+            MetadataCache.for_config(config) if config.metadata_cache else None
+        )
+        # Límites globales: todos los workers (y ambos pools) comparten bucket.
+        self._request_limiter: Optional[AdaptiveRateLimiter] = (
+            AdaptiveRateLimiter(config.requests_per_second) if config.requests_per_second else None
+        )
+        # Pausa o aborta el lote cuando casi todo falla por la misma causa;
+        # `_run_batch` lo reinicia al empezar cada lote.
+        self._breaker: Optional[CircuitBreaker] = (
+            CircuitBreaker(config.breaker_window, cooldown=config.breaker_cooldown)
+            if config.breaker_window else None
+        )
+        self._byte_bucket: Optional[TokenBucket] = (
+            TokenBucket(config.max_bytes_per_second) if config.max_bytes_per_second else None
+        )
+        self._hook_bytes: dict[str, int] = {}
+        self._progress_bytes: dict[str, int] = {}
+        self._hook_lock = threading.Lock()
+        # Tiempos por URL; los hooks de yt-dlp encuentran el suyo por la URL
+        # que el hilo tiene en curso (ver `_with_retries`).
+        self._timers: dict[str, UrlTimer] = {}
+        self._timers_lock = threading.Lock()
+        self._local = threading.local()
+        # Las cookies del navegador se descifran una vez y las comparten todos los pools.
+        self._cookies = SharedCookieJar.for_config(config)
+        self._ydl_pool = _YoutubeDLPool(lambda: self._new_ydl(self._build_ydl_opts()))
+        # En modo pipeline la descarga se hace sin postprocessors; ffmpeg
+        # corre después en su propia etapa con el pool completo.
+        self._fetch_pool = _YoutubeDLPool(
+            lambda: self._new_ydl(self._build_ydl_opts(postprocess=False))
+        )
+        # Listado plano de playlists/canales: solo IDs, sin resolver formatos.
+        self._flat_pool = _YoutubeDLPool(lambda: self._new_ydl(self._build_flat_opts()))
+        self._sync_state: Optional[SyncState] = (
+            SyncState.for_config(config) if config.sync else None
+        )
+        self._pp_executor: Optional[ProcessPoolExecutor] = None
+        self._pp_lock = threading.Lock()
+        # Lote de `download_many` en curso (los de `open_batch` van por su cuenta).
+        self._batch: Optional[Batch] = None
+        self._open_batches = 0
+        self._batches_lock = threading.Lock()
+        self.metrics = DownloaderMetrics()
+        self.metrics.gauge('downloads_in_flight', 'URLs con trabajo de red en curso.', self._in_flight)
+        self.metrics.gauge('queue_depth', 'URLs leídas del lote que aún no han empezado.', self._queue_depth)
+        if self._request_limiter is not None:
+            limiter = self._request_limiter
+            self.metrics.gauge('request_rate', 'Peticiones por segundo permitidas ahora.', lambda: limiter.rate)
+        if self._breaker is not None:
+            breaker = self._breaker
+            self.metrics.gauge(
+                'breaker_open', 'Circuit breaker del lote abierto o probando (1) o cerrado (0).',
+                lambda: int(breaker.state != 'closed'),
+            )
+        self._exporter: Optional[MetricsExporter] = None
+        if config.metrics_port or config.metrics_file:
+            self._exporter = MetricsExporter(
+                self.metrics,
+                port=config.metrics_port,
+                path=config.metrics_file,
+                interval=config.metrics_interval,
+            )
+
+    def __enter__(self) -> 'Downloader':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Libera las instancias de YoutubeDL (cookies, conexiones HTTP) y el journal."""
+        if self._batch is not None:
+            self._batch.close()
+        self._ydl_pool.close()
+        self._fetch_pool.close()
+        self._flat_pool.close()
+        with self._pp_lock:
+            executor, self._pp_executor = self._pp_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if self._exporter is not None:
+            self._exporter.close()
 
     # ------------------------------------------------------------------ helpers
 
     def _cancelled(self) -> bool:
         return bool(self.cancel_event and self.cancel_event.is_set())
 
-    def _build_ydl_opts(self) -> dict[str, Any]:
+    def _build_ydl_opts(self, *, postprocess: bool = True) -> dict[str, Any]:
         cfg = self.config
-        out_template = str(Path(cfg.output_folder) / '%(title)s.%(ext)s')
+        out_template = str(Path(cfg.output_folder) / OUTPUT_TEMPLATE)
         opts: dict[str, Any] = {
             'format': 'bestaudio/best' if cfg.mode == 'audio' else 'bestvideo+bestaudio/best',
             'outtmpl': out_template,
@@ -65,6 +354,8 @@ class Downloader:
             'no_warnings': not cfg.verbose,
             'ignoreerrors': False,
             'socket_timeout': 30,
+            # Formatos fragmentados (DASH/HLS): varios fragmentos a la vez.
+            'concurrent_fragment_downloads': cfg.connections_per_file,
         }
 
         postprocessors: list[dict[str, Any]] = []
@@ -83,11 +374,13 @@ class Downloader:
             opts['writethumbnail'] = True
             postprocessors.append({'key': 'EmbedThumbnail'})
 
-        if postprocessors:
+        if postprocessors and postprocess:
             opts['postprocessors'] = postprocessors
 
         if self._ffmpeg_path:
             opts['ffmpeg_location'] = self._ffmpeg_path
+        opts['progress_hooks'] = self._progress_hooks()
+        opts['postprocessor_hooks'] = [self._track_postprocess]
 
         if cfg.cookies_from_browser:
             # yt-dlp espera una tupla (browser, profile, keyring, container).
@@ -97,6 +390,34 @@ class Downloader:
 
         return opts
 
+    def _new_ydl(self, opts: dict[str, Any]) -> yt_dlp.YoutubeDL:
+        if self._cookies is None:
+            return yt_dlp.YoutubeDL(opts)
+        return self._cookies.new_ydl(opts)
+
+    def _refresh_cookies(self) -> None:
+        """Tras un `login_required`, las siguientes URLs usan cookies recién leídas."""
+        if self._cookies is None:
+            return
+        try:
+            self._cookies.refresh()
+        except yt_dlp.utils.DownloadError as exc:
+            self._log.warning('No se pudieron recargar las cookies: %s', exc)
+
+    def _progress_hooks(self) -> list[Callable[[dict[str, Any]], None]]:
+        hooks = [self._track_progress]
+        if self._byte_bucket is not None:
+            hooks.append(self._throttle_bytes)
+        return hooks
+
+    def _build_flat_opts(self) -> dict[str, Any]:
+        opts = self._build_ydl_opts(postprocess=False)
+        opts.pop('progress_hooks', None)
+        opts.pop('postprocessor_hooks', None)
+        opts['extract_flat'] = 'in_playlist'
+        opts['noplaylist'] = False
+        return opts
+
     def _expected_output(self, ydl: yt_dlp.YoutubeDL, info: dict[str, Any]) -> Optional[str]:
         try:
             path = ydl.prepare_filename(info)
@@ -106,6 +427,22 @@ class Downloader:
         ext = self.config.audio_format if self.config.mode == 'audio' else self.config.video_format
         return f'{base}.{ext}'
 
+    @staticmethod
+    def _existing_output(info: dict[str, Any], expected: Optional[str]) -> Optional[str]:
+        """Archivo ya descargado de `info`: `expected` o, si no existe, el
+        mismo nombre sin ` [ID]` (`LEGACY_OUTPUT_TEMPLATE`)."""
+        if not expected:
+            return None
+        if Path(expected).exists():
+            return expected
+        base, ext = os.path.splitext(expected)
+        suffix = f" [{info.get('id')}]"
+        if info.get('id') and base.endswith(suffix):
+            legacy = base[:-len(suffix)] + ext
+            if Path(legacy).exists():
+                return legacy
+        return None
+
     def _validate_url_params(self, url: str) -> Optional[DownloadResult]:
         url = url.strip()
         if not url:
@@ -114,85 +451,164 @@ class Downloader:
             return DownloadResult(url=url, status='invalid', message='URL no válida.')
         return None
 
-    # ------------------------------------------------------------------ public
+    def _archive_lookup(self, url: str) -> Optional[DownloadResult]:
+        if self._archive is None:
+            return None
+        video_id = extract_video_id(url)
+        if video_id is None:
+            return None
+        path = self._archive.lookup(archive_key(video_id, self.config))
+        if path is None:
+            return None
+        return DownloadResult(
+            url=url,
+            status='skipped',
+            message='El archivo ya existe (índice local).',
+            output_path=path,
+        )
 
-    def download_one(self, url: str) -> DownloadResult:
-        """Descarga una única URL aplicando reintentos con backoff exponencial."""
-        url = url.strip()
+    def _archive_record(self, info: dict[str, Any], path: Optional[str]) -> None:
+        if self._archive is None or not path or not info.get('id'):
+            return
+        try:
+            self._archive.add(archive_key(info['id'], self.config), path)
+        except OSError:
+            self._log.warning('No se pudo actualizar el índice %s.', self._archive.path)
+
+    def _throttle_request(self) -> None:
+        if self._request_limiter is not None:
+            self._sleep_interruptible(self._request_limiter.reserve())
+
+    def _track_progress(self, status: dict[str, Any]) -> None:
+        """Progress hook de yt-dlp: bytes en vivo para las métricas y por URL."""
+        delta = self._byte_delta(self._progress_bytes, status)
+        if delta > 0:
+            self.metrics.add_bytes(delta)
+        timer = self._current_timer()
+        if timer is not None and status.get('status') == 'finished':
+            # Sin `downloaded_bytes` el archivo ya existía y no se transfirió nada.
+            timer.add_bytes(status.get('downloaded_bytes') or 0)
+        if self.byte_progress_callback is not None:
+            self._report_bytes(status)
+
+    def _report_bytes(self, status: dict[str, Any]) -> None:
+        """Reenvía el progreso en bytes, como mucho cada `byte_progress_interval`."""
+        url = getattr(self._local, 'url', None)
+        if url is None:
+            return
+        key = status.get('tmpfilename') or status.get('filename') or url
+        if not self._byte_gate.due(key, final=status.get('status') != 'downloading'):
+            return
+        progress = byte_progress(url, status, worker=getattr(self._local, 'worker', None))
+        if progress is None or self.byte_progress_callback is None:
+            return
+        try:
+            self.byte_progress_callback(progress)
+        except Exception:
+            self._log.exception('Error en byte_progress_callback; se ignora.')
+
+    def _track_postprocess(self, status: dict[str, Any]) -> None:
+        """Postprocessor hook de yt-dlp: mide cada postprocessor."""
+        timer = self._current_timer()
+        if timer is None:
+            return
+        if status.get('status') == 'started':
+            timer.start('postprocess')
+        elif status.get('status') == 'finished':
+            timer.stop('postprocess')
+
+    def _throttle_bytes(self, status: dict[str, Any]) -> None:
+        """Progress hook de yt-dlp: frena el hilo que descarga según el bucket global."""
+        delta = self._byte_delta(self._hook_bytes, status)
+        if delta > 0 and self._byte_bucket is not None:
+            self._sleep_interruptible(self._byte_bucket.reserve(delta))
+
+    def _byte_delta(self, seen: dict[str, int], status: dict[str, Any]) -> int:
+        """Bytes nuevos de un archivo desde el hook anterior (`seen` por archivo)."""
+        key = status.get('tmpfilename') or status.get('filename') or ''
+        state = status.get('status')
+        with self._hook_lock:
+            if state not in ('downloading', 'finished'):
+                seen.pop(key, None)
+                return 0
+            # Un 'finished' sin bytes es un archivo que ya existía.
+            downloaded = status.get('downloaded_bytes') or seen.get(key, 0)
+            delta = downloaded - seen.get(key, 0)
+            if state == 'finished':
+                seen.pop(key, None)
+            else:
+                seen[key] = downloaded
+            return delta
+
+    def _precheck(self, url: str) -> Optional[DownloadResult]:
+        """Validación, cancelación e índice: todo lo que no necesita red."""
         invalid = self._validate_url_params(url)
         if invalid is not None:
             return invalid
-
         if self._cancelled():
             return DownloadResult(url=url, status='cancelled', message='Cancelado por el usuario.')
-
+        archived = self._archive_lookup(url)
+        if archived is not None:
+            return archived
         Path(self.config.output_folder).mkdir(parents=True, exist_ok=True)
-        opts = self._build_ydl_opts()
+        return None
+
+    def _with_retries(
+        self,
+        url: str,
+        step: Callable[[yt_dlp.YoutubeDL], Any],
+        pool: Optional[_YoutubeDLPool] = None,
+    ) -> Any:
+        """Ejecuta `step` con un YoutubeDL prestado, reintentando con backoff.
 
+        Devuelve lo que devuelva `step` o un DownloadResult de error/cancelación.
+        """
+        pool = pool or self._ydl_pool
+        timer = self._timer(url)
+        self._local.url = url
+        try:
+            return self._attempts(url, step, pool, timer)
+        finally:
+            self._local.url = None
+
+    def _attempts(
+        self, url: str, step: Callable[[yt_dlp.YoutubeDL], Any], pool: _YoutubeDLPool, timer: UrlTimer,
+    ) -> Any:
         last_exc: Optional[BaseException] = None
         last_category = 'generic'
-        for attempt in range(1, self.config.max_retries + 1):
+        first = getattr(self._local, 'attempt', 1)
+        for attempt in range(first, self.config.max_retries + 1):
             if self._cancelled():
                 return DownloadResult(url=url, status='cancelled', message='Cancelado por el usuario.')
 
+            timer.attempt(attempt)
             try:
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    if info is None:
-                        return DownloadResult(
-                            url=url,
-                            status='error',
-                            message='No se pudo obtener información del video.',
-                            category='extractor',
-                        )
-
-                    if info.get('_type') == 'playlist':
-                        if not self.config.allow_playlist:
-                            return DownloadResult(
-                                url=url,
-                                status='invalid',
-                                message='La URL es una playlist y "Permitir playlists" está desactivado.',
-                            )
-                        ydl.process_ie_result(info, download=True)
-                        entries = info.get('entries') or []
-                        return DownloadResult(
-                            url=url,
-                            status='success',
-                            message=f'Playlist descargada ({sum(1 for _ in entries)} elementos).',
-                        )
-
-                    expected = self._expected_output(ydl, info)
-                    if (
-                        self.config.skip_existing
-                        and expected
-                        and Path(expected).exists()
-                    ):
-                        return DownloadResult(
-                            url=url,
-                            status='skipped',
-                            message='El archivo ya existe.',
-                            output_path=expected,
-                        )
-
-                    ydl.process_ie_result(info, download=True)
-                    final_path = expected if expected and Path(expected).exists() else None
-                    return DownloadResult(
-                        url=url,
-                        status='success',
-                        message='Descarga completada.',
-                        output_path=final_path,
-                    )
+                with pool.lease() as ydl:
+                    outcome = step(ydl)
+                self._record_request(None)
+                return outcome
             except yt_dlp.utils.DownloadError as exc:
                 last_exc = exc
                 last_category = classify_error(exc)
+                self._record_request(last_category)
+                # Puede que el fallo venga de URLs de formato caducadas.
+                self._forget_metadata(url)
+                if last_category == 'login_required':
+                    self._refresh_cookies()
+                if self._cancelled():
+                    return DownloadResult(url=url, status='cancelled', message='Cancelado por el usuario.')
                 if not is_retryable(last_category) or attempt >= self.config.max_retries:
                     break
-                wait = self.config.retry_backoff ** attempt
+                self.metrics.retry(last_category)
+                delay = retry_delay(last_category, attempt, self.config.retry_backoff)
                 self._log.warning(
                     'Fallo %s (categoría=%s) en %s; reintento %d/%d en %.1fs.',
-                    exc, last_category, url, attempt, self.config.max_retries, wait,
+                    exc, last_category, url, attempt, self.config.max_retries, delay,
                 )
-                self._sleep_interruptible(wait)
+                if getattr(self._local, 'defer', False):
+                    raise RetryLater(attempt + 1, delay)
+                with timer.phase('wait'):
+                    self._sleep_interruptible(delay)
             except Exception as exc:  # pragma: no cover — red de seguridad
                 last_exc = exc
                 last_category = classify_error(exc)
@@ -205,47 +621,790 @@ class Downloader:
             category=last_category,
         )
 
-    def download_many(self, urls: Iterable[str]) -> List[DownloadResult]:
-        """Descarga varias URLs, usando threading si parallel_downloads > 1."""
-        url_list = [u for u in (x.strip() for x in urls) if u]
-        total = len(url_list)
-        if total == 0:
+    def download_attempt(self, url: str, attempt: int = 1, waited: float = 0.0) -> DownloadResult | RetryLater:
+        """`download_one` sin dormir el backoff: un fallo recuperable vuelve
+        como `RetryLater` para que quien planifica lo encole y el hilo siga
+        con otra URL. `waited` es el backoff ya esperado (tiempos por fase).
+
+        Se llama tras `admit(url)`; al terminar, la URL deja de contar como
+        sonda del circuit breaker.
+        """
+        if waited:
+            self._timer(url).add('wait', waited)
+        self._local.attempt, self._local.defer = attempt, True
+        try:
+            return self.download_one(url)
+        except RetryLater as retry:
+            return retry
+        finally:
+            self._local.attempt, self._local.defer = 1, False
+            if self._breaker is not None:
+                self._breaker.release(url)
+
+    def _timer(self, url: str) -> UrlTimer:
+        with self._timers_lock:
+            timer = self._timers.get(url)
+            if timer is None:
+                timer = self._timers[url] = UrlTimer()
+            return timer
+
+    def _current_timer(self) -> Optional[UrlTimer]:
+        url = getattr(self._local, 'url', None)
+        if url is None:
+            return None
+        with self._timers_lock:
+            return self._timers.get(url)
+
+    def _pop_timer(self, url: str) -> Optional[UrlTimer]:
+        with self._timers_lock:
+            return self._timers.pop(url, None)
+
+    def _in_flight(self) -> int:
+        with self._timers_lock:
+            return len(self._timers)
+
+    def _queue_depth(self) -> int:
+        batch = self._batch
+        if batch is None:
+            return 0
+        return max(0, batch.read - batch.emitted - self._in_flight())
+
+    def _record_request(self, category: Optional[str]) -> None:
+        if self._request_limiter is not None:
+            self._request_limiter.record(category)
+        if self._breaker is not None:
+            self._breaker.record(category)
+
+    def _cached_metadata(self, video_id: Optional[str], *, formats: bool) -> Optional[dict[str, Any]]:
+        if self._metacache is None or video_id is None:
+            return None
+        return self._metacache.get(video_id, formats=formats)
+
+    def _forget_metadata(self, url: str) -> None:
+        video_id = extract_video_id(url)
+        if self._metacache is not None and video_id is not None:
+            self._metacache.discard(video_id)
+
+    def _extract_info(self, ydl: yt_dlp.YoutubeDL, url: str, video_id: Optional[str]) -> Any:
+        with self._timer(url).phase('resolve'):
+            self._throttle_request()
+            info = ydl.extract_info(url, download=False)
+        if (
+            self._metacache is not None
+            and video_id is not None
+            and info is not None
+            and info.get('_type') != 'playlist'
+        ):
+            self._metacache.put(video_id, ydl.sanitize_info(info, remove_private_keys=True))
+        return info
+
+    def _resolve_with(self, ydl: yt_dlp.YoutubeDL, url: str) -> Any:
+        """extract_info (o caché) + comprobaciones previas a la descarga.
+
+        Devuelve un DownloadResult si la URL ya terminó (error, playlist no
+        permitida, archivo existente) o `(info, expected)` para descargar.
+        """
+        video_id = extract_video_id(url)
+        info = self._cached_metadata(video_id, formats=True)
+        if info is None and self.config.skip_existing:
+            # Para saber si el archivo existe basta el título: vale una
+            # entrada con los formatos ya caducados.
+            stable = self._cached_metadata(video_id, formats=False)
+            existing = self._existing_output(stable, self._expected_output(ydl, stable)) if stable else None
+            if existing:
+                self._archive_record(stable, existing)
+                return DownloadResult(
+                    url=url,
+                    status='skipped',
+                    message='El archivo ya existe.',
+                    output_path=existing,
+                )
+        if info is None:
+            info = self._extract_info(ydl, url, video_id)
+        if info is None:
+            return DownloadResult(
+                url=url,
+                status='error',
+                message='No se pudo obtener información del video.',
+                category='extractor',
+            )
+
+        if info.get('_type') == 'playlist':
+            if not self.config.allow_playlist:
+                return DownloadResult(
+                    url=url,
+                    status='invalid',
+                    message='La URL es una playlist y "Permitir playlists" está desactivado.',
+                )
+            ydl.process_ie_result(info, download=True)
+            entries = info.get('entries') or []
+            return DownloadResult(
+                url=url,
+                status='success',
+                message=f'Playlist descargada ({sum(1 for _ in entries)} elementos).',
+            )
+
+        expected = self._expected_output(ydl, info)
+        existing = self._existing_output(info, expected) if self.config.skip_existing else None
+        if existing:
+            self._archive_record(info, existing)
+            return DownloadResult(
+                url=url,
+                status='skipped',
+                message='El archivo ya existe.',
+                output_path=existing,
+            )
+        return info, expected
+
+    def _download_with(self, ydl: yt_dlp.YoutubeDL, url: str) -> DownloadResult:
+        resolved = self._resolve_with(ydl, url)
+        if isinstance(resolved, DownloadResult):
+            return resolved
+        info, expected = resolved
+        self._fetch(ydl, url, info)
+        return self._finished(url, info, expected)
+
+    def _fetch(self, ydl: yt_dlp.YoutubeDL, url: str, info: dict[str, Any]) -> Any:
+        """process_ie_result midiendo la descarga aparte del postprocesado."""
+        timer = self._timer(url)
+        before = timer.seconds['postprocess']
+        start = time.perf_counter()
+        try:
+            self._prefetch(ydl, url, info)
+            return ydl.process_ie_result(info, download=True)
+        finally:
+            # Un postprocessor que falla no llega a avisar de que terminó.
+            timer.stop('postprocess')
+            postprocess = timer.seconds['postprocess'] - before
+            timer.add('download', time.perf_counter() - start - postprocess)
+
+    def _prefetch(self, ydl: yt_dlp.YoutubeDL, url: str, info: dict[str, Any]) -> None:
+        """Descarga los streams de `info` por rangos antes que yt-dlp.
+
+        yt-dlp baja el video y el audio de `bestvideo+bestaudio` uno tras
+        otro y por una sola conexión. Aquí se bajan a la vez, con
+        `connections_per_file` conexiones cada uno, a las rutas en las que
+        yt-dlp los buscará: al encontrarlos ya descargados solo fusiona y
+        postprocesa. Si algo falla, la descarga queda en manos de yt-dlp.
+        Las peticiones salen por `ydl.urlopen` (cookies, proxy, cabeceras y
+        `socket_timeout` de la instancia), como las de sus descargadores.
+        """
+        connections = self.config.connections_per_file
+        streams = self.config.concurrent_streams and self.config.mode == 'video'
+        if connections == 1 and not streams:
+            return
+        files = self._range_files(ydl, info)
+        if not files or (connections == 1 and len(files) == 1):
+            return
+        hooks = self._progress_hooks()
+        worker = threading.current_thread().name
+
+        def adopt() -> None:
+            # Los hooks encuentran la URL y el worker por el hilo.
+            self._local.url, self._local.worker = url, worker
+
+        def progress(remote: rangefetch.RemoteFile, done: int, total: int) -> None:
+            status = {'status': 'downloading', 'filename': remote.path, 'downloaded_bytes': done,
+                      'total_bytes': total}
+            for hook in hooks:
+                hook(status)
+
+        for batch in [files] if streams else [[remote] for remote in files]:
+            try:
+                sizes = rangefetch.fetch_files(
+                    batch,
+                    connections=connections,
+                    progress=progress,
+                    cancelled=self._cancelled,
+                    initializer=adopt,
+                    opener=self._range_opener(ydl),
+                    timeout=ydl.params.get('socket_timeout') or 30.0,
+                )
+            except rangefetch.FetchCancelled:
+                raise yt_dlp.utils.DownloadError('Descarga cancelada.') from None
+            except rangefetch.FETCH_ERRORS as exc:
+                self._log.warning('Descarga por rangos de %s fallida (%s); la hace yt-dlp.', url, exc)
+                return
+            for remote, size in zip(batch, sizes):
+                status = {'status': 'finished', 'filename': remote.path, 'downloaded_bytes': size,
+                          'total_bytes': size}
+                for hook in hooks:
+                    hook(status)
+
+    @staticmethod
+    def _range_opener(ydl: yt_dlp.YoutubeDL) -> rangefetch.Opener:
+        def opener(request: urllib.request.Request, timeout: float) -> Any:
+            return ydl.urlopen(yt_dlp.networking.Request(
+                request.full_url, headers=dict(request.header_items()), extensions={'timeout': timeout},
+            ))
+
+        return opener
+
+    def _range_files(self, ydl: yt_dlp.YoutubeDL, info: dict[str, Any]) -> list[rangefetch.RemoteFile]:
+        """Formatos elegidos para `info` y la ruta en la que yt-dlp espera cada uno.
+
+        Solo HTTP(S) directo: los formatos fragmentados ya se reparten con
+        `concurrent_fragment_downloads`.
+        """
+        if info.get('formats') and not (info.get('requested_formats') or info.get('url')):
+            # Info de la caché: sin la selección de formatos, que no se guarda.
+            info = ydl.process_ie_result(dict(info), download=False)
+        formats = info.get('requested_formats') or [info]
+        if any(f.get('protocol') not in ('http', 'https') or not f.get('url') for f in formats):
             return []
+        target = ydl.prepare_filename(info, 'temp')
+        if len(formats) == 1:
+            paths = [target]
+        else:
+            # Mismo nombre que da yt-dlp a cada parte antes de fusionarlas.
+            stem, _ = os.path.splitext(target)
+            paths = [f"{stem}.f{f['format_id']}.{f['ext']}" for f in formats]
+        return [
+            rangefetch.RemoteFile(f['url'], path, dict(f.get('http_headers') or {}), f.get('filesize'))
+            for f, path in zip(formats, paths)
+            if not Path(path).exists()
+        ]
+
+    def _finished(
+        self,
+        url: str,
+        info: dict[str, Any],
+        path: Optional[str],
+        *,
+        postprocess_seconds: Optional[float] = None,
+    ) -> DownloadResult:
+        final_path = path if path and Path(path).exists() else None
+        self._archive_record(info, final_path)
+        return DownloadResult(
+            url=url,
+            status='success',
+            message='Descarga completada.',
+            output_path=final_path,
+            postprocess_seconds=postprocess_seconds,
+        )
+
+    # ------------------------------------------------------------------ pipeline
+
+    def _stage_resolve(self, url: str, _: Any) -> Any:
+        early = self._precheck(url)
+        if early is not None:
+            return early
+        return self._with_retries(url, lambda ydl: self._resolve_with(ydl, url))
+
+    def _stage_fetch(self, url: str, payload: Any) -> Any:
+        resolved: Any = payload
+
+        def fetch(ydl: yt_dlp.YoutubeDL) -> Any:
+            nonlocal resolved
+            if resolved is None:
+                # El intento anterior falló con URLs caducadas: se resuelve de nuevo.
+                resolved = self._resolve_with(ydl, url)
+                if isinstance(resolved, DownloadResult):
+                    return resolved
+            info, expected = resolved
+            try:
+                result = self._fetch(ydl, url, info) or info
+            except yt_dlp.utils.DownloadError as exc:
+                if needs_fresh_formats(classify_error(exc)):
+                    resolved = None
+                raise
+            downloads = result.get('requested_downloads') or [{}]
+            # yt-dlp quita de cada descarga lo que copió del info dict (id,
+            # título, miniaturas...): los postprocessors y el índice lo necesitan.
+            merged = {k: v for k, v in result.items() if k != 'requested_downloads'}
+            return {**merged, **downloads[0]}, expected
+
+        return self._with_retries(url, fetch, pool=self._fetch_pool)
+
+    def _stage_postprocess(self, url: str, payload: Any) -> DownloadResult:
+        downloaded, expected = payload
+        if not self._build_ydl_opts().get('postprocessors'):
+            return self._finished(url, downloaded, downloaded.get('filepath') or expected)
+        if self.config.postprocess_backend == 'process':
+            return self._postprocess_in_process(url, downloaded, expected)
+
+        def run(ydl: yt_dlp.YoutubeDL) -> DownloadResult:
+            start = time.perf_counter()
+            try:
+                final = ydl.post_process(downloaded['filepath'], downloaded)
+            except yt_dlp.utils.PostProcessingError as exc:
+                # Igual que yt-dlp en process_info: se reporta como DownloadError.
+                ydl.report_error(f'Postprocessing: {exc}')
+                raise
+            return self._finished(
+                url, final, final.get('filepath') or expected,
+                postprocess_seconds=time.perf_counter() - start,
+            )
+
+        return self._with_retries(url, run)
+
+    def _postprocess_executor(self) -> ProcessPoolExecutor:
+        with self._pp_lock:
+            if self._pp_executor is None:
+                workers = self.config.postprocess_workers or os.cpu_count() or 1
+                self._pp_executor = postprocess.make_executor(workers)
+            return self._pp_executor
+
+    def _postprocess_opts(self) -> dict[str, Any]:
+        """Opciones para el proceso hijo: ffmpeg no necesita cookies ni red."""
+        opts = self._build_ydl_opts()
+        opts.pop('cookiesfrombrowser', None)
+        opts.pop('cookiefile', None)
+        opts.pop('progress_hooks', None)
+        opts.pop('postprocessor_hooks', None)
+        return opts
+
+    def _postprocess_in_process(
+        self, url: str, downloaded: dict[str, Any], expected: Optional[str]
+    ) -> DownloadResult:
+        executor = self._postprocess_executor()
+        try:
+            outcome = executor.submit(
+                postprocess.run_postprocessors,
+                self._postprocess_opts(),
+                downloaded['filepath'],
+                postprocess.serializable_info(downloaded),
+            ).result()
+        except BrokenProcessPool as exc:
+            # Un hijo murió (OOM, señal): el pool ya no sirve, se recrea en la siguiente URL.
+            with self._pp_lock:
+                if self._pp_executor is executor:
+                    self._pp_executor = None
+            return DownloadResult(
+                url=url,
+                status='error',
+                message=user_friendly_message(exc, 'postprocessing'),
+                category='postprocessing',
+            )
+        if outcome.error is not None:
+            return DownloadResult(
+                url=url,
+                status='error',
+                message=user_friendly_message(RuntimeError(outcome.error), 'postprocessing'),
+                category='postprocessing',
+                postprocess_seconds=outcome.seconds,
+            )
+        final = outcome.info or downloaded
+        return self._finished(
+            url, final, final.get('filepath') or expected, postprocess_seconds=outcome.seconds,
+        )
 
+    def _run_pipeline(self, urls: Iterable[str]) -> List[DownloadResult]:
+        cfg = self.config
+        stages = [
+            Stage('resolve', self._stage_resolve, cfg.resolve_workers),
+            Stage('fetch', self._stage_fetch, cfg.fetch_workers or cfg.parallel_downloads),
+            Stage('postprocess', self._stage_postprocess, cfg.postprocess_workers or os.cpu_count() or 1),
+        ]
+        self._log.info(
+            'Pipeline: %s (postprocesado en %s).',
+            ', '.join(f'{s.name}={s.workers}' for s in stages), cfg.postprocess_backend,
+        )
         results: List[DownloadResult] = []
-        if self.config.parallel_downloads <= 1:
-            for index, url in enumerate(url_list, start=1):
-                if self._cancelled():
-                    results.append(DownloadResult(url=url, status='cancelled', message='Cancelado.'))
-                    self._emit(results[-1], index, total)
+        for result in StagedPipeline(stages, cancelled=self._stopped).run(urls):
+            results.append(self._emit(result))
+        return results
+
+    # ------------------------------------------------------------------ public
+
+    def download_one(self, url: str) -> DownloadResult:
+        """Descarga una única URL aplicando reintentos con backoff exponencial."""
+        url = url.strip()
+        early = self._precheck(url)
+        if early is not None:
+            return early
+        return self._with_timing(self._with_retries(url, lambda ydl: self._download_with(ydl, url)))
+
+    def probe(self, url: str) -> DownloadResult:
+        """Comprueba que la URL resuelve sin descargar nada (dry run).
+
+        Si la caché de metadatos conoce el video no se toca la red.
+        """
+        url = url.strip()
+        invalid = self._validate_url_params(url)
+        if invalid is not None:
+            return invalid
+        video_id = extract_video_id(url)
+        cached = self._cached_metadata(video_id, formats=False)
+        if cached is not None:
+            return DownloadResult(
+                url=url, status='success', message=f"Disponible (caché): {cached.get('title')}",
+            )
+
+        def step(ydl: yt_dlp.YoutubeDL) -> DownloadResult:
+            info = self._extract_info(ydl, url, video_id)
+            if info is None:
+                return DownloadResult(
+                    url=url,
+                    status='error',
+                    message='No se pudo obtener información del video.',
+                    category='extractor',
+                )
+            return DownloadResult(url=url, status='success', message=f"Disponible: {info.get('title')}")
+
+        try:
+            return self._with_retries(url, step)
+        finally:
+            self._pop_timer(url)
+
+    def download_many(self, urls: Iterable[str]) -> List[DownloadResult]:
+        """Descarga varias URLs, usando threading si parallel_downloads > 1.
+
+        Con `pipeline=True` resolución, descarga y postprocesado corren en
+        etapas separadas con pools de tamaño independiente. El backend
+        `process` lleva ffmpeg a un pool de procesos e implica el pipeline.
+
+        Si `urls` es un iterador (p. ej. `iter_links_from_csv`) se consume en
+        streaming: la primera URL se procesa mientras se leen las siguientes
+        y el total del progreso es el número de URLs leídas hasta el momento.
+
+        Cada resultado se anota en el journal del lote; con `resume=True` las
+        URLs que ya terminaron se reemiten desde el journal sin tocar la red.
+        """
+        total: Optional[int] = None
+        duplicates = 0
+        if isinstance(urls, Sized):
+            urls, duplicates = dedupe_urls(urls, allow_playlist=self.config.allow_playlist)
+            if not urls:
+                return []
+            # Con playlists el total se conoce al expandirlas.
+            if not any(self._is_collection(url) for url in urls):
+                total = len(urls)
+
+        early: List[DownloadResult] = []
+
+        def pending(batch: Batch) -> Iterator[str]:
+            for item in batch.expand(urls):
+                if isinstance(item, DownloadResult):
+                    early.append(item)
+                else:
+                    yield item
+
+        self._batch = batch = self.open_batch(total=total)
+        try:
+            results = self._run_batch(pending(batch))
+            duplicates += batch.deduper.duplicates
+            if duplicates:
+                self._log.info('Se descartaron %d URLs duplicadas.', duplicates)
+            return early + results
+        finally:
+            batch.close()
+            self._batch = None
+            if self._cancelled():
+                # Al cancelar se sueltan cookies y conexiones de inmediato.
+                self.close()
+
+    def open_batch(self, *, total: Optional[int] = None, journal: bool = True) -> Batch:
+        """Abre un lote para alimentarlo desde fuera (`AsyncDownloader`, servidor).
+
+        Con `journal=True` los resultados se anotan en el journal del lote
+        y, con `resume`, `Batch.expand` reemite lo que ya terminó.
+        """
+        with self._batches_lock:
+            self._open_batches += 1
+            if self._open_batches == 1 and self._breaker is not None:
+                # Sin otro lote abierto se empieza con el circuito cerrado
+                # (p. ej. tras arreglar el entorno que abortó el anterior).
+                self._breaker.reset()
+        if not journal:
+            return Batch(self, total=total)
+        store = BatchJournal.for_config(self.config)
+        replayed = store.finished() if self.config.resume else {}
+        return Batch(self, total=total, journal=store.open(resume=self.config.resume), replayed=replayed)
+
+    # ------------------------------------------------------------------ playlists
+
+    def is_collection(self, url: str) -> bool:
+        """¿Es `url` una playlist, canal o pestaña? `Batch.expand` la lista
+        (con peticiones a YouTube) en vez de producirla tal cual."""
+        url = url.strip()
+        return self._is_collection(
+            canonical_youtube_url(url, allow_playlist=self.config.allow_playlist) or url
+        )
+
+    def _is_collection(self, url: str) -> bool:
+        """Playlist, canal o pestaña: URL de YouTube sin ID de video."""
+        return (
+            self.config.allow_playlist
+            and is_valid_youtube_url(url)
+            and extract_video_id(url) is None
+        )
+
+    def _expand_playlists(
+        self,
+        urls: Iterable[str],
+        batch: Batch,
+        *,
+        depth: int = 2,
+    ) -> Iterator[str | DownloadResult]:
+        """Sustituye cada playlist por sus entradas, que se planifican sueltas.
+
+        Las entradas pasan por el mismo `deduper` que el resto del lote y
+        quedan asociadas, solo dentro de `batch`, al ID de su playlist para
+        etiquetar el resultado.
+        Un fallo al listar se emite y se produce como resultado de la propia
+        playlist.
+        """
+        for url in urls:
+            if depth <= 0 or not self._is_collection(url):
+                yield url
+                continue
+            known = self._sync_state.known(url) if self._sync_state is not None else frozenset()
+            listed = self._flat_entries(url, known=known)
+            if isinstance(listed, DownloadResult):
+                yield batch.emit(listed)
+                continue
+            playlist_id, entries, skipped = listed
+            if playlist_id is None:
+                yield url
+                continue
+            if self._sync_state is not None:
+                self._sync_state.touch(url)
+                batch._collection_of.setdefault(playlist_id, url)
+                self._log.info(
+                    'Sync %s: %d entradas nuevas, %d ya conocidas.', playlist_id, len(entries), skipped,
+                )
+            else:
+                self._log.info('Playlist %s: %d entradas.', playlist_id, len(entries))
+            admitted = []
+            for entry_url in entries:
+                entry_url = batch.deduper.admit(entry_url)
+                if entry_url is None:
+                    continue
+                batch._playlist_of.setdefault(entry_url, playlist_id)
+                admitted.append(entry_url)
+            yield from self._expand_playlists(admitted, batch, depth=depth - 1)
+
+    def _flat_entries(self, url: str, *, known: frozenset[str] = frozenset()) -> Any:
+        """Lista plana de una playlist: `(id, [urls], nº conocidas)` o un error.
+
+        Las entradas cuyo ID está en `known` se omiten. En feeds de más nuevo
+        a más viejo (canales, uploads `UU…`) se deja de paginar tras
+        `sync_stop_after` conocidas seguidas: lo que sigue ya se sincronizó.
+        Devuelve `(None, [], 0)` si la URL no resultó ser una playlist.
+        """
+        newest_first = bool(known) and _is_newest_first(url)
+
+        def listing(ydl: yt_dlp.YoutubeDL) -> tuple[Optional[str], list[str], int]:
+            self._throttle_request()
+            info = ydl.extract_info(url, download=False, process=False)
+            # Un canal puede redirigir a su pestaña de videos.
+            for _ in range(3):
+                if not info or info.get('_type') not in ('url', 'url_transparent'):
+                    break
+                self._throttle_request()
+                info = ydl.extract_info(info['url'], download=False, process=False)
+            if not info or info.get('_type') not in ('playlist', 'multi_video'):
+                return None, [], 0
+            # Las entradas son perezosas (paginadas): se recorren con el
+            # YoutubeDL todavía prestado.
+            fresh: list[str] = []
+            skipped = streak = 0
+            for entry_url in map(_entry_url, info.get('entries') or []):
+                if not entry_url:
+                    continue
+                if extract_video_id(entry_url) in known:
+                    skipped += 1
+                    streak += 1
+                    if newest_first and streak >= self.sync_stop_after:
+                        break
                     continue
-                result = self.download_one(url)
-                results.append(result)
-                self._emit(result, index, total)
+                streak = 0
+                fresh.append(entry_url)
+            return info.get('id') or url, fresh, skipped
+
+        listed = self._with_retries(url, listing, pool=self._flat_pool)
+        if not isinstance(listed, DownloadResult):
+            # La playlist no se emite: sus entradas llevan sus propios tiempos.
+            self._pop_timer(url)
+        return listed
+
+    def _run_batch(self, urls: Iterable[str]) -> List[DownloadResult]:
+        if self.config.pipeline or self.config.postprocess_backend == 'process':
+            try:
+                return self._run_pipeline(urls)
+            finally:
+                self._report_unread()
+
+        results: List[DownloadResult] = []
+        retries = RetryQueue()
+        if self.config.parallel_downloads <= 1:
+            pending = iter(urls)
+            # Se comprueba antes de leer: tras cancelar no se lee ni una URL más.
+            while True:
+                self._run_due(retries, results)
+                if not self._await_breaker():
+                    break
+                url = next(pending, None)
+                if url is None:
+                    break
+                self._admit(url)
+                self._settle(url, self.download_attempt(url), retries, results)
+            while retries and not self._stopped():
+                self._sleep_interruptible(self._next_wake(retries) or 0.0)
+                self._run_due(retries, results)
+            self._cancel_retries(retries, results)
+            self._report_unread()
             return results
 
-        self._log.info('Descargando en paralelo con %d workers.', self.config.parallel_downloads)
-        completed = 0
-        with ThreadPoolExecutor(max_workers=self.config.parallel_downloads) as pool:
-            future_map = {pool.submit(self.download_one, url): url for url in url_list}
-            for future in as_completed(future_map):
-                completed += 1
-                try:
-                    result = future.result()
-                except Exception as exc:  # pragma: no cover
-                    result = DownloadResult(
-                        url=future_map[future],
-                        status='error',
-                        message=str(exc),
-                        category=classify_error(exc),
-                    )
-                results.append(result)
-                self._emit(result, completed, total)
+        workers = self.config.parallel_downloads
+        window = workers * self.inflight_per_worker
+        self._log.info('Descargando en paralelo con %d workers (ventana de %d).', workers, window)
+        pending = iter(urls)
+        in_flight: dict[Future, str] = {}
+        exhausted = False
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                # Los reintentos vencidos pasan delante del trabajo nuevo; de
+                # la entrada solo se lee al liberarse un hueco y nunca tras
+                # cancelar ni con el circuit breaker abierto.
+                while len(in_flight) < window and self._may_submit():
+                    due = retries.pop_due(1)
+                    if due:
+                        retry = due[0]
+                        self._admit(retry.url)
+                        in_flight[pool.submit(
+                            self.download_attempt, retry.url, retry.attempt, retry.waited,
+                        )] = retry.url
+                        continue
+                    url = None if exhausted else next(pending, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    self._admit(url)
+                    in_flight[pool.submit(self.download_attempt, url)] = url
+                if not in_flight:
+                    if self._stopped() or (exhausted and not retries):
+                        break
+                    self._sleep_interruptible(self._next_wake(retries) or 0.0)
+                    continue
+                done, _ = wait(in_flight, timeout=self._next_wake(retries), return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as exc:  # pragma: no cover
+                        outcome = DownloadResult(
+                            url=url,
+                            status='error',
+                            message=str(exc),
+                            category=classify_error(exc),
+                        )
+                    self._settle(url, outcome, retries, results)
+
+        self._cancel_retries(retries, results)
+        self._report_unread()
         return results
 
+    def _settle(
+        self, url: str, outcome: DownloadResult | RetryLater, retries: RetryQueue, results: List[DownloadResult],
+    ) -> None:
+        if isinstance(outcome, RetryLater):
+            retries.push(url, outcome.attempt, outcome.delay)
+        else:
+            results.append(self._emit(outcome))
+
+    def _run_due(self, retries: RetryQueue, results: List[DownloadResult]) -> None:
+        """Ejecuta en el hilo actual los reintentos vencidos (modo secuencial)."""
+        while self._may_submit():
+            due = retries.pop_due(1)
+            if not due:
+                return
+            retry = due[0]
+            self._admit(retry.url)
+            self._settle(retry.url, self.download_attempt(retry.url, retry.attempt, retry.waited), retries, results)
+
+    def _cancel_retries(self, retries: RetryQueue, results: List[DownloadResult]) -> None:
+        for retry in retries.drain():
+            self._timer(retry.url).add('wait', retry.waited)
+            results.append(self._emit(self.stopped_result(retry.url)))
+
+    def _report_unread(self) -> None:
+        """Tras parar, lo que no se llegó a leer se cuenta en vez de emitirse
+        (un CSV en streaming puede tener millones de filas)."""
+        if self._batch is None or not self._stopped():
+            return
+        unread = self._batch.unread()
+        if unread is None:
+            self._log.warning('Lote detenido: el resto de la entrada queda sin leer.')
+        elif unread:
+            self._log.warning('Lote detenido: %d URLs de la entrada quedan sin leer.', unread)
+
+    # ------------------------------------------------------------------ breaker
+
+    @property
+    def stopped(self) -> bool:
+        """Cancelado o abortado por el circuit breaker: no hay que empezar nada más."""
+        return self._stopped()
+
+    def admit(self, url: str) -> Optional[float]:
+        """Pide al circuit breaker permiso para empezar `url` (para quien
+        planifica por su cuenta: `AsyncDownloader`, modo servidor).
+
+        0 = puede empezar ya con `download_attempt`; > 0 = segundos a esperar
+        antes de volver a pedirlo (circuito abierto); None = el lote se
+        detuvo y la URL no debe empezar (ver `stopped_result`).
+        """
+        if self._stopped():
+            return None
+        if self._breaker is None or self._breaker.try_admit(url):
+            return 0.0
+        return self._breaker.retry_in() or 0.25
+
+    def _stopped(self) -> bool:
+        """Cancelado por el usuario o abortado por el circuit breaker."""
+        return self._cancelled() or (self._breaker is not None and self._breaker.aborted is not None)
+
+    def _may_submit(self) -> bool:
+        return not self._cancelled() and (self._breaker is None or self._breaker.ready())
+
+    def _admit(self, url: str) -> None:
+        if self._breaker is not None:
+            self._breaker.admit(url)
+
+    def _await_breaker(self) -> bool:
+        """Espera a que el circuit breaker deje enviar; False si hay que parar."""
+        while not self._may_submit():
+            if self._stopped():
+                return False
+            self._sleep_interruptible(self._breaker.retry_in() or 0.25)  # type: ignore[union-attr]
+        return True
+
+    def _next_wake(self, retries: RetryQueue) -> Optional[float]:
+        """Segundos hasta que venza un reintento o termine la pausa del breaker."""
+        waits = [retries.next_due_in()]
+        if self._breaker is not None:
+            waits.append(self._breaker.retry_in())
+        return min((w for w in waits if w is not None), default=None)
+
+    def stopped_result(self, url: str) -> DownloadResult:
+        """Resultado de una URL que no llegó a empezar porque el lote se detuvo."""
+        aborted = self._breaker.aborted if self._breaker is not None else None
+        if aborted is None or self._cancelled():
+            return DownloadResult(url=url, status='cancelled', message='Cancelado.')
+        return DownloadResult(
+            url=url,
+            status='cancelled',
+            message=f'Lote abortado: {user_friendly_message(None, aborted)}',
+            category=aborted,
+        )
+
     # ------------------------------------------------------------------ util
 
-    def _emit(self, result: DownloadResult, index: int, total: int) -> None:
+    def _emit(self, result: DownloadResult) -> DownloadResult:
+        """Emite un resultado del lote de `download_many` en curso."""
+        assert self._batch is not None
+        return self._batch.emit(result)
+
+    def _observe(self, result: DownloadResult, *, collection: Optional[str] = None) -> DownloadResult:
+        """Añade al resultado sus tiempos y lo cuenta en métricas y, si
+        viene de la colección `collection`, en el estado de sync."""
+        result = self._with_timing(result)
+        self.metrics.observe(result)
+        self._sync_record(result, collection)
+        return result
+
+    def _notify(self, result: DownloadResult, index: int, total: int) -> None:
         self._log.info('[%d/%d] %s — %s', index, total, result.status, result.url)
         if self.progress_callback:
             try:
@@ -253,6 +1412,25 @@ class Downloader:
             except Exception:
                 self._log.exception('Error en progress_callback; se ignora.')
 
+    def _with_timing(self, result: DownloadResult) -> DownloadResult:
+        """Vuelca en el resultado los tiempos acumulados para su URL."""
+        timer = self._pop_timer(result.url)
+        if timer is None:
+            return result
+        timing = timer.fields()
+        # El pipeline mide ffmpeg por su cuenta (también en procesos hijo).
+        if result.postprocess_seconds is not None:
+            timing['postprocess_seconds'] = result.postprocess_seconds
+        self._log.debug('Tiempos de %s: %s', result.url, timing)
+        return replace(result, **timing)
+
+    def _sync_record(self, result: DownloadResult, collection: Optional[str]) -> None:
+        if self._sync_state is None or collection is None or not is_finished(result):
+            return
+        video_id = extract_video_id(result.url)
+        if collection is not None and video_id is not None:
+            self._sync_state.mark(collection, video_id)
+
     def _sleep_interruptible(self, seconds: float) -> None:
         """Duerme en intervalos pequeños para respetar la cancelación."""
         end = time.monotonic() + seconds
@@ -262,6 +1440,34 @@ class Downloader:
             time.sleep(min(0.25, end - time.monotonic()))
 
 
+class RetryLater(Exception):
+    """Fallo recuperable cuyo reintento se difiere: `attempt` es el número del
+    siguiente intento y `delay` los segundos de backoff hasta hacerlo."""
+
+    def __init__(self, attempt: int, delay: float) -> None:
+        super().__init__(attempt, delay)
+        self.attempt = attempt
+        self.delay = delay
+
+
+def _is_newest_first(url: str) -> bool:
+    """Canales y sus pestañas, o la playlist de subidas (`UU…`) de un canal."""
+    playlist_id = extract_playlist_id(url)
+    return playlist_id is None or playlist_id.startswith('UU')
+
+
+def _entry_url(entry: Optional[dict[str, Any]]) -> Optional[str]:
+    """URL canónica de una entrada plana (video o sub-playlist)."""
+    if not entry:
+        return None
+    if entry.get('ie_key') == 'Youtube' and entry.get('id'):
+        return f"https://www.youtube.com/watch?v={entry['id']}"
+    raw = entry.get('url') or entry.get('webpage_url')
+    if not raw:
+        return None
+    return canonical_youtube_url(raw) or raw
+
+
 def summarize(results: Iterable[DownloadResult]) -> dict[str, int]:
     """Cuenta resultados por estado para mostrar resumen."""
     summary = {'success': 0, 'skipped': 0, 'invalid': 0, 'error': 0, 'cancelled': 0}
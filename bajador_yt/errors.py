@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import random
 import re
-from typing import Optional
+from typing import Callable, Optional
 
 _ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*[mK]')
 
@@ -30,44 +31,133 @@ _NON_RETRYABLE = frozenset(
      'login_required', 'cookie_locked', 'postprocessing', 'js_runtime'}
 )
 
+# Las URLs firmadas de los formatos caducan en unas horas y entonces YouTube
+# responde 403: reintentar con las mismas no sirve, hay que volver a resolver.
+_STALE_FORMAT_CATEGORIES = frozenset({'forbidden'})
+
+# Escala del backoff por categoría: un 403 necesita más enfriamiento que un
+# corte de red para no volver a chocar con el mismo límite.
+_BACKOFF_SCALE: dict[str, float] = {
+    'network': 1.0,
+    'timeout': 1.0,
+    'generic': 1.0,
+    'forbidden': 4.0,
+}
+# Ningún reintento espera más que esto, sea cual sea el intento.
+MAX_RETRY_DELAY = 300.0
+
+
+# Reglas de texto en orden de prioridad: si el mensaje casa con varias, gana
+# la primera. `requires` son palabras que además deben aparecer en el mensaje.
+# Todas las palabras se comparan en minúsculas.
+_TEXT_RULES: tuple[tuple[str, tuple[str, ...], tuple[str, ...]], ...] = (
+    ('private', ('private video', 'this video is private'), ()),
+    ('unavailable', ('has been removed', 'video unavailable', 'no longer available'), ()),
+    ('geo_blocked', (
+        'available in your country', 'not available from your location',
+        'geo restricted', 'geo-restricted', 'georestricted', 'geo-blocked', 'geoblocked',
+    ), ()),
+    ('copyright', ('copyright',), ()),
+    ('age_restricted', ('sign in to confirm your age', 'age-restricted', 'age restricted'), ()),
+    ('cookie_locked', ('could not copy',), ('cookie',)),
+    ('login_required', ('please sign in', 'login required', 'requires authentication', 'use --cookies'), ()),
+    ('forbidden', ('http error 403', 'forbidden', 'http error 429', 'too many requests'), ()),
+    ('timeout', ('timed out', 'timeout'), ()),
+    ('js_runtime', ('javascript runtime', 'no supported javascript'), ()),
+    ('network', (
+        'connect', 'network', 'name or service not known',
+        'temporary failure in name resolution', 'unreachable',
+    ), ()),
+    ('postprocessing', ('postprocessing', 'ffprobe'), ()),
+    ('postprocessing', ('ffmpeg',), ('not found',)),
+    ('extractor', ('extractorerror', 'unable to extract'), ()),
+)
+
+# Tipos de excepción (por nombre de clase, sin importar yt-dlp) y códigos
+# HTTP que deciden la categoría sin mirar el texto.
+_TYPE_CATEGORIES: dict[str, str] = {
+    'GeoRestrictedError': 'geo_blocked',
+    'PostProcessingError': 'postprocessing',
+    'TimeoutError': 'timeout',
+    'ConnectionError': 'network',
+    'gaierror': 'network',
+    'TransportError': 'network',
+}
+_HTTP_STATUS_CATEGORIES: dict[int, str] = {403: 'forbidden', 429: 'forbidden'}
+
+
+# Tabla plana (palabra, categoría, requisitos) en orden de prioridad. Un
+# `in` de CPython sobre el mensaje es más rápido que una alternativa de `re`
+# con las mismas palabras, incluso factorizada en trie (ver
+# benchmarks/bench_classify_error.py).
+_KEYWORDS: tuple[tuple[str, str, tuple[str, ...]], ...] = tuple(
+    (keyword, category, requires)
+    for category, keywords, requires in _TEXT_RULES
+    for keyword in keywords
+)
+_CATEGORY_RANK: dict[str, int] = {}
+for _index, (_category, _, _) in enumerate(_TEXT_RULES):
+    _CATEGORY_RANK.setdefault(_category, _index)
+_TYPE_CACHE: dict[type, tuple[Optional[str], bool]] = {}
+
 
 def classify_error(exc: Optional[BaseException]) -> str:
-    """Devuelve una categoría corta basada en el texto del error."""
+    """Devuelve una categoría corta para el error.
+
+    Primero por tipo de excepción y código HTTP en toda la cadena (causas y
+    `exc_info` de yt-dlp); si no deciden, por el texto del mensaje.
+    """
     if exc is None:
         return 'generic'
-    msg = str(exc).lower()
-
-    if 'private video' in msg or 'this video is private' in msg:
-        return 'private'
-    if 'has been removed' in msg or 'video unavailable' in msg or 'no longer available' in msg:
-        return 'unavailable'
-    if 'not available in your country' in msg or 'geo' in msg:
-        return 'geo_blocked'
-    if 'copyright' in msg:
-        return 'copyright'
-    if 'sign in to confirm your age' in msg or 'age-restricted' in msg or 'age restricted' in msg:
-        return 'age_restricted'
-    if 'could not copy' in msg and 'cookie' in msg:
-        return 'cookie_locked'
-    if 'please sign in' in msg or 'login required' in msg or 'requires authentication' in msg or 'use --cookies' in msg:
-        return 'login_required'
-    if 'http error 403' in msg or 'forbidden' in msg:
-        return 'forbidden'
-    if 'timed out' in msg or 'timeout' in msg:
-        return 'timeout'
-    if 'javascript runtime' in msg or 'no supported javascript' in msg:
-        return 'js_runtime'
-    if any(kw in msg for kw in (
-        'connection', 'connect', 'network', 'name or service not known',
-        'temporary failure in name resolution', 'unreachable',
-    )):
-        return 'network'
-    if ('postprocessing' in msg
-            or 'ffprobe' in msg
-            or ('ffmpeg' in msg and 'not found' in msg)):
-        return 'postprocessing'
-    if 'extractorerror' in msg or 'unable to extract' in msg:
-        return 'extractor'
+    return _classify_chain(exc) or _classify_text(str(exc).lower())
+
+
+def _classify_chain(exc: BaseException, limit: int = 8) -> Optional[str]:
+    """Mejor categoría por tipo o código HTTP entre la excepción y sus causas.
+
+    Sigue `exc_info` y `cause` de yt-dlp además de `__cause__`/`__context__`.
+    """
+    best: Optional[str] = None
+    pending = [exc]
+    seen: list[BaseException] = []
+    while pending and len(seen) < limit:
+        link = pending.pop()
+        if link in seen:  # las excepciones se comparan por identidad
+            continue
+        seen.append(link)
+        found, is_http = _type_category(type(link))
+        if is_http:
+            status = getattr(link, 'status', None) or getattr(link, 'code', None)
+            found = _HTTP_STATUS_CATEGORIES.get(status, found)  # type: ignore[arg-type]
+        if found is not None and (best is None or _CATEGORY_RANK[found] < _CATEGORY_RANK[best]):
+            best = found
+        exc_info = getattr(link, 'exc_info', None)
+        if type(exc_info) is tuple and len(exc_info) > 1 and isinstance(exc_info[1], BaseException):
+            pending.append(exc_info[1])
+        cause = getattr(link, 'cause', None)
+        if isinstance(cause, BaseException):
+            pending.append(cause)
+        if link.__cause__ is not None:
+            pending.append(link.__cause__)
+        if link.__context__ is not None:
+            pending.append(link.__context__)
+    return best
+
+
+def _type_category(cls: type) -> tuple[Optional[str], bool]:
+    """Categoría por la jerarquía de la clase y si es un HTTPError (con código)."""
+    cached = _TYPE_CACHE.get(cls)
+    if cached is None:
+        names = [base.__name__ for base in cls.__mro__]
+        found = next((_TYPE_CATEGORIES[name] for name in names if name in _TYPE_CATEGORIES), None)
+        cached = _TYPE_CACHE[cls] = (found, 'HTTPError' in names)
+    return cached
+
+
+def _classify_text(msg: str) -> str:
+    for keyword, category, requires in _KEYWORDS:
+        if keyword in msg and all(word in msg for word in requires):
+            return category
     return 'generic'
 
 
@@ -75,6 +165,29 @@ def is_retryable(category: str) -> bool:
     return category in _RETRYABLE
 
 
+def needs_fresh_formats(category: str) -> bool:
+    """¿Puede deberse el fallo a URLs de formato caducadas?"""
+    return category in _STALE_FORMAT_CATEGORIES
+
+
+def retry_delay(
+    category: str,
+    attempt: int,
+    backoff: float,
+    *,
+    jitter: float = 0.5,
+    rng: Callable[[], float] = random.random,
+) -> float:
+    """Segundos antes de reintentar tras el fallo número `attempt`.
+
+    `backoff ** attempt` escalado según la categoría, con un jitter de
+    ±`jitter` para que los workers que fallaron a la vez no reintenten
+    todos en el mismo instante.
+    """
+    base = min(MAX_RETRY_DELAY, _BACKOFF_SCALE.get(category, 1.0) * backoff ** attempt)
+    return base * (1 - jitter + 2 * jitter * rng())
+
+
 def user_friendly_message(exc: Optional[BaseException], category: Optional[str] = None) -> str:
     """Formatea el error con una explicación breve y el detalle técnico."""
     category = category or classify_error(exc)
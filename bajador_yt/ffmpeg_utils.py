@@ -1,10 +1,19 @@
-"""Detección y validación del binario de FFmpeg."""
+"""Detección, validación y capacidades del binario de FFmpeg."""
 
 from __future__ import annotations
 
+import json
 import os
+import re
 import shutil
-from typing import Optional
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .config import ConfigError, DownloadConfig
+from .logger import get_logger
 
 _COMMON_PATHS: tuple[str, ...] = (
     'C:/Program Files/ffmpeg-7.0.2-full_build/bin/ffmpeg.exe',
@@ -37,3 +46,194 @@ def validate_ffmpeg_path(path: Optional[str]) -> Optional[str]:
     if not path:
         return None
     return path if os.path.isfile(path) else None
+
+
+def detect_ffprobe_path(ffmpeg_path: Optional[str]) -> Optional[str]:
+    """Busca ffprobe junto al ffmpeg indicado y, si no está, en el PATH."""
+    if ffmpeg_path:
+        folder, name = os.path.split(ffmpeg_path)
+        sibling = os.path.join(folder, name.replace('ffmpeg', 'ffprobe'))
+        if sibling != ffmpeg_path and os.path.isfile(sibling):
+            return sibling
+    return shutil.which('ffprobe')
+
+
+# ---------------------------------------------------------------- capacidades
+
+#: Encoder con el que yt-dlp convierte a cada audio_format (ver ACODECS de
+#: yt-dlp); wav usa el PCM que trae cualquier build.
+AUDIO_ENCODERS: dict[str, str] = {'mp3': 'libmp3lame', 'm4a': 'aac', 'opus': 'libopus'}
+#: Formatos que YouTube nunca sirve tal cual: siempre hay que codificar. Para
+#: m4a/opus yt-dlp copia el stream si ya viene en ese códec.
+_ALWAYS_ENCODED = frozenset({'mp3'})
+_CACHE_VERSION = 1
+_PROBE_TIMEOUT = 15.0
+
+Runner = Callable[[list[str]], Optional[str]]
+
+
+@dataclass(frozen=True)
+class FfmpegCapabilities:
+    """Lo que sabe hacer un binario de ffmpeg concreto."""
+
+    ffmpeg: str
+    ffprobe: Optional[str]
+    version: Optional[str]
+    #: Encoders de audio; None si no se pudo preguntar a ffmpeg.
+    encoders: Optional[frozenset[str]]
+    hwaccels: tuple[str, ...] = ()
+
+    def has_encoder(self, name: str) -> bool:
+        return self.encoders is None or name in self.encoders
+
+
+_MEMO: dict[Optional[str], Optional[FfmpegCapabilities]] = {}
+_MEMO_LOCK = threading.Lock()
+
+
+def default_capabilities_file() -> Path:
+    base = (
+        os.environ.get('LOCALAPPDATA')
+        or os.environ.get('XDG_CACHE_HOME')
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    )
+    return Path(base) / 'bajador-yt' / 'ffmpeg-capabilities.json'
+
+
+def ffmpeg_capabilities(configured: Optional[str] = None) -> Optional[FfmpegCapabilities]:
+    """Resuelve ffmpeg (ruta configurada o detección) y sus capacidades.
+
+    Se calcula una vez por proceso y ruta configurada: `Downloader`, la GUI y
+    el CLI comparten el resultado. Las capacidades se guardan además en disco
+    por ruta y mtime del binario, así que ffmpeg solo se ejecuta la primera
+    vez o tras actualizarlo. None si no hay ffmpeg.
+    """
+    with _MEMO_LOCK:
+        if configured not in _MEMO:
+            path = validate_ffmpeg_path(configured) or detect_ffmpeg_path()
+            _MEMO[configured] = probe_capabilities(path) if path else None
+        return _MEMO[configured]
+
+
+def probe_capabilities(
+    ffmpeg_path: str,
+    *,
+    cache_file: Optional[Path] = None,
+    runner: Optional[Runner] = None,
+) -> FfmpegCapabilities:
+    """Capacidades de `ffmpeg_path`, desde la caché en disco si el binario no cambió."""
+    cache_file = cache_file or default_capabilities_file()
+    ffprobe = detect_ffprobe_path(ffmpeg_path)
+    try:
+        stat = os.stat(ffmpeg_path)
+    except OSError:
+        return FfmpegCapabilities(ffmpeg_path, ffprobe, None, None)
+    key = os.path.abspath(ffmpeg_path)
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    entries = _read_capabilities(cache_file)
+    cached = entries.get(key)
+    if isinstance(cached, dict) and cached.get('stamp') == stamp:
+        encoders = cached.get('encoders')
+        return FfmpegCapabilities(
+            ffmpeg_path, ffprobe, cached.get('version'),
+            frozenset(encoders) if encoders is not None else None,
+            tuple(cached.get('hwaccels') or ()),
+        )
+
+    run = runner or _run_ffmpeg
+    version_out = run([ffmpeg_path, '-hide_banner', '-version'])
+    encoders_out = run([ffmpeg_path, '-hide_banner', '-encoders'])
+    hwaccels_out = run([ffmpeg_path, '-hide_banner', '-hwaccels'])
+    caps = FfmpegCapabilities(
+        ffmpeg_path,
+        ffprobe,
+        _parse_version(version_out),
+        _parse_audio_encoders(encoders_out) if encoders_out is not None else None,
+        _parse_hwaccels(hwaccels_out),
+    )
+    if caps.encoders is not None:
+        entries[key] = {
+            'stamp': stamp,
+            'version': caps.version,
+            'encoders': sorted(caps.encoders),
+            'hwaccels': list(caps.hwaccels),
+        }
+        _write_capabilities(cache_file, entries)
+    return caps
+
+
+def check_audio_encoder(config: DownloadConfig, caps: Optional[FfmpegCapabilities]) -> None:
+    """Rechaza un audio_format que el ffmpeg disponible no sabe codificar.
+
+    Lanza ConfigError antes de descargar nada. Sin ffmpeg, o si no se pudo
+    sondear, no decide: el fallo llegará como `postprocessing`.
+    """
+    encoder = AUDIO_ENCODERS.get(config.audio_format)
+    if config.mode != 'audio' or caps is None or encoder is None or caps.has_encoder(encoder):
+        return
+    if config.audio_format in _ALWAYS_ENCODED:
+        raise ConfigError(
+            f'El ffmpeg de {caps.ffmpeg} no incluye el encoder {encoder}: no puede convertir a '
+            f'{config.audio_format}. Elige otro audio_format o instala un build de ffmpeg con {encoder}.'
+        )
+    get_logger('ffmpeg').warning(
+        'El ffmpeg de %s no incluye el encoder %s: la conversión a %s solo funcionará '
+        'si el audio ya viene en ese códec.', caps.ffmpeg, encoder, config.audio_format,
+    )
+
+
+def _run_ffmpeg(cmd: list[str]) -> Optional[str]:
+    try:
+        proc = subprocess.run(
+            cmd, capture_output=True, text=True, errors='replace', timeout=_PROBE_TIMEOUT, check=False,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def _parse_version(output: Optional[str]) -> Optional[str]:
+    if not output:
+        return None
+    match = re.match(r'\S+ version (\S+)', output)
+    return match.group(1) if match else None
+
+
+def _parse_audio_encoders(output: str) -> frozenset[str]:
+    """Nombres de las líneas ` A.....  libmp3lame  ...` tras la cabecera `------`."""
+    _, _, listing = output.partition('------')
+    names = set()
+    for line in listing.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith('A'):
+            names.add(parts[1])
+    return frozenset(names)
+
+
+def _parse_hwaccels(output: Optional[str]) -> tuple[str, ...]:
+    if not output:
+        return ()
+    lines = [line.strip() for line in output.splitlines()]
+    return tuple(line for line in lines[1:] if line)
+
+
+def _read_capabilities(path: Path) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != _CACHE_VERSION:
+        return {}
+    entries = data.get('entries')
+    return entries if isinstance(entries, dict) else {}
+
+
+def _write_capabilities(path: Path, entries: dict[str, Any]) -> None:
+    # Best-effort: sin caché solo se vuelve a sondear en la próxima ejecución.
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps({'version': _CACHE_VERSION, 'entries': entries}), encoding='utf-8')
+        os.replace(tmp, path)
+    except OSError as exc:
+        get_logger('ffmpeg').debug('No se pudo guardar la caché de ffmpeg en %s: %s', path, exc)
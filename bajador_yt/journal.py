@@ -0,0 +1,119 @@
+"""Journal del lote para reanudar tras un cierre inesperado.
+
+Cada `DownloadResult` emitido se añade como una línea JSON al journal de la
+carpeta de salida. Las escrituras se vuelcan al SO en cada línea y se hace
+`fsync` cada `sync_every` resultados: un crash pierde como mucho ese tramo,
+que al reanudar simplemente se vuelve a procesar.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import IO, Optional
+
+from .config import DownloadConfig
+from .errors import is_retryable
+from .logger import get_logger
+from .models import DownloadResult
+
+JOURNAL_FILENAME = '.bajador-journal.jsonl'
+
+_FINAL_STATUSES = frozenset({'success', 'skipped', 'invalid'})
+_RESULT_FIELDS = frozenset(f.name for f in fields(DownloadResult))
+
+
+def journal_path_for(config: DownloadConfig) -> Path:
+    if config.journal_file:
+        return Path(config.journal_file)
+    return Path(config.output_folder) / JOURNAL_FILENAME
+
+
+def is_finished(result: DownloadResult) -> bool:
+    """True si la URL no debe reintentarse al reanudar."""
+    if result.status in _FINAL_STATUSES:
+        return True
+    return result.status == 'error' and not is_retryable(result.category or 'generic')
+
+
+class BatchJournal:
+    """JSONL append-only con los resultados del lote en curso.
+
+    Las líneas corruptas (una escritura cortada por el crash) se ignoran al
+    cargar; el último resultado de una URL gana.
+    """
+
+    def __init__(self, path: str | Path, *, sync_every: int = 32) -> None:
+        self.path = Path(path)
+        self.sync_every = max(1, sync_every)
+        self._handle: Optional[IO[str]] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._log = get_logger('journal')
+
+    @classmethod
+    def for_config(cls, config: DownloadConfig) -> 'BatchJournal':
+        return cls(journal_path_for(config))
+
+    def load(self) -> dict[str, DownloadResult]:
+        """Último resultado registrado por URL."""
+        results: dict[str, DownloadResult] = {}
+        if not self.path.exists():
+            return results
+        with self.path.open(encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                    result = DownloadResult(
+                        **{k: v for k, v in record.items() if k in _RESULT_FIELDS}
+                    )
+                except (ValueError, TypeError):
+                    continue
+                results[result.url] = result
+        return results
+
+    def finished(self) -> dict[str, DownloadResult]:
+        """Resultados del journal que no hace falta volver a programar."""
+        return {url: r for url, r in self.load().items() if is_finished(r)}
+
+    def open(self, *, resume: bool) -> 'BatchJournal':
+        """Abre el journal; sin `resume` empieza un lote nuevo (trunca)."""
+        with self._lock:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = self.path.open('a' if resume else 'w', encoding='utf-8')
+        return self
+
+    def record(self, result: DownloadResult) -> None:
+        with self._lock:
+            if self._handle is None:
+                return
+            try:
+                self._handle.write(json.dumps(asdict(result), ensure_ascii=False) + '\n')
+                self._handle.flush()
+                self._pending += 1
+                if self._pending >= self.sync_every:
+                    self._sync()
+            except OSError:
+                self._log.warning('No se pudo escribir en el journal %s.', self.path)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is None:
+                return
+            try:
+                self._sync()
+            except OSError:  # pragma: no cover — disco lleno / desmontado
+                self._log.warning('No se pudo sincronizar el journal %s.', self.path)
+            finally:
+                self._handle.close()
+                self._handle = None
+
+    def _sync(self) -> None:
+        assert self._handle is not None
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._pending = 0
@@ -0,0 +1,219 @@
+"""Caché de info dicts de `extract_info` por ID de video, en memoria y en disco.
+
+Dos caducidades: las URLs de formatos de YouTube expiran en pocas horas
+(`format_ttl`), pero título, duración, canal… apenas cambian, así que una
+entrada más vieja todavía sirve sin formatos (`info_ttl`) para comprobar si
+el archivo ya existe o para validar que el video está disponible.
+
+En disco cada entrada es un JSON `<id>.json`; el tamaño total se limita
+expulsando las de acceso más antiguo (mtime, que se actualiza en cada
+acierto). En memoria se guardan las `memory_entries` más recientes, también
+como JSON: cada acierto devuelve un dict nuevo, porque yt-dlp modifica el que
+recibe (`requested_downloads`, `filepath`, formatos elegidos…).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .config import DownloadConfig
+from .logger import get_logger
+
+CACHE_DIRNAME = '.bajador-metadata'
+
+# Caducan con las URLs firmadas: sin ellas no se puede descargar con la entrada.
+_VOLATILE_KEYS = frozenset({
+    'formats', 'requested_formats', 'requested_downloads', 'url', 'manifest_url',
+    'fragments', 'fragment_base_url', 'http_headers', 'format_id', 'format', 'protocol',
+})
+# Enormes y el downloader no los usa (no hay descarga de subtítulos).
+_DROPPED_KEYS = frozenset({'automatic_captions', 'subtitles'})
+
+
+def metadata_cache_dir_for(config: DownloadConfig) -> Path:
+    if config.metadata_cache_dir:
+        return Path(config.metadata_cache_dir)
+    return Path(config.output_folder) / CACHE_DIRNAME
+
+
+class MetadataCache:
+    """Info dicts por ID con TTL de dos niveles y expulsión LRU."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        format_ttl: float,
+        info_ttl: float,
+        max_bytes: int,
+        memory_entries: int = 128,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = Path(directory)
+        self.format_ttl = format_ttl
+        self.info_ttl = max(info_ttl, format_ttl)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._clock = clock
+        # ID → (fetched_at, info serializado); se decodifica en cada acierto.
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        # Tamaño en disco por ID, en orden de acceso (el primero es el más viejo).
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._log = get_logger('metacache')
+
+    @classmethod
+    def for_config(cls, config: DownloadConfig) -> 'MetadataCache':
+        return cls(
+            metadata_cache_dir_for(config),
+            format_ttl=config.metadata_format_ttl,
+            info_ttl=config.metadata_info_ttl,
+            max_bytes=config.metadata_cache_max_mb * 2**20,
+        ).load()
+
+    def __len__(self) -> int:
+        return len(self._disk)
+
+    def load(self) -> 'MetadataCache':
+        """Indexa los archivos existentes (solo stat, sin leer su contenido)."""
+        with self._lock:
+            self._memory.clear()
+            self._disk.clear()
+            self._disk_bytes = 0
+            if not self.directory.is_dir():
+                return self
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+            for _, video_id, size in sorted(entries):
+                self._disk[video_id] = size
+                self._disk_bytes += size
+        return self
+
+    def get(self, video_id: str, *, formats: bool = True) -> Optional[dict[str, Any]]:
+        """Info dict cacheado, o None si no hay o caducó.
+
+        Con `formats=False` se acepta una entrada cuyos formatos ya caducaron
+        y se devuelve sin los campos volátiles.
+        """
+        with self._lock:
+            entry = self._read(video_id)
+            if entry is None:
+                return None
+            fetched_at, info = entry
+            age = self._clock() - fetched_at
+            if age >= self.info_ttl:
+                self._remove(video_id)
+                return None
+            if age < self.format_ttl:
+                return info if formats else _stable(info)
+            return None if formats else _stable(info)
+
+    def put(self, video_id: str, info: dict[str, Any]) -> None:
+        info = {k: v for k, v in info.items() if k not in _DROPPED_KEYS}
+        fetched_at = self._clock()
+        try:
+            encoded = json.dumps(info, ensure_ascii=False)
+        except (TypeError, ValueError):
+            self._log.debug('Info dict de %s no serializable; no se cachea.', video_id)
+            return
+        data = f'{{"fetched_at": {json.dumps(fetched_at)}, "info": {encoded}}}'
+        with self._lock:
+            self._remember(video_id, (fetched_at, encoded))
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                path = self._path(video_id)
+                tmp = path.with_name(path.name + '.tmp')
+                tmp.write_text(data, encoding='utf-8')
+                os.replace(tmp, path)
+            except OSError:
+                self._log.warning('No se pudo escribir la caché de metadatos en %s.', self.directory)
+                return
+            self._disk_bytes -= self._disk.pop(video_id, 0)
+            self._disk[video_id] = len(data.encode('utf-8'))
+            self._disk_bytes += self._disk[video_id]
+            self._evict()
+
+    def titles(self) -> dict[str, str]:
+        """ID → título de todas las entradas en disco, caducadas o no (el
+        título no caduca). Lee cada archivo: pensado para `--rebuild-archive`."""
+        with self._lock:
+            video_ids = list(self._disk)
+        titles: dict[str, str] = {}
+        for video_id in video_ids:
+            try:
+                title = json.loads(self._path(video_id).read_text(encoding='utf-8'))['info'].get('title')
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                continue
+            if isinstance(title, str) and title:
+                titles[video_id] = title
+        return titles
+
+    def discard(self, video_id: str) -> None:
+        with self._lock:
+            self._remove(video_id)
+
+    # ------------------------------------------------------------------ internos
+
+    def _path(self, video_id: str) -> Path:
+        return self.directory / f'{video_id}.json'
+
+    def _read(self, video_id: str) -> Optional[tuple[float, dict[str, Any]]]:
+        """(fetched_at, info) con un info dict recién decodificado, propiedad del llamador."""
+        entry = self._memory.get(video_id)
+        if entry is not None:
+            self._memory.move_to_end(video_id)
+            self._touch(video_id)
+            return entry[0], json.loads(entry[1])
+        if video_id not in self._disk:
+            return None
+        try:
+            record = json.loads(self._path(video_id).read_text(encoding='utf-8'))
+            fetched_at, info = float(record['fetched_at']), record['info']
+            encoded = json.dumps(info, ensure_ascii=False)
+        except (OSError, ValueError, KeyError, TypeError):
+            self._remove(video_id)
+            return None
+        self._remember(video_id, (fetched_at, encoded))
+        self._touch(video_id)
+        return fetched_at, info
+
+    def _remember(self, video_id: str, entry: tuple[float, str]) -> None:
+        self._memory[video_id] = entry
+        self._memory.move_to_end(video_id)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, video_id: str) -> None:
+        if video_id in self._disk:
+            self._disk.move_to_end(video_id)
+            try:
+                os.utime(self._path(video_id))
+            except OSError:
+                pass
+
+    def _remove(self, video_id: str) -> None:
+        self._memory.pop(video_id, None)
+        self._disk_bytes -= self._disk.pop(video_id, 0)
+        try:
+            self._path(video_id).unlink()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        while self._disk_bytes > self.max_bytes and len(self._disk) > 1:
+            oldest = next(iter(self._disk))
+            self._remove(oldest)
+
+
+def _stable(info: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in info.items() if k not in _VOLATILE_KEYS}
@@ -0,0 +1,212 @@
+"""Métricas del `Downloader` en formato de texto OpenMetrics (Prometheus).
+
+Los contadores se alimentan de los mismos eventos que `progress_callback`
+(cada resultado emitido) más los progress hooks de yt-dlp para los bytes en
+vivo; los gauges se leen al exportar. `MetricsExporter` las sirve en
+`http://127.0.0.1:<puerto>/metrics` y/o las reescribe cada pocos segundos en
+un archivo (para el textfile collector de node_exporter, por ejemplo).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .logger import get_logger
+from .models import DownloadResult
+from .timing import PHASES
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+STATUSES = ('success', 'skipped', 'invalid', 'error', 'cancelled')
+
+
+class DownloaderMetrics:
+    """Contadores y gauges thread-safe de un `Downloader`."""
+
+    #: Segundos de historia para el gauge de bytes por segundo.
+    rate_window = 10.0
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._results = dict.fromkeys(STATUSES, 0)
+        self._retries: dict[str, int] = {}
+        self._phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self._bytes = 0
+        self._samples: deque[tuple[float, int]] = deque()
+        self._gauges: dict[str, tuple[str, Callable[[], float]]] = {}
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Registra (o sustituye) un gauge que se lee al exportar."""
+        with self._lock:
+            self._gauges[name] = (help_text, read)
+
+    def observe(self, result: DownloadResult) -> None:
+        """Anota un resultado emitido."""
+        with self._lock:
+            self._results[result.status] = self._results.get(result.status, 0) + 1
+            for name in PHASES:
+                self._phase_seconds[name] += getattr(result, f'{name}_seconds') or 0.0
+
+    def retry(self, category: str) -> None:
+        with self._lock:
+            self._retries[category] = self._retries.get(category, 0) + 1
+
+    def add_bytes(self, count: int) -> None:
+        now = self._clock()
+        with self._lock:
+            self._bytes += count
+            self._samples.append((now, count))
+            self._trim(now)
+
+    def bytes_per_second(self) -> float:
+        now = self._clock()
+        with self._lock:
+            self._trim(now)
+            return sum(count for _, count in self._samples) / self.rate_window
+
+    def render(self) -> str:
+        """Exposición completa en texto OpenMetrics, terminada en `# EOF`."""
+        rate = self.bytes_per_second()
+        with self._lock:
+            results = dict(self._results)
+            retries = dict(self._retries)
+            phases = dict(self._phase_seconds)
+            downloaded = self._bytes
+            gauges = list(self._gauges.items())
+        lines: list[str] = []
+        _family(lines, 'bajador_results', 'counter', 'URLs terminadas por estado.',
+                [(f'_total{{status="{s}"}}', n) for s, n in sorted(results.items())])
+        _family(lines, 'bajador_retries', 'counter', 'Reintentos por categoría de error.',
+                [(f'_total{{category="{c}"}}', n) for c, n in sorted(retries.items())])
+        _family(lines, 'bajador_phase_seconds', 'counter', 'Segundos acumulados por fase de las URLs terminadas.',
+                [(f'_total{{phase="{p}"}}', s) for p, s in phases.items()])
+        _family(lines, 'bajador_downloaded_bytes', 'counter', 'Bytes transferidos.', [('_total', downloaded)])
+        _family(lines, 'bajador_download_bytes_per_second', 'gauge',
+                f'Bytes por segundo en los últimos {self.rate_window:g} s.', [('', rate)])
+        cpu = ffmpeg_cpu_seconds()
+        if cpu is not None:
+            _family(lines, 'bajador_ffmpeg_cpu_seconds', 'counter',
+                    'CPU de procesos hijo terminados (ffmpeg, ffprobe).', [('_total', cpu)])
+        for name, (help_text, read) in gauges:
+            try:
+                value = read()
+            except Exception:  # pragma: no cover — un gauge roto no tumba la exportación
+                continue
+            _family(lines, f'bajador_{name}', 'gauge', help_text, [('', value)])
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def _trim(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.rate_window:
+            self._samples.popleft()
+
+
+def ffmpeg_cpu_seconds() -> Optional[float]:
+    """CPU de usuario + sistema de los hijos ya esperados, o None sin `resource`."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _family(lines: list[str], name: str, kind: str, help_text: str, samples: list[tuple[str, Any]]) -> None:
+    lines.append(f'# TYPE {name} {kind}')
+    lines.append(f'# HELP {name} {help_text}')
+    for suffix, value in samples:
+        lines.append(f'{name}{suffix} {_number(value)}')
+
+
+def _number(value: float) -> str:
+    return str(value) if isinstance(value, int) else f'{value:.6g}'
+
+
+class MetricsExporter:
+    """Sirve `/metrics` en localhost y/o vuelca las métricas a un archivo."""
+
+    def __init__(
+        self,
+        metrics: DownloaderMetrics,
+        *,
+        port: int = 0,
+        path: Optional[str] = None,
+        interval: float = 15.0,
+        host: str = '127.0.0.1',
+    ) -> None:
+        self.metrics = metrics
+        self.path = Path(path) if path else None
+        self.interval = interval
+        self._stop = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._threads: list[threading.Thread] = []
+        self._log = get_logger('metrics')
+        if port:
+            self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            self._server.daemon_threads = True
+            self._server.metrics = metrics  # type: ignore[attr-defined]
+            self._spawn(self._server.serve_forever, 'bajador-metrics-http')
+            self._log.info('Métricas en http://%s:%d/metrics', host, self._server.server_address[1])
+        if self.path is not None:
+            self._spawn(self._write_loop, 'bajador-metrics-file')
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._server.server_address[1] if self._server is not None else None
+
+    def close(self) -> None:
+        """Detiene el servidor y deja el archivo con los valores finales."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        if self.path is not None:
+            self.write()
+
+    def write(self) -> None:
+        assert self.path is not None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            tmp.write_text(self.metrics.render(), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError:
+            self._log.warning('No se pudieron escribir las métricas en %s.', self.path)
+
+    def _spawn(self, target: Callable[[], None], name: str) -> None:
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _write_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode('utf-8')  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        get_logger('metrics').debug(format, *args)
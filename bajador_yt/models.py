@@ -11,6 +11,9 @@ class DownloadResult:
     """Resultado inmutable de intentar descargar una URL.
 
     status es uno de: 'success', 'skipped', 'invalid', 'error', 'cancelled'.
+
+    Los campos de tiempos, bytes e intentos solo se rellenan si la URL llegó
+    a tocar la red (ver `timing.UrlTimer`).
     """
 
     url: str
@@ -18,3 +21,42 @@ class DownloadResult:
     message: str
     output_path: Optional[str] = None
     category: Optional[str] = None
+    postprocess_seconds: Optional[float] = None
+    playlist_id: Optional[str] = None
+    resolve_seconds: Optional[float] = None
+    download_seconds: Optional[float] = None
+    wait_seconds: Optional[float] = None
+    bytes_downloaded: Optional[int] = None
+    attempts: Optional[int] = None
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Bytes por segundo durante la transferencia, o None si no hubo."""
+        if not self.bytes_downloaded or not self.download_seconds:
+            return None
+        return self.bytes_downloaded / self.download_seconds
+
+
+@dataclass(frozen=True)
+class ByteProgress:
+    """Progreso en bytes de un archivo en descarga (ver `progress_hooks` de yt-dlp).
+
+    `worker` es el nombre del hilo que descarga: permite pintar una línea
+    por worker. `total`, `speed` y `eta` pueden faltar si el servidor no da
+    tamaño. status es 'downloading' o 'finished'.
+    """
+
+    url: str
+    worker: str
+    status: str
+    downloaded: int
+    total: Optional[int] = None
+    speed: Optional[float] = None
+    eta: Optional[float] = None
+    filename: Optional[str] = None
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(1.0, self.downloaded / self.total)
@@ -0,0 +1,157 @@
+"""Pipeline por etapas conectadas con colas acotadas.
+
+Cada etapa tiene su propio pool de hilos, así la resolución de metadatos, la
+transferencia de red y el postprocesado con ffmpeg se solapan en lugar de
+compartir un único límite de concurrencia. Una etapa recibe `(url, payload)`
+y devuelve el payload de la siguiente o un `DownloadResult` si la URL ya
+terminó (error, saltada, cancelada…). La última etapa siempre termina.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from .errors import classify_error, user_friendly_message
+from .logger import get_logger
+from .models import DownloadResult
+
+StageFunc = Callable[[str, Any], Any]
+
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Etapa del pipeline: nombre (para logs), función y nº de workers."""
+
+    name: str
+    func: StageFunc
+    workers: int
+
+
+class StagedPipeline:
+    """Ejecuta URLs a través de varias etapas con backpressure entre ellas.
+
+    Las colas entre etapas tienen capacidad `queue_factor × workers` de la
+    etapa destino: si ffmpeg va por detrás, la red se frena en vez de llenar
+    el disco de archivos sin convertir.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        *,
+        cancelled: Callable[[], bool],
+        queue_factor: int = 2,
+    ) -> None:
+        if not stages:
+            raise ValueError('El pipeline necesita al menos una etapa.')
+        self.stages = list(stages)
+        self._cancelled = cancelled
+        self._queues: list[queue.Queue] = [
+            queue.Queue(maxsize=max(1, stage.workers * queue_factor)) for stage in self.stages
+        ]
+        self._results: queue.Queue = queue.Queue()
+        self._remaining = [stage.workers for stage in self.stages]
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._log = get_logger('pipeline')
+
+    def _stopped(self) -> bool:
+        return self._abort.is_set() or self._cancelled()
+
+    def run(self, urls: Iterable[str]) -> Iterator[DownloadResult]:
+        """Lanza los hilos y produce los resultados según van terminando."""
+        threads = [threading.Thread(target=self._feed, args=(urls,), name='pipeline-feed', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(index,), name=f'{stage.name}-{n}', daemon=True,
+                ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._results.get()
+                if item is _STOP:
+                    break
+                yield item
+        finally:
+            # Si el consumidor abandona el generador, las URLs pendientes se
+            # drenan como canceladas para que ningún hilo quede bloqueado.
+            self._abort.set()
+            while any(t.is_alive() for t in threads):
+                try:
+                    self._results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    def _feed(self, urls: Iterable[str]) -> None:
+        first = self._queues[0]
+        try:
+            pending = iter(urls)
+            # Se comprueba antes de leer: tras cancelar no se lee más entrada.
+            while not self._stopped():
+                url = next(pending, None)
+                if url is None:
+                    break
+                first.put((url, url))
+        except Exception:  # pragma: no cover — iterador de entrada roto
+            self._log.exception('Error leyendo las URLs de entrada.')
+        finally:
+            for _ in range(self.stages[0].workers):
+                first.put(_STOP)
+
+    def _work(self, index: int) -> None:
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        is_last = index == len(self.stages) - 1
+        try:
+            while True:
+                item = inbox.get()
+                if item is _STOP:
+                    break
+                url, payload = item
+                out = self._run_stage(stage, url, payload)
+                if isinstance(out, DownloadResult):
+                    self._results.put(out)
+                elif is_last:
+                    self._log.error('La etapa final %s no devolvió un resultado.', stage.name)
+                    self._results.put(DownloadResult(
+                        url=url, status='error', message='Resultado inesperado del pipeline.',
+                    ))
+                else:
+                    self._queues[index + 1].put((url, out))
+        finally:
+            with self._lock:
+                self._remaining[index] -= 1
+                last_worker = self._remaining[index] == 0
+            if last_worker:
+                if is_last:
+                    self._results.put(_STOP)
+                else:
+                    for _ in range(self.stages[index + 1].workers):
+                        self._queues[index + 1].put(_STOP)
+
+    def _run_stage(self, stage: Stage, url: str, payload: Any) -> Any:
+        if self._stopped():
+            return _cancelled(url)
+        try:
+            return stage.func(url, payload)
+        except Exception as exc:
+            self._log.exception('Fallo inesperado en la etapa %s (%s).', stage.name, url)
+            category = classify_error(exc)
+            return DownloadResult(
+                url=url,
+                status='error',
+                message=user_friendly_message(exc, category),
+                category=category,
+            )
+
+
+def _cancelled(url: str) -> DownloadResult:
+    return DownloadResult(url=url, status='cancelled', message='Cancelado.')
@@ -0,0 +1,57 @@
+"""Postprocesado (ffmpeg) en un pool de procesos de tamaño propio.
+
+Las funciones de este módulo se ejecutan dentro de los procesos hijos de un
+`ProcessPoolExecutor`: reciben opciones e info dict serializables y devuelven
+un `PostprocessOutcome`, nunca excepciones de yt-dlp (no siempre se pueden
+serializar de vuelta al proceso padre).
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import yt_dlp
+
+_WORKER_YDL: dict[str, Any] = {}
+
+
+@dataclass(frozen=True)
+class PostprocessOutcome:
+    """Resultado de un trabajo de postprocesado en un proceso hijo."""
+
+    info: Optional[dict[str, Any]]
+    seconds: float
+    error: Optional[str] = None
+
+
+def make_executor(workers: int) -> ProcessPoolExecutor:
+    """Pool con `spawn`: no hereda hilos ni locks del proceso que descarga."""
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+    )
+
+
+def serializable_info(info: dict[str, Any]) -> dict[str, Any]:
+    """Copia del info dict apta para pickle (sin hooks, PPs ni objetos vivos)."""
+    return yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=False)
+
+
+def run_postprocessors(opts: dict[str, Any], filepath: str, info: dict[str, Any]) -> PostprocessOutcome:
+    """Ejecuta los postprocessors de `opts` sobre `filepath` (proceso hijo)."""
+    start = time.perf_counter()
+    key = json.dumps(opts, sort_keys=True, default=str)
+    ydl = _WORKER_YDL.get(key)
+    if ydl is None:
+        ydl = _WORKER_YDL[key] = yt_dlp.YoutubeDL(opts)
+    try:
+        final = ydl.post_process(filepath, info)
+    except Exception as exc:
+        return PostprocessOutcome(
+            info=None, seconds=time.perf_counter() - start, error=f'Postprocessing: {exc}',
+        )
+    return PostprocessOutcome(info=serializable_info(final), seconds=time.perf_counter() - start)
@@ -0,0 +1,64 @@
+"""Progreso en bytes coalescido para CLI y GUI.
+
+yt-dlp llama a los progress hooks por cada bloque recibido (decenas de veces
+por segundo y por descarga). `ProgressGate` deja pasar como mucho una
+actualización por archivo cada `interval` segundos; las intermedias se
+descartan sin construir nada, y la final ('finished') pasa siempre.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .models import ByteProgress
+
+ByteProgressCallback = Callable[[ByteProgress], None]
+
+
+class ProgressGate:
+    """Limita la frecuencia de actualizaciones por clave (archivo)."""
+
+    def __init__(self, interval: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.interval = interval
+        self._clock = clock
+        self._last: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def due(self, key: str, *, final: bool = False) -> bool:
+        now = self._clock()
+        with self._lock:
+            if final:
+                self._last.pop(key, None)
+                return True
+            last = self._last.get(key)
+            if last is not None and now - last < self.interval:
+                return False
+            self._last[key] = now
+            return True
+
+
+def byte_progress(url: str, status: dict[str, Any], *, worker: Optional[str] = None) -> Optional[ByteProgress]:
+    """ByteProgress a partir del dict de un progress hook, o None si no aplica.
+
+    `worker` es por defecto el hilo actual; las descargas por rangos pasan el
+    del worker que las lanzó.
+    """
+    state = status.get('status')
+    if state not in ('downloading', 'finished'):
+        return None
+    downloaded = status.get('downloaded_bytes') or 0
+    total = status.get('total_bytes') or status.get('total_bytes_estimate')
+    if state == 'finished' and not total:
+        total = downloaded or None
+    return ByteProgress(
+        url=url,
+        worker=worker or threading.current_thread().name,
+        status=state,
+        downloaded=int(downloaded),
+        total=int(total) if total else None,
+        speed=status.get('speed'),
+        eta=status.get('eta'),
+        filename=status.get('filename'),
+    )
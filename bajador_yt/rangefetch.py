@@ -0,0 +1,197 @@
+"""Descarga HTTP por rangos, con varias conexiones por archivo.
+
+YouTube limita el throughput de cada conexión: pedir un archivo en trozos
+con `Range` desde varias conexiones a la vez suma el ancho de banda de todas.
+`fetch_files` descarga además todos los archivos de un elemento (el video y
+el audio de `bestvideo+bestaudio`) a la vez en lugar de uno tras otro.
+
+Las peticiones salen por el `opener` que pase el llamante; el downloader usa
+`YoutubeDL.urlopen`, con sus cookies, proxy y cabeceras. Si se conoce el
+tamaño (`filesize` del formato) no hace falta una petición previa para
+averiguarlo; cada trozo comprueba igualmente el total en `Content-Range`.
+
+Cada archivo se escribe en `<ruta>.part`, preasignado, y se renombra al
+completarse. Ante cualquier error se borran los `.part` y se propaga la
+excepción: el llamante decide si recurre al descargador de yt-dlp.
+"""
+
+from __future__ import annotations
+
+import http.client
+import itertools
+import os
+import threading
+import urllib.request
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Sequence
+
+from yt_dlp.networking.exceptions import RequestError
+
+#: Tamaño de cada petición con Range; el mismo trozo que usa yt-dlp con YouTube.
+CHUNK_SIZE = 10 * 1024 * 1024
+#: Reintentos de un trozo antes de dar el archivo por fallido.
+CHUNK_RETRIES = 2
+_BLOCK_SIZE = 64 * 1024
+
+#: Errores de red o de disco tras los que conviene volver al descargador de yt-dlp.
+FETCH_ERRORS = (OSError, http.client.HTTPException, RequestError)
+
+
+class RangeNotSupported(OSError):
+    """El servidor no respondió 206 a una petición con Range."""
+
+
+class SizeMismatch(OSError):
+    """El servidor indica un tamaño distinto del esperado."""
+
+
+class FetchCancelled(Exception):
+    """La descarga se interrumpió porque el llamante canceló."""
+
+
+@dataclass(frozen=True)
+class RemoteFile:
+    url: str
+    path: str
+    headers: dict[str, str] = field(default_factory=dict)
+    #: Tamaño conocido de antemano; None = se pregunta al servidor.
+    size: Optional[int] = None
+
+
+#: (archivo, bytes descargados, total) tras cada bloque escrito.
+Progress = Callable[[RemoteFile, int, int], None]
+Opener = Callable[[urllib.request.Request, float], Any]
+
+
+def _urlopen(request: urllib.request.Request, timeout: float) -> Any:
+    return urllib.request.urlopen(request, timeout=timeout)
+
+
+def _range_request(remote: RemoteFile, start: int, end: int) -> urllib.request.Request:
+    headers = dict(remote.headers)
+    headers['Range'] = f'bytes={start}-{end}'
+    # Sin compresión: los bytes del trozo tienen que ser los del archivo.
+    headers.setdefault('Accept-Encoding', 'identity')
+    return urllib.request.Request(remote.url, headers=headers)
+
+
+def content_length(remote: RemoteFile, *, opener: Opener = _urlopen, timeout: float = 30.0) -> int:
+    """Tamaño total según el `Content-Range` de una petición de un byte."""
+    with opener(_range_request(remote, 0, 0), timeout) as response:
+        if response.status != 206:
+            raise RangeNotSupported(f'{remote.url} respondió {response.status} a una petición con Range.')
+        total = _range_total(response)
+        if total is None:
+            raise RangeNotSupported(f'{remote.url} no indica el tamaño total en Content-Range.')
+        return total
+
+
+def _range_total(response: Any) -> Optional[int]:
+    _, _, total = (response.headers.get('Content-Range') or '').rpartition('/')
+    return int(total) if total.isdigit() else None
+
+
+def chunks(size: int, chunk_size: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """Rangos inclusivos `(inicio, fin)` que cubren `size` bytes."""
+    return [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)]
+
+
+def fetch_files(
+    files: Sequence[RemoteFile],
+    *,
+    connections: int,
+    progress: Optional[Progress] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    initializer: Optional[Callable[[], None]] = None,
+    opener: Opener = _urlopen,
+    timeout: float = 30.0,
+    chunk_size: int = CHUNK_SIZE,
+) -> list[int]:
+    """Descarga `files` a la vez con `connections` conexiones por archivo.
+
+    Los trozos se reparten intercalando archivos, así que el más pequeño
+    (normalmente el audio) no espera al grande; cuando acaba, sus conexiones
+    pasan a los demás. `initializer` corre en cada hilo del pool antes de su
+    primer trozo. Devuelve el tamaño de cada archivo.
+    """
+    sizes = [
+        remote.size if remote.size is not None else content_length(remote, opener=opener, timeout=timeout)
+        for remote in files
+    ]
+    parts = [remote.path + '.part' for remote in files]
+    done = [0] * len(files)
+    locks = [threading.Lock() for _ in files]
+    abort = threading.Event()
+
+    def stopped() -> bool:
+        if cancelled is not None and cancelled():
+            abort.set()
+        return abort.is_set()
+
+    def report(index: int, count: int) -> None:
+        # El lock por archivo mantiene el progreso creciente aunque lo
+        # escriban varias conexiones.
+        with locks[index]:
+            done[index] += count
+            if progress is not None:
+                progress(files[index], done[index], sizes[index])
+
+    def fetch_chunk(index: int, start: int, end: int) -> None:
+        offset = start
+        for attempt in range(CHUNK_RETRIES + 1):
+            try:
+                with opener(_range_request(files[index], offset, end), timeout) as response, \
+                        open(parts[index], 'r+b') as handle:
+                    if response.status != 206:
+                        raise RangeNotSupported(f'{files[index].url} ignoró el Range de un trozo.')
+                    total = _range_total(response)
+                    if total is not None and total != sizes[index]:
+                        raise SizeMismatch(f'{files[index].url} mide {total} bytes, no {sizes[index]}.')
+                    handle.seek(offset)
+                    while offset <= end:
+                        if stopped():
+                            raise FetchCancelled()
+                        block = response.read(min(_BLOCK_SIZE, end + 1 - offset))
+                        if not block:
+                            raise http.client.IncompleteRead(b'', end + 1 - offset)
+                        handle.write(block)
+                        offset += len(block)
+                        report(index, len(block))
+                return
+            except (RangeNotSupported, SizeMismatch, FetchCancelled):
+                raise
+            except FETCH_ERRORS:
+                if attempt == CHUNK_RETRIES or abort.is_set():
+                    raise
+
+    # Trozos de todos los archivos intercalados: 1.º de cada uno, 2.º de cada uno…
+    per_file = [[(index, start, end) for start, end in chunks(size, chunk_size)] for index, size in enumerate(sizes)]
+    jobs = [job for row in itertools.zip_longest(*per_file) for job in row if job is not None]
+    try:
+        for part, size in zip(parts, sizes):
+            os.makedirs(os.path.dirname(part) or '.', exist_ok=True)
+            with open(part, 'wb') as handle:
+                handle.truncate(size)
+        if jobs:
+            workers = min(len(jobs), connections * len(files))
+            with ThreadPoolExecutor(workers, thread_name_prefix='bajador-range', initializer=initializer) as pool:
+                futures = [pool.submit(fetch_chunk, *job) for job in jobs]
+                finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                failed = next((f for f in finished if f.exception() is not None), None)
+                if failed is not None:
+                    abort.set()
+                    pool.shutdown(cancel_futures=True)
+                    failed.result()
+        for part, remote in zip(parts, files):
+            os.replace(part, remote.path)
+    except BaseException:
+        abort.set()
+        for part in parts:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+        raise
+    return sizes
+
@@ -0,0 +1,126 @@
+"""Limitadores compartidos por todos los workers de un `Downloader`.
+
+Los limitadores no duermen: `reserve` descuenta tokens y devuelve cuántos
+segundos debe esperar el llamante, que duerme con su propio mecanismo
+interrumpible (así la cancelación sigue funcionando mientras se espera).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+from .logger import get_logger
+
+Clock = Callable[[], float]
+
+
+class TokenBucket:
+    """Token bucket thread-safe que admite deuda.
+
+    Una reserva mayor que la capacidad se concede igualmente y deja el saldo
+    en negativo: el llamante espera lo que tarda en saldarse. Así sirve tanto
+    para peticiones (1 token) como para trozos de bytes de tamaño variable.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        capacity: Optional[float] = None,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError('rate debe ser > 0.')
+        self._rate = float(rate)
+        self._capacity = float(capacity) if capacity is not None else max(1.0, self._rate)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill()
+            self._rate = float(rate)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Descuenta `tokens` y devuelve los segundos a esperar (0 si hay saldo)."""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._stamp) * self._rate)
+        self._stamp = now
+
+
+class AdaptiveRateLimiter:
+    """Peticiones por segundo con retroceso ante 403 y recuperación gradual.
+
+    Cada `forbidden` multiplica la tasa por `backoff` (como mucho una vez
+    por `cooldown` segundos, para que una ráfaga de 403 simultáneos cuente
+    como uno) sin bajar de `ceiling / 16`. Tras `recover_after` peticiones
+    seguidas sin 403 la tasa sube un `recovery` hasta volver a `ceiling`.
+    """
+
+    def __init__(
+        self,
+        ceiling: float,
+        *,
+        backoff: float = 0.5,
+        recovery: float = 1.25,
+        recover_after: int = 10,
+        cooldown: float = 2.0,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self.ceiling = float(ceiling)
+        self.floor = self.ceiling / 16
+        self.backoff = backoff
+        self.recovery = recovery
+        self.recover_after = recover_after
+        self.cooldown = cooldown
+        # Capacidad 1: peticiones espaciadas de forma uniforme, sin ráfagas.
+        self._bucket = TokenBucket(ceiling, capacity=1.0, clock=clock)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._streak = 0
+        self._last_backoff = float('-inf')
+        self._log = get_logger('ratelimit')
+
+    @property
+    def rate(self) -> float:
+        return self._bucket.rate
+
+    def reserve(self) -> float:
+        return self._bucket.reserve(1.0)
+
+    def record(self, category: Optional[str]) -> None:
+        """Anota el resultado de una petición (`None` = éxito)."""
+        with self._lock:
+            if category == 'forbidden':
+                self._streak = 0
+                now = self._clock()
+                if now - self._last_backoff < self.cooldown:
+                    return
+                self._last_backoff = now
+                rate = max(self.floor, self.rate * self.backoff)
+                if rate < self.rate:
+                    self._bucket.set_rate(rate)
+                    self._log.warning('HTTP 403: se reduce el ritmo a %.2f peticiones/s.', rate)
+                return
+            self._streak += 1
+            if self._streak >= self.recover_after and self.rate < self.ceiling:
+                self._streak = 0
+                rate = min(self.ceiling, self.rate * self.recovery)
+                self._bucket.set_rate(rate)
+                self._log.info('Sin 403 recientes: ritmo subido a %.2f peticiones/s.', rate)
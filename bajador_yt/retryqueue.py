@@ -0,0 +1,60 @@
+"""Cola de reintentos diferidos de `download_many`.
+
+Un fallo recuperable no duerme en el worker: la URL entra en un heap
+ordenado por el instante en que vence su backoff y el worker sigue con la
+siguiente. El bucle de `download_many` vuelve a enviar las que han vencido
+antes de leer trabajo nuevo de la entrada.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from typing import Callable, NamedTuple, Optional
+
+
+class Retry(NamedTuple):
+    url: str
+    #: Número del intento que toca ejecutar.
+    attempt: int
+    #: Segundos que pasó en la cola.
+    waited: float
+
+
+class RetryQueue:
+    """Heap de URLs pendientes de reintento; no es thread-safe."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._heap: list[tuple[float, int, str, int, float]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, url: str, attempt: int, delay: float) -> None:
+        now = self._clock()
+        heapq.heappush(self._heap, (now + delay, next(self._seq), url, attempt, now))
+
+    def next_due_in(self) -> Optional[float]:
+        """Segundos hasta el próximo vencimiento (0 si ya hay alguno), o None si está vacía."""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self._clock())
+
+    def pop_due(self, limit: int) -> list[Retry]:
+        """Saca hasta `limit` reintentos vencidos, el más antiguo primero."""
+        now = self._clock()
+        due: list[Retry] = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            _, _, url, attempt, queued = heapq.heappop(self._heap)
+            due.append(Retry(url, attempt, now - queued))
+        return due
+
+    def drain(self) -> list[Retry]:
+        """Vacía la cola (al cancelar) sin mirar vencimientos."""
+        now = self._clock()
+        pending = [Retry(url, attempt, now - queued) for _, _, url, attempt, queued in sorted(self._heap)]
+        self._heap.clear()
+        return pending
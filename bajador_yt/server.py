@@ -0,0 +1,479 @@
+"""Modo servidor: un `Downloader` persistente detrás de una API HTTP local.
+
+Cada invocación del CLI arranca un proceso, importa yt-dlp, busca ffmpeg y
+recarga cookies. Con `--serve` todo eso se hace una vez: los lotes que se
+envían (p. ej. desde cron) comparten las instancias de YoutubeDL ya creadas,
+la caché de metadatos y un único límite de concurrencia y de ritmo.
+
+Cada URL pasa por `Downloader.download_attempt` en uno de
+`parallel_downloads` workers; las URLs de todos los trabajos esperan en una
+cola FIFO común. Un reintento con backoff vuelve a la cola cuando vence, sin
+ocupar un worker mientras espera. Con el circuit breaker abierto los workers
+no sacan URLs de la cola, y si aborta (entorno roto) lo pendiente sale como
+cancelado sin tocar la red; el siguiente trabajo, sin otros en curso, vuelve
+a intentarlo. El modo pipeline y el journal no aplican: los resultados se
+guardan en memoria por trabajo y se consultan o se siguen en streaming por
+HTTP.
+
+Rutas::
+
+    POST   /jobs               {"urls": [...]} → 202 con el trabajo creado
+    GET    /jobs               resumen de los trabajos
+    GET    /jobs/<id>          resumen y resultados de un trabajo
+    GET    /jobs/<id>/results  resultados en NDJSON según terminan
+    DELETE /jobs/<id>          cancela las URLs aún no empezadas
+    GET    /status             workers, profundidad de la cola y trabajos
+    GET    /metrics            métricas OpenMetrics del `Downloader`
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from .config import DownloadConfig
+from .downloader import Batch, Downloader, RetryLater
+from .errors import classify_error
+from .logger import get_logger
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .models import DownloadResult
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Cuerpo máximo de un POST /jobs: sobra para decenas de miles de URLs.
+MAX_BODY_BYTES = 8 * 2**20
+
+
+class Job:
+    """URLs enviadas en un POST y sus resultados según van terminando."""
+
+    def __init__(self, job_id: str) -> None:
+        self.id = job_id
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.results: list[DownloadResult] = []
+        self.cancelled = False
+        self._batch: Optional[Batch] = None
+        self._queued = 0
+        self._fed = False
+        self._cond = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        with self._cond:
+            return self.finished_at is not None
+
+    def summary(self, *, results: bool = False) -> dict[str, Any]:
+        with self._cond:
+            counts: dict[str, int] = {}
+            for result in self.results:
+                counts[result.status] = counts.get(result.status, 0) + 1
+            data: dict[str, Any] = {
+                'id': self.id,
+                'state': self._state(),
+                'created_at': self.created_at,
+                'finished_at': self.finished_at,
+                'queued': self._queued,
+                'completed': len(self.results),
+                'counts': counts,
+            }
+            if results:
+                data['results'] = [asdict(r) for r in self.results]
+            return data
+
+    def follow(self, timeout: Optional[float] = None) -> Iterator[DownloadResult]:
+        """Produce todos los resultados, esperando los que faltan hasta que termina."""
+        seen = 0
+        while True:
+            with self._cond:
+                while seen == len(self.results) and self.finished_at is None:
+                    if not self._cond.wait(timeout):
+                        return
+                fresh = self.results[seen:]
+                finished = self.finished_at is not None
+            yield from fresh
+            seen += len(fresh)
+            if finished and seen == len(self.results):
+                return
+
+    # Los métodos siguientes devuelven True si con esa llamada el trabajo terminó.
+
+    def _expect(self) -> None:
+        with self._cond:
+            self._queued += 1
+
+    def _add(self, result: DownloadResult, *, queued: bool) -> bool:
+        with self._cond:
+            self.results.append(result)
+            if queued:
+                self._queued -= 1
+            return self._settle()
+
+    def _sealed(self) -> bool:
+        with self._cond:
+            self._fed = True
+            return self._settle()
+
+    def _settle(self) -> bool:
+        self._cond.notify_all()
+        if self.finished_at is None and self._fed and self._queued == 0:
+            self.finished_at = time.time()
+            return True
+        return False
+
+    def _state(self) -> str:
+        if self.finished_at is not None:
+            return 'cancelled' if self.cancelled else 'finished'
+        return 'cancelling' if self.cancelled else 'running'
+
+
+class DownloadService:
+    """Cola de URLs compartida por todos los trabajos y workers de larga vida.
+
+    Uso::
+
+        with DownloadService(config) as service:
+            job = service.submit(urls)
+            for result in job.follow():
+                ...
+    """
+
+    #: Trabajos terminados que se conservan para consultarlos; los más
+    #: antiguos se olvidan.
+    keep_finished = 100
+
+    def __init__(self, config: DownloadConfig) -> None:
+        self.config = config
+        self._cancel = threading.Event()
+        self._downloader = Downloader(config, cancel_event=self._cancel)
+        # (trabajo, URL, nº de intento, backoff ya esperado)
+        self._queue: queue.Queue[Optional[tuple[Job, str, int, float]]] = queue.Queue()
+        self._retries: set[threading.Timer] = set()
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        self._log = get_logger('server')
+        self._downloader.metrics.gauge('queue_depth', 'URLs en cola sin empezar.', self._queue.qsize)
+        self._workers = [
+            threading.Thread(target=self._work, name=f'bajador-serve-{i}', daemon=True)
+            for i in range(config.parallel_downloads)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self) -> 'DownloadService':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Cancela lo pendiente, espera a los workers y libera el `Downloader`."""
+        if self._cancel.is_set():
+            return
+        self._cancel.set()
+        with self._lock:
+            retries, self._retries = self._retries, set()
+        for timer in retries:
+            # Sin esperar al backoff: el worker lo saca de la cola como cancelado.
+            timer.cancel()
+            timer.function(*timer.args)
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._downloader.close()
+
+    def submit(self, urls: Iterable[str]) -> Job:
+        """Crea un trabajo y encola sus URLs (expandiendo playlists) en segundo plano."""
+        if self._cancel.is_set():
+            raise RuntimeError('El servicio está cerrado.')
+        job = Job(uuid.uuid4().hex[:12])
+        # Un lote por trabajo: duplicados, playlists y sync como en
+        # `download_many`, pero sin journal (los resultados quedan en el trabajo).
+        job._batch = self._downloader.open_batch(journal=False)
+        with self._lock:
+            self._jobs[job.id] = job
+        threading.Thread(
+            target=self._feed, args=(job, list(urls)), name=f'bajador-feed-{job.id}', daemon=True,
+        ).start()
+        return job
+
+    def job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.job(job_id)
+        if job is not None:
+            job.cancelled = True
+        return job
+
+    def metrics(self) -> str:
+        return self._downloader.metrics.render()
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            active = self._active
+        running = sum(1 for job in jobs if not job.done)
+        return {
+            'workers': len(self._workers),
+            'active': active,
+            'queued': self._queue.qsize(),
+            'jobs': {'running': running, 'finished': len(jobs) - running},
+        }
+
+    # ------------------------------------------------------------------ internos
+
+    def _feed(self, job: Job, urls: list[str]) -> None:
+        assert job._batch is not None
+        queued = 0
+        try:
+            for item in job._batch.expand(urls):
+                if isinstance(item, DownloadResult):
+                    # Playlist que no se pudo listar: ya emitida.
+                    job._add(item, queued=False)
+                    continue
+                if job.cancelled or self._cancel.is_set():
+                    break
+                job._expect()
+                self._queue.put((job, item, 1, 0.0))
+                queued += 1
+        except Exception:  # pragma: no cover — red de seguridad
+            self._log.exception('Error al encolar el trabajo %s.', job.id)
+        finally:
+            self._log.info('Trabajo %s: %d URLs encoladas.', job.id, queued)
+            if job._sealed():
+                self._finished(job)
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job, url, attempt, waited = item
+            result = self._admit(job, url)
+            if result is None:
+                with self._lock:
+                    self._active += 1
+                try:
+                    outcome = self._downloader.download_attempt(url, attempt, waited)
+                except Exception as exc:  # pragma: no cover — download_attempt ya captura
+                    outcome = DownloadResult(
+                        url=url, status='error', message=str(exc), category=classify_error(exc),
+                    )
+                finally:
+                    with self._lock:
+                        self._active -= 1
+                if isinstance(outcome, RetryLater):
+                    self._retry_later(job, url, outcome)
+                    continue
+                result = outcome
+            assert job._batch is not None
+            if job._add(job._batch.emit(result), queued=True):
+                self._finished(job)
+
+    def _admit(self, job: Job, url: str) -> Optional[DownloadResult]:
+        """Espera turno en el circuit breaker; devuelve un resultado si la URL
+        ya no debe empezar (trabajo cancelado, servicio cerrado, lote abortado)."""
+        while True:
+            if job.cancelled or self._cancel.is_set():
+                return DownloadResult(url=url, status='cancelled', message='Cancelado.')
+            wait = self._downloader.admit(url)
+            if wait is None:
+                return self._downloader.stopped_result(url)
+            if not wait:
+                return None
+            # Circuito abierto: el worker no saca más URLs hasta que pase la pausa.
+            self._cancel.wait(min(wait, 1.0))
+
+    def _retry_later(self, job: Job, url: str, retry: RetryLater) -> None:
+        """Devuelve la URL a la cola cuando venza su backoff."""
+        def due() -> None:
+            with self._lock:
+                self._retries.discard(timer)
+            self._queue.put((job, url, retry.attempt, retry.delay))
+
+        timer = threading.Timer(retry.delay, due)
+        timer.daemon = True
+        with self._lock:
+            closing = self._cancel.is_set()
+            if not closing:
+                self._retries.add(timer)
+        if closing:
+            due()
+        else:
+            timer.start()
+
+    def _finished(self, job: Job) -> None:
+        summary = job.summary()
+        self._log.info('Trabajo %s terminado: %s.', job.id, summary['counts'])
+        if job._batch is not None:
+            job._batch.close()
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.done]
+            for old in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[old.id]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Traduce las rutas HTTP a llamadas sobre el `DownloadService` del servidor."""
+
+    server_version = 'bajador-yt'
+
+    @property
+    def service(self) -> DownloadService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def do_GET(self) -> None:
+        parts = self._route()
+        if parts == ['status']:
+            self._json(200, self.service.status())
+        elif parts == ['metrics']:
+            self._send(200, METRICS_CONTENT_TYPE, self.service.metrics().encode('utf-8'))
+        elif parts == ['jobs']:
+            self._json(200, [job.summary() for job in self.service.jobs()])
+        elif len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.service.job(parts[1])
+            if job is None:
+                self._json(404, {'error': f'No existe el trabajo {parts[1]}.'})
+            elif len(parts) == 2:
+                self._json(200, job.summary(results=True))
+            elif parts[2] == 'results':
+                self._stream(job)
+            else:
+                self._not_found()
+        else:
+            self._not_found()
+
+    def do_POST(self) -> None:
+        if self._route() != ['jobs']:
+            self._not_found()
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            self._json(413 if length > 0 else 400, {'error': 'Cuerpo vacío o demasiado grande.'})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length))
+            urls = payload['urls'] if isinstance(payload, dict) else payload
+            if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+                raise ValueError
+        except (ValueError, KeyError):
+            self._json(400, {'error': 'Se esperaba {"urls": ["https://...", ...]}.'})
+            return
+        try:
+            job = self.service.submit(urls)
+        except RuntimeError as exc:
+            self._json(503, {'error': str(exc)})
+            return
+        self._json(202, job.summary())
+
+    def do_DELETE(self) -> None:
+        parts = self._route()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            self._not_found()
+            return
+        job = self.service.cancel(parts[1])
+        if job is None:
+            self._json(404, {'error': f'No existe el trabajo {parts[1]}.'})
+        else:
+            self._json(200, job.summary())
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Sobre un socket Unix no hay dirección de cliente que mostrar.
+        get_logger('server').debug('%s %s', self.command, format % args)
+
+    def _route(self) -> list[str]:
+        return [part for part in self.path.split('?', 1)[0].split('/') if part]
+
+    def _json(self, code: int, data: Any) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self._send(code, 'application/json; charset=utf-8', body)
+
+    def _send(self, code: int, content_type: str, body: bytes) -> None:
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self) -> None:
+        self._json(404, {'error': 'Ruta no encontrada.'})
+
+    def _stream(self, job: Job) -> None:
+        """Una línea JSON por resultado; la respuesta termina con el trabajo."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.end_headers()
+        try:
+            for result in job.follow():
+                self.wfile.write(json.dumps(asdict(result), ensure_ascii=False).encode('utf-8') + b'\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+Server = Union[ThreadingHTTPServer, _UnixHTTPServer]
+
+
+def make_server(
+    service: DownloadService,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+) -> Server:
+    """Servidor HTTP sobre TCP o, con `socket_path`, sobre un socket Unix."""
+    server: Server
+    if socket_path is not None:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError('Este sistema no soporta sockets Unix; usa --host/--port.')
+        Path(socket_path).unlink(missing_ok=True)
+        server = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.service = service  # type: ignore[union-attr]
+    return server
+
+
+def serve(
+    config: DownloadConfig,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+) -> None:
+    """Atiende peticiones hasta Ctrl+C; al salir cancela lo pendiente."""
+    log = get_logger('server')
+    with DownloadService(config) as service:
+        server = make_server(service, host=host, port=port, socket_path=socket_path)
+        where = socket_path or 'http://%s:%d' % server.server_address[:2]
+        log.info('Sirviendo en %s con %d workers.', where, config.parallel_downloads)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            log.info('Deteniendo el servidor…')
+        finally:
+            server.server_close()
+            if socket_path is not None:
+                Path(socket_path).unlink(missing_ok=True)
@@ -0,0 +1,100 @@
+"""Estado del modo sync: IDs ya terminados por cada playlist o canal.
+
+Un JSON en la carpeta de salida que asocia la URL canónica de cada colección
+con los IDs de video que ya terminaron (descargados, saltados o con error
+definitivo). En la siguiente sincronización solo se planifican los IDs que
+no están aquí. Se reescribe entero y de forma atómica al final del lote.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .config import DownloadConfig
+from .logger import get_logger
+
+SYNC_STATE_FILENAME = '.bajador-sync.json'
+
+
+def sync_state_path_for(config: DownloadConfig) -> Path:
+    if config.sync_state_file:
+        return Path(config.sync_state_file)
+    return Path(config.output_folder) / SYNC_STATE_FILENAME
+
+
+class SyncState:
+    """Mapa URL de colección → IDs conocidos, respaldado por un JSON."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._known: dict[str, set[str]] = {}
+        self._synced_at: dict[str, float] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._log = get_logger('sync')
+
+    @classmethod
+    def for_config(cls, config: DownloadConfig) -> 'SyncState':
+        return cls(sync_state_path_for(config)).load()
+
+    def load(self) -> 'SyncState':
+        with self._lock:
+            self._known.clear()
+            self._synced_at.clear()
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+            except FileNotFoundError:
+                return self
+            except (OSError, ValueError):
+                self._log.warning('Estado de sync ilegible en %s; se empieza de cero.', self.path)
+                return self
+            for url, record in (data.get('collections') or {}).items():
+                try:
+                    self._known[url] = set(record['ids'])
+                    self._synced_at[url] = float(record.get('synced_at', 0))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return self
+
+    def known(self, url: str) -> frozenset[str]:
+        with self._lock:
+            return frozenset(self._known.get(url, ()))
+
+    def mark(self, url: str, video_id: str) -> None:
+        with self._lock:
+            ids = self._known.setdefault(url, set())
+            if video_id not in ids:
+                ids.add(video_id)
+                self._dirty = True
+
+    def touch(self, url: str) -> None:
+        """Registra que la colección se listó en esta ejecución."""
+        with self._lock:
+            self._known.setdefault(url, set())
+            self._synced_at[url] = time.time()
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data: dict[str, Any] = {
+                'collections': {
+                    url: {'synced_at': self._synced_at.get(url, 0), 'ids': sorted(ids)}
+                    for url, ids in self._known.items()
+                },
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + '.tmp')
+                tmp.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+                os.replace(tmp, self.path)
+            except OSError:
+                self._log.warning('No se pudo guardar el estado de sync en %s.', self.path)
+                return
+            self._dirty = False
@@ -0,0 +1,144 @@
+"""Tiempos por fase de cada URL y su agregado en percentiles.
+
+Fases: `resolve` (extract_info, incluida la espera del limitador de
+peticiones), `download` (transferencia), `postprocess` (ffmpeg y el resto de
+postprocessors) y `wait` (esperas de backoff entre reintentos). Cada URL
+acumula sus tiempos en un `UrlTimer` que el `Downloader` vuelca en el
+`DownloadResult` al emitirlo.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from .models import DownloadResult
+
+PHASES = ('resolve', 'download', 'postprocess', 'wait')
+PERCENTILES = (50, 90, 99)
+
+
+class UrlTimer:
+    """Segundos por fase, bytes descargados e intentos de una URL.
+
+    Los hooks de yt-dlp abren y cierran fases con `start`/`stop`; el código
+    propio usa `phase` como context manager.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.bytes = 0
+        self.attempts = 0
+        self._clock = clock
+        self._open: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.add(name, self._clock() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[name] += seconds
+
+    def start(self, name: str) -> None:
+        with self._lock:
+            self._open.setdefault(name, self._clock())
+
+    def stop(self, name: str) -> None:
+        with self._lock:
+            start = self._open.pop(name, None)
+            if start is not None:
+                self.seconds[name] += self._clock() - start
+
+    def attempt(self, number: int) -> None:
+        with self._lock:
+            self.attempts = max(self.attempts, number)
+
+    def add_bytes(self, count: int) -> None:
+        with self._lock:
+            self.bytes += count
+
+    def fields(self) -> dict[str, Any]:
+        """Campos de `DownloadResult`; las fases que no ocurrieron quedan en None."""
+        with self._lock:
+            seconds = {name: value or None for name, value in self.seconds.items()}
+            return {
+                'resolve_seconds': seconds['resolve'],
+                'download_seconds': seconds['download'],
+                'postprocess_seconds': seconds['postprocess'],
+                'wait_seconds': seconds['wait'],
+                'bytes_downloaded': self.bytes or None,
+                'attempts': self.attempts or None,
+            }
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentil por rango más cercano de `values` ya ordenados."""
+    if not values:
+        raise ValueError('percentile de una secuencia vacía.')
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def _distribution(values: Iterable[Optional[float]]) -> Optional[dict[str, float]]:
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return None
+    data = {f'p{q}': percentile(ordered, q) for q in PERCENTILES}
+    data['max'] = ordered[-1]
+    data['total'] = sum(ordered)
+    return data
+
+
+def summarize_performance(results: Iterable[DownloadResult]) -> dict[str, Any]:
+    """Percentiles por fase y de throughput, bytes totales y reintentos.
+
+    Solo cuentan los resultados que llegaron a tocar la red (con `attempts`).
+    """
+    timed = [r for r in results if r.attempts]
+    phases = {
+        name: _distribution(getattr(r, f'{name}_seconds') for r in timed)
+        for name in PHASES
+    }
+    return {
+        'count': len(timed),
+        'bytes': sum(r.bytes_downloaded or 0 for r in timed),
+        'retries': sum(r.attempts - 1 for r in timed),
+        'phases': {name: dist for name, dist in phases.items() if dist is not None},
+        'throughput': _distribution(r.throughput for r in timed),
+    }
+
+
+def format_performance(summary: dict[str, Any]) -> list[str]:
+    """Líneas legibles del resumen de `summarize_performance`."""
+    if not summary['count']:
+        return []
+    lines = [
+        f"Rendimiento — {summary['count']} URLs, {human_bytes(summary['bytes'])} "
+        f"descargados, {summary['retries']} reintentos",
+    ]
+    for name, dist in summary['phases'].items():
+        quantiles = ' '.join(f'p{q}={dist[f"p{q}"]:.1f}s' for q in PERCENTILES)
+        lines.append(f"  {name:<11} {quantiles} max={dist['max']:.1f}s total={dist['total']:.1f}s")
+    throughput = summary['throughput']
+    if throughput is not None:
+        quantiles = ' '.join(f'p{q}={human_bytes(throughput[f"p{q}"])}/s' for q in PERCENTILES)
+        lines.append(f'  {"throughput":<11} {quantiles}')
+    return lines
+
+
+def human_bytes(count: float) -> str:
+    """Tamaño legible en unidades binarias: '1.5 MiB'."""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if count < 1024 or unit == 'GiB':
+            return f'{count:.1f} {unit}' if unit != 'B' else f'{count:.0f} B'
+        count /= 1024
+    return f'{count:.1f} GiB'  # pragma: no cover — el bucle siempre retorna
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
-from urllib.parse import urlparse
+import re
+from typing import Iterable, Iterator, Optional
+from urllib.parse import parse_qs, urlparse
 
 from .constants import AUDIO_FORMATS, MODES, QUALITY_LEVELS, VIDEO_FORMATS
 
 _VALID_HOSTS_SUFFIX = ('youtube.com',)
 _VALID_HOSTS_EXACT = ('youtu.be',)
+_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_PLAYLIST_ID = re.compile(r'^[A-Za-z0-9_-]{2,64}$')
+_ID_PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
 
 
 def is_valid_youtube_url(url: str) -> bool:
@@ -25,6 +30,95 @@ def is_valid_youtube_url(url: str) -> bool:
     return any(host == suffix or host.endswith('.' + suffix) for suffix in _VALID_HOSTS_SUFFIX)
 
 
+def extract_video_id(url: str) -> Optional[str]:
+    """Devuelve el ID de 11 caracteres del video sin tocar la red, o None.
+
+    Reconoce `watch?v=`, `youtu.be/ID` y rutas `/shorts/`, `/embed/`, `/live/`.
+    """
+    if not is_valid_youtube_url(url):
+        return None
+    parsed = urlparse(url.strip())
+    parts = [p for p in parsed.path.split('/') if p]
+    candidate: Optional[str] = None
+    if parsed.netloc.lower() in _VALID_HOSTS_EXACT:
+        candidate = parts[0] if parts else None
+    elif parts and parts[0] == 'watch':
+        candidate = (parse_qs(parsed.query).get('v') or [None])[0]
+    elif len(parts) >= 2 and parts[0] in _ID_PATH_PREFIXES:
+        candidate = parts[1]
+    if candidate and _VIDEO_ID.match(candidate):
+        return candidate
+    return None
+
+
+def extract_playlist_id(url: str) -> Optional[str]:
+    """Devuelve el valor de `list=` si la URL de YouTube lo trae, o None."""
+    if not is_valid_youtube_url(url):
+        return None
+    candidate = (parse_qs(urlparse(url.strip()).query).get('list') or [None])[0]
+    if candidate and _PLAYLIST_ID.match(candidate):
+        return candidate
+    return None
+
+
+def canonical_youtube_url(url: str, *, allow_playlist: bool = False) -> Optional[str]:
+    """Forma canónica de la URL, o None si no se reconoce ni video ni playlist.
+
+    `watch?v=X&list=Y` cuenta como video salvo con `allow_playlist`, igual
+    que hace yt-dlp con `noplaylist`.
+    """
+    video_id = extract_video_id(url)
+    playlist_id = extract_playlist_id(url)
+    if playlist_id and (allow_playlist or video_id is None):
+        return f'https://www.youtube.com/playlist?list={playlist_id}'
+    if video_id:
+        return f'https://www.youtube.com/watch?v={video_id}'
+    return None
+
+
+class UrlDeduper:
+    """Filtro en streaming que normaliza y descarta URLs repetidas.
+
+    Solo guarda las formas canónicas ya vistas, así una lista de millones
+    de filas se puede procesar sin materializarla. `duplicates` cuenta lo
+    descartado hasta el momento.
+    """
+
+    def __init__(self, *, allow_playlist: bool = False) -> None:
+        self.allow_playlist = allow_playlist
+        self.duplicates = 0
+        self._seen: set[str] = set()
+
+    def admit(self, raw: Optional[str]) -> Optional[str]:
+        """Forma normalizada de `raw` si es nueva; None si está vacía o repetida."""
+        url = raw.strip() if raw else ''
+        if not url:
+            return None
+        url = canonical_youtube_url(url, allow_playlist=self.allow_playlist) or url
+        if url in self._seen:
+            self.duplicates += 1
+            return None
+        self._seen.add(url)
+        return url
+
+    def filter(self, urls: Iterable[str]) -> Iterator[str]:
+        for raw in urls:
+            url = self.admit(raw)
+            if url is not None:
+                yield url
+
+
+def dedupe_urls(urls: Iterable[str], *, allow_playlist: bool = False) -> tuple[list[str], int]:
+    """Normaliza y elimina duplicados conservando el orden.
+
+    Devuelve (urls únicas, nº de duplicados colapsados). Las URLs que no se
+    reconocen se comparan tal cual para que luego se reporten como inválidas.
+    """
+    deduper = UrlDeduper(allow_playlist=allow_playlist)
+    unique = list(deduper.filter(urls))
+    return unique, deduper.duplicates
+
+
 def is_supported_mode(mode: str) -> bool:
     return mode in MODES
 
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark: classify_error por tabla vs. la cadena de ifs anterior.
+
+Mide la precisión sobre el corpus de `tests/error_corpus.py` y el coste por
+llamada en dos escenarios: el corpus como texto (Exception simple) y una ola
+de 403 como la lanza yt-dlp (DownloadError con el HTTPError en `exc_info`).
+
+    python benchmarks/bench_classify_error.py [--rounds 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import yt_dlp  # noqa: E402
+from yt_dlp.networking import Response  # noqa: E402
+from yt_dlp.networking.exceptions import HTTPError  # noqa: E402
+
+from bajador_yt.errors import classify_error  # noqa: E402
+from tests.error_corpus import CORPUS  # noqa: E402
+
+
+def legacy_classify(exc: Optional[BaseException]) -> str:
+    """La implementación anterior, copiada tal cual para comparar."""
+    if exc is None:
+        return 'generic'
+    msg = str(exc).lower()
+
+    if 'private video' in msg or 'this video is private' in msg:
+        return 'private'
+    if 'has been removed' in msg or 'video unavailable' in msg or 'no longer available' in msg:
+        return 'unavailable'
+    if 'not available in your country' in msg or 'geo' in msg:
+        return 'geo_blocked'
+    if 'copyright' in msg:
+        return 'copyright'
+    if 'sign in to confirm your age' in msg or 'age-restricted' in msg or 'age restricted' in msg:
+        return 'age_restricted'
+    if 'could not copy' in msg and 'cookie' in msg:
+        return 'cookie_locked'
+    if 'please sign in' in msg or 'login required' in msg or 'requires authentication' in msg or 'use --cookies' in msg:
+        return 'login_required'
+    if 'http error 403' in msg or 'forbidden' in msg:
+        return 'forbidden'
+    if 'timed out' in msg or 'timeout' in msg:
+        return 'timeout'
+    if 'javascript runtime' in msg or 'no supported javascript' in msg:
+        return 'js_runtime'
+    if any(kw in msg for kw in (
+        'connection', 'connect', 'network', 'name or service not known',
+        'temporary failure in name resolution', 'unreachable',
+    )):
+        return 'network'
+    if ('postprocessing' in msg
+            or 'ffprobe' in msg
+            or ('ffmpeg' in msg and 'not found' in msg)):
+        return 'postprocessing'
+    if 'extractorerror' in msg or 'unable to extract' in msg:
+        return 'extractor'
+    return 'generic'
+
+
+def storm(count: int) -> list[BaseException]:
+    """Errores de una ola de 403: cada uno con su ID y el HTTPError original."""
+    errors = []
+    for i in range(count):
+        cause = HTTPError(Response(io.BytesIO(), 'https://rr1.googlevideo.com/videoplayback', {}, status=403))
+        errors.append(yt_dlp.utils.DownloadError(
+            f'ERROR: [youtube] {i:011d}: Unable to download webpage: HTTP Error 403: Forbidden',
+            exc_info=(type(cause), cause, None),
+        ))
+    return errors
+
+
+def per_call(classify: Callable[[BaseException], str], errors: list[BaseException], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for exc in errors:
+            classify(exc)
+    return (time.perf_counter() - start) / (rounds * len(errors))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = [Exception(message) for message, _ in CORPUS]
+    expected = [category for _, category in CORPUS]
+    wave = storm(len(corpus))
+    print(f'Corpus: {len(corpus)} mensajes, {args.rounds} rondas')
+    for name, classify in (('cadena de ifs', legacy_classify), ('tabla', classify_error)):
+        hits = sum(classify(exc) == want for exc, want in zip(corpus, expected))
+        text = per_call(classify, corpus, args.rounds)
+        wave_cost = per_call(classify, wave, args.rounds)
+        print(f'{name:<14} precisión {hits}/{len(corpus)}  texto {text * 1e6:5.2f} µs/llamada  '
+              f'ola de 403 {wave_cost * 1e6:5.2f} µs/llamada')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark: throughput agregado según las conexiones por archivo.
+
+Un servidor HTTP local sirve un "video" y un "audio" sintéticos con soporte
+de Range y limita cada conexión a `--per-connection` MiB/s, como hace
+YouTube. Se compara la descarga de yt-dlp sin prefetch (video y luego audio,
+una conexión cada uno) con `rangefetch.fetch_files` a la vez y con 1…N
+conexiones por archivo.
+
+    python benchmarks/bench_range_fetch.py [--video-mib 64] [--per-connection 8] [--max-connections 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bajador_yt.rangefetch import RemoteFile, fetch_files  # noqa: E402
+from bajador_yt.timing import human_bytes  # noqa: E402
+
+_BLOCK = 64 * 1024
+
+
+class ThrottledRangeHandler(BaseHTTPRequestHandler):
+    """Sirve rangos de archivos en memoria a `server.rate` bytes/s por conexión."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        body = self.server.files[self.path]  # type: ignore[attr-defined]
+        match = re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers.get('Range') or '')
+        start, end = (int(match[1]), int(match[2])) if match else (0, len(body) - 1)
+        self.send_response(206 if match else 200)
+        if match:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(body)}')
+        self.send_header('Content-Length', str(end + 1 - start))
+        self.end_headers()
+        rate = self.server.rate  # type: ignore[attr-defined]
+        began = time.perf_counter()
+        sent = 0
+        view = memoryview(body)[start:end + 1]
+        while sent < len(view):
+            block = view[sent:sent + _BLOCK]
+            self.wfile.write(block)
+            sent += len(block)
+            ahead = sent / rate - (time.perf_counter() - began)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def start_server(files: dict[str, bytes], rate: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottledRangeHandler)
+    server.daemon_threads = True
+    server.files = files  # type: ignore[attr-defined]
+    server.rate = rate  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench(remotes: list[RemoteFile], *, connections: int, together: bool, chunk_size: int) -> float:
+    start = time.perf_counter()
+    batches = [remotes] if together else [[remote] for remote in remotes]
+    for batch in batches:
+        fetch_files(batch, connections=connections, chunk_size=chunk_size)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--video-mib', type=int, default=64)
+    parser.add_argument('--audio-mib', type=int, default=8)
+    parser.add_argument('--per-connection', type=float, default=8.0, help='MiB/s por conexión')
+    parser.add_argument('--max-connections', type=int, default=8)
+    parser.add_argument('--chunk-mib', type=float, default=2.0)
+    args = parser.parse_args()
+
+    files = {'/video': bytes(args.video_mib * 2**20), '/audio': bytes(args.audio_mib * 2**20)}
+    total = sum(len(body) for body in files.values())
+    server = start_server(files, args.per_connection * 2**20)
+    base = 'http://127.0.0.1:%d' % server.server_address[1]
+    chunk_size = int(args.chunk_mib * 2**20)
+
+    print(f'Video {args.video_mib} MiB + audio {args.audio_mib} MiB, '
+          f'{args.per_connection:g} MiB/s por conexión')
+    with tempfile.TemporaryDirectory() as tmp:
+        remotes = [RemoteFile(base + name, str(Path(tmp) / name.strip('/'))) for name in files]
+        cases = [('secuencial (como yt-dlp)', 1, False)]
+        connections = 1
+        while connections <= args.max_connections:
+            cases.append((f'a la vez, {connections} conexión(es)', connections, True))
+            connections *= 2
+        baseline = None
+        for label, conns, together in cases:
+            elapsed = bench(remotes, connections=conns, together=together,
+                            chunk_size=chunk_size if conns > 1 else max(total, 1))
+            baseline = baseline or elapsed
+            print(f'{label:<28} {elapsed:6.2f} s  {human_bytes(total / elapsed)}/s  x{baseline / elapsed:.1f}')
+    server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark: memoria de download_many en paralelo con ventana vs. enviarlo todo.
+
+`download_one` está stubbeado (sin red ni YoutubeDL) y la entrada es un
+generador sintético: solo se mide lo que cuesta planificar el lote. La
+variante con ventana pasa además por la deduplicación y el journal de
+`download_many`. El pico se toma con tracemalloc, que ralentiza la
+ejecución; los tiempos son orientativos.
+
+    python benchmarks/bench_submit_window.py [--urls 1000000] [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bajador_yt.config import DownloadConfig  # noqa: E402
+from bajador_yt.downloader import Downloader  # noqa: E402
+from bajador_yt.models import DownloadResult  # noqa: E402
+
+_DONE = DownloadResult(url='', status='success', message='')
+
+
+def synthetic_urls(count: int) -> Iterator[str]:
+    for i in range(count):
+        yield f'https://youtu.be/{i:011d}'
+
+
+def stub_download_one(url: str) -> DownloadResult:
+    return _DONE
+
+
+def bench_submit_all(workers: int, count: int) -> tuple[float, int]:
+    """Planificación anterior: un future por URL antes de recoger resultados."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        future_map = {pool.submit(stub_download_one, url): url for url in synthetic_urls(count)}
+        for future in as_completed(future_map):
+            future.result()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_window(workers: int, count: int) -> tuple[float, int]:
+    with tempfile.TemporaryDirectory() as tmp:
+        config = DownloadConfig(
+            output_folder=tmp, skip_existing=False, parallel_downloads=workers,
+        )
+        downloader = Downloader(config)
+        downloader.download_one = stub_download_one  # type: ignore[method-assign]
+        tracemalloc.start()
+        start = time.perf_counter()
+        downloader.download_many(synthetic_urls(count))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        downloader.close()
+    return elapsed, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--urls', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    all_time, all_peak = bench_submit_all(args.workers, args.urls)
+    win_time, win_peak = bench_window(args.workers, args.urls)
+
+    print(f'URLs: {args.urls}  workers: {args.workers}')
+    print(f'Todo de golpe:  pico {all_peak / 2**20:8.1f} MiB  {all_time:7.1f} s')
+    print(f'Con ventana:    pico {win_peak / 2**20:8.1f} MiB  {win_time:7.1f} s')
+    print(f'Reducción de pico: x{all_peak / win_peak:.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Benchmark: coste por URL de construir un YoutubeDL por intento vs. reutilizarlo.
+
+El extractor está stubbeado (sin red): solo se mide la sobrecarga propia de
+YoutubeDL (opciones, postprocessors, director HTTP, cookie jar).
+
+    python benchmarks/bench_ydl_reuse.py [--urls 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import yt_dlp  # noqa: E402
+
+from bajador_yt import downloader as downloader_module  # noqa: E402
+from bajador_yt.config import DownloadConfig  # noqa: E402
+from bajador_yt.downloader import Downloader  # noqa: E402
+
+
+class StubbedYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL real con extracción y descarga reemplazadas por no-ops."""
+
+    def extract_info(self, url, download=True, **kwargs):
+        video_id = url[-11:]
+        # Fuerza la inicialización perezosa del director HTTP, como una petición real.
+        self._request_director  # noqa: B018
+        return {'id': video_id, 'title': video_id, 'ext': 'webm'}
+
+    def process_ie_result(self, ie_result, download=True, extra_info=None):
+        return ie_result
+
+
+def bench_fresh(config: DownloadConfig, urls: list[str]) -> float:
+    opts = Downloader(config)._build_ydl_opts()
+    start = time.perf_counter()
+    for url in urls:
+        with StubbedYoutubeDL(opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+            ydl.prepare_filename(info)
+            ydl.process_ie_result(info, download=True)
+    return time.perf_counter() - start
+
+
+def bench_pooled(config: DownloadConfig, urls: list[str]) -> float:
+    downloader_module.yt_dlp.YoutubeDL = StubbedYoutubeDL
+    start = time.perf_counter()
+    with Downloader(config) as downloader:
+        for url in urls:
+            downloader.download_one(url)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--urls', type=int, default=200)
+    args = parser.parse_args()
+
+    urls = [f'https://youtu.be/{i:011d}' for i in range(args.urls)]
+    with tempfile.TemporaryDirectory() as tmp:
+        config = DownloadConfig(output_folder=tmp, skip_existing=False, write_metadata=True)
+        fresh = bench_fresh(config, urls)
+        pooled = bench_pooled(config, urls)
+
+    per_fresh = fresh / len(urls) * 1000
+    per_pooled = pooled / len(urls) * 1000
+    print(f'URLs: {len(urls)}')
+    print(f'YoutubeDL por intento: {per_fresh:8.3f} ms/URL')
+    print(f'YoutubeDL reutilizado: {per_pooled:8.3f} ms/URL')
+    print(f'Mejora: x{per_fresh / per_pooled:.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+"""Dobles compartidos por los tests de los frontends (servidor y asyncio)."""
+
+import threading
+import time
+from typing import Optional
+
+import pytest
+import yt_dlp
+
+from bajador_yt import downloader as downloader_module
+from bajador_yt.models import DownloadResult
+
+
+class FakeDownloadOne:
+    """Sustituto de `Downloader.download_one` que siempre sale bien.
+
+    Anota las URLs empezadas y el pico de llamadas simultáneas; si se le da
+    un `release`, cada llamada espera a que se active antes de terminar.
+    """
+
+    def __init__(self, release: Optional[threading.Event] = None) -> None:
+        self.release = release
+        self.started: list[str] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str) -> DownloadResult:
+        with self._lock:
+            self.started.append(url)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        if self.release is not None:
+            self.release.wait(5)
+        with self._lock:
+            self.active -= 1
+        return DownloadResult(url=url, status='success', message='')
+
+
+class FlakyYoutubeDL:
+    """Falla con los mensajes de `errors` por orden (None = sale bien) y luego
+    falla siempre con `error`, o sale bien si es None. `calls` guarda
+    `(id, instante)` de cada descarga intentada."""
+
+    sanitize_info = staticmethod(yt_dlp.YoutubeDL.sanitize_info)
+    errors: list = []
+    error: Optional[str] = None
+    calls: list = []
+
+    def __init__(self, opts) -> None:
+        self.opts = opts
+
+    def extract_info(self, url, download=False):
+        return {'id': url[-11:], 'title': url[-11:], 'ext': 'webm'}
+
+    def prepare_filename(self, info):
+        return f"{info['title']}.{info['ext']}"
+
+    def process_ie_result(self, info, download=True):
+        FlakyYoutubeDL.calls.append((info['id'], time.monotonic()))
+        error = FlakyYoutubeDL.errors.pop(0) if FlakyYoutubeDL.errors else FlakyYoutubeDL.error
+        if error:
+            raise yt_dlp.utils.DownloadError(error)
+        return info
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_download_one() -> FakeDownloadOne:
+    return FakeDownloadOne()
+
+
+@pytest.fixture
+def flaky_ydl(monkeypatch):
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', FlakyYoutubeDL)
+    monkeypatch.setattr(FlakyYoutubeDL, 'errors', [])
+    monkeypatch.setattr(FlakyYoutubeDL, 'error', None)
+    monkeypatch.setattr(FlakyYoutubeDL, 'calls', [])
+    return FlakyYoutubeDL
@@ -0,0 +1,45 @@
+"""Mensajes reales de yt-dlp con su categoría esperada.
+
+Lo usan `test_errors.py` (precisión) y `benchmarks/bench_classify_error.py`
+(velocidad).
+"""
+
+CORPUS: list[tuple[str, str]] = [
+    ("ERROR: [youtube] dQw4w9WgXcQ: Private video. Sign in if you've been granted access to this video",
+     'private'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video has been removed by the uploader', 'unavailable'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video is no longer available because the YouTube '
+     'account associated with this video has been terminated.', 'unavailable'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video contains content from SME, who has blocked it '
+     'on copyright grounds', 'unavailable'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: The uploader has not made this video available in your country', 'geo_blocked'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: This video is not available from your location', 'geo_blocked'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: Sign in to confirm your age. This video may be inappropriate for some users.',
+     'age_restricted'),
+    ("ERROR: [youtube] dQw4w9WgXcQ: Sign in to confirm you're not a bot. Use --cookies-from-browser or --cookies "
+     'for the authentication.', 'login_required'),
+    ('ERROR: Could not copy Chrome cookie database. See https://github.com/yt-dlp/yt-dlp/issues/7271 for more info',
+     'cookie_locked'),
+    ('ERROR: unable to download video data: HTTP Error 403: Forbidden', 'forbidden'),
+    # Un ID con "geo" no es un bloqueo regional.
+    ('ERROR: [youtube] aGeoQ9zLx0w: Unable to download webpage: HTTP Error 403: Forbidden', 'forbidden'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: Unable to download API page: HTTP Error 429: Too Many Requests', 'forbidden'),
+    ('ERROR: [download] Got error: The read operation timed out', 'timeout'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: Unable to download webpage: <urlopen error [Errno -3] Temporary failure in '
+     'name resolution>', 'network'),
+    ('ERROR: unable to download video data: [Errno 104] Connection reset by peer', 'network'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: n challenge solving failed: No supported JavaScript runtime could be found',
+     'js_runtime'),
+    ('ERROR: Postprocessing: audio conversion failed: Error opening input files: Invalid data found when '
+     'processing input', 'postprocessing'),
+    ('ERROR: Postprocessing: ffprobe and ffmpeg not found. Please install or provide the path using '
+     '--ffmpeg-location', 'postprocessing'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: Unable to extract initial player response; please report this issue on '
+     'https://github.com/yt-dlp/yt-dlp/issues', 'extractor'),
+    ('ERROR: [youtube:tab] UCuAXFkgsw1L7xaCfnd5JJOw: This channel does not have a videos tab', 'generic'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: Requested format is not available. Use --list-formats for a list of '
+     'available formats', 'generic'),
+    ('ERROR: unable to download video data: HTTP Error 404: Not Found', 'generic'),
+    ('ERROR: [generic] Unable to download webpage: HTTP Error 503: Service Unavailable', 'generic'),
+    ('ERROR: [youtube] dQw4w9WgXcQ: This live event will begin in 3 hours.', 'generic'),
+]
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+from bajador_yt.aio import AsyncDownloader
+from bajador_yt.config import DownloadConfig
+
+
+def test_async_download_many_yields_all_with_bounded_concurrency(tmp_path, fake_download_one) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=3)
+
+    async def main():
+        async with AsyncDownloader(cfg) as downloader:
+            downloader._downloader.download_one = fake_download_one
+
+            async def source():
+                for i in range(40):
+                    yield f'https://youtu.be/video{i:06d}'
+                    yield f'https://youtu.be/video{i:06d}'
+
+            return [r async for r in downloader.download_many(source())]
+
+    results = asyncio.run(main())
+    assert len(results) == 40
+    assert all(r.status == 'success' for r in results)
+    assert 1 <= fake_download_one.peak <= 3
+
+
+def test_async_cancellation_stops_batch(tmp_path, fake_download_one) -> None:
+    release = fake_download_one.release = threading.Event()
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=2)
+
+    async def main():
+        downloader = AsyncDownloader(cfg)
+        downloader._downloader.download_one = fake_download_one
+
+        async def consume():
+            return [r async for r in downloader.download_many(
+                [f'https://youtu.be/video{i:06d}' for i in range(100)]
+            )]
+
+        task = asyncio.create_task(consume())
+        while len(fake_download_one.started) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        release.set()
+        await downloader.aclose()
+        return downloader
+
+    downloader = asyncio.run(main())
+    assert len(fake_download_one.started) == 2
+    assert downloader._cancel.is_set()
+
+
+def test_async_expands_playlists_into_entries(tmp_path, monkeypatch, fake_download_one) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, allow_playlist=True, parallel_downloads=2)
+    listed: list[str] = []
+
+    def flat_entries(url, *, known=frozenset()):
+        listed.append(url)
+        return 'PLtest', [f'https://www.youtube.com/watch?v=video{i:06d}' for i in range(4)], 0
+
+    async def main():
+        async with AsyncDownloader(cfg) as downloader:
+            downloader._downloader.download_one = fake_download_one
+            monkeypatch.setattr(downloader._downloader, '_flat_entries', flat_entries)
+            results = [r async for r in downloader.download_many([
+                'https://www.youtube.com/watch?v=video000001',
+                'https://www.youtube.com/playlist?list=PLtest',
+            ])]
+            # La etiqueta de playlist no pasa a lotes posteriores de la misma instancia.
+            later = [r async for r in downloader.download_many(['https://www.youtube.com/watch?v=video000002'])]
+            return results, later
+
+    results, later = asyncio.run(main())
+    assert [r.playlist_id for r in later] == [None]
+    assert listed == ['https://www.youtube.com/playlist?list=PLtest']
+    assert sorted(r.url[-11:] for r in results) == [f'video{i:06d}' for i in range(4)]
+    assert {r.url[-11:]: r.playlist_id for r in results}['video000002'] == 'PLtest'
+
+
+def test_async_breaker_abort_stops_reading_input(tmp_path, flaky_ydl) -> None:
+    flaky_ydl.error = 'No supported JavaScript runtime could be found'
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=2)
+    read: list[str] = []
+
+    async def main():
+        async with AsyncDownloader(cfg) as downloader:
+            async def source():
+                for i in range(100):
+                    read.append(str(i))
+                    yield f'https://youtu.be/video{i:06d}'
+
+            return [r async for r in downloader.download_many(source())]
+
+    results = asyncio.run(main())
+    # Solo llegan a la red los fallos que abortan (y el que estaba en curso).
+    assert len(flaky_ydl.calls) <= 4
+    assert [r.status for r in results].count('error') == len(flaky_ydl.calls)
+    assert all(r.message.startswith('Lote abortado:') for r in results if r.status == 'cancelled')
+    assert len(read) < 10
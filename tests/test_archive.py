@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import yt_dlp
+
+from bajador_yt.archive import ArchiveIndex, archive_key, archive_path_for
+from bajador_yt.config import DownloadConfig
+from bajador_yt.downloader import LEGACY_OUTPUT_TEMPLATE, Downloader
+
+
+def test_archive_key_depends_on_format_and_quality() -> None:
+    mp3 = DownloadConfig(audio_format='mp3', audio_quality='192')
+    mp3_320 = DownloadConfig(audio_format='mp3', audio_quality='320')
+    video = DownloadConfig(mode='video', video_format='mkv')
+    keys = {archive_key('abcdefghijk', c) for c in (mp3, mp3_320, video)}
+    assert len(keys) == 3
+
+
+def test_archive_path_defaults_to_output_folder(tmp_path) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path))
+    assert archive_path_for(cfg).parent == tmp_path
+    custom = tmp_path / 'idx.jsonl'
+    assert archive_path_for(cfg.merged({'archive_file': str(custom)})) == custom
+
+
+def test_add_and_reload(tmp_path) -> None:
+    media = tmp_path / 'song.mp3'
+    media.write_text('')
+    index = ArchiveIndex(tmp_path / 'idx.jsonl').load()
+    index.add('k1', str(media))
+    reloaded = ArchiveIndex(tmp_path / 'idx.jsonl').load()
+    assert reloaded.lookup('k1') == str(media)
+    assert len(reloaded) == 1
+
+
+def test_lookup_ignores_missing_files(tmp_path) -> None:
+    index = ArchiveIndex(tmp_path / 'idx.jsonl').load()
+    index.add('k1', str(tmp_path / 'gone.mp3'))
+    assert index.lookup('k1') is None
+
+
+def test_load_skips_corrupt_lines(tmp_path) -> None:
+    media = tmp_path / 'a.mp3'
+    media.write_text('')
+    path = tmp_path / 'idx.jsonl'
+    path.write_text(
+        '{"key": "k1", "path": "%s"}\n{"key": "k2", "pa' % media.as_posix(),
+        encoding='utf-8',
+    )
+    index = ArchiveIndex(path).load()
+    assert index.lookup('k1') == media.as_posix()
+    assert 'k2' not in index
+
+
+def test_rebuild_from_output_folder(tmp_path) -> None:
+    (tmp_path / 'Song [dQw4w9WgXcQ].mp3').write_text('')
+    (tmp_path / 'Untagged.mp3').write_text('')
+    (tmp_path / 'Clip [abcdefghijk].mp4').write_text('')
+    cfg = DownloadConfig(output_folder=str(tmp_path))
+    index = ArchiveIndex(archive_path_for(cfg))
+    indexed, unmatched = index.rebuild(cfg)
+    assert (indexed, unmatched) == (1, 1)
+    key = archive_key('dQw4w9WgXcQ', cfg)
+    assert ArchiveIndex.for_config(cfg).lookup(key) == str(tmp_path / 'Song [dQw4w9WgXcQ].mp3')
+
+
+def test_rebuild_recognizes_default_output_names(tmp_path) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path))
+    with Downloader(cfg) as downloader:
+        opts = downloader._build_ydl_opts()
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        downloaded = ydl.prepare_filename({'id': 'dQw4w9WgXcQ', 'title': 'Never Gonna', 'ext': 'mp3'})
+    Path(downloaded).write_text('')
+
+    index = ArchiveIndex(archive_path_for(cfg))
+    assert index.rebuild(cfg) == (1, 0)
+    assert index.lookup(archive_key('dQw4w9WgXcQ', cfg)) == downloaded
+
+
+def test_rebuild_recognizes_legacy_names_by_title(tmp_path) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path))
+    with Downloader(cfg) as downloader:
+        opts = {**downloader._build_ydl_opts(), 'outtmpl': str(tmp_path / LEGACY_OUTPUT_TEMPLATE)}
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        downloaded = ydl.prepare_filename({'id': 'dQw4w9WgXcQ', 'title': 'Never Gonna: Live!', 'ext': 'mp3'})
+    Path(downloaded).write_text('')
+    (tmp_path / 'Otro.mp3').write_text('')
+
+    index = ArchiveIndex(archive_path_for(cfg))
+    assert index.rebuild(cfg, titles={'dQw4w9WgXcQ': 'Never Gonna: Live!', 'abcdefghijk': 'Otro video'}) == (1, 1)
+    assert index.lookup(archive_key('dQw4w9WgXcQ', cfg)) == downloaded
@@ -0,0 +1,85 @@
+from bajador_yt.breaker import CircuitBreaker
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_opens_on_forbidden_wave_and_closes_after_probe() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(10, cooldown=30.0, clock=clock)
+    for category in [None, 'private'] + ['forbidden'] * 3:
+        breaker.record(category)
+    assert breaker.state == 'closed'
+    for _ in range(5):
+        breaker.record('network')
+    assert breaker.state == 'open' and not breaker.ready()
+    assert breaker.retry_in() == 30.0
+
+    clock.now = 30.0
+    assert breaker.ready()
+    breaker.admit('https://youtu.be/a')
+    assert breaker.state == 'half_open' and not breaker.ready()
+    breaker.record(None)
+    assert breaker.state == 'closed' and breaker.ready()
+
+
+def test_failed_probe_doubles_cooldown_and_silent_probe_is_released() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(4, cooldown=10.0, max_cooldown=15.0, clock=clock)
+    for _ in range(4):
+        breaker.record('forbidden')
+    clock.now = 10.0
+    breaker.admit('a')
+    breaker.record('forbidden')
+    assert breaker.state == 'open' and breaker.retry_in() == 15.0
+
+    clock.now = 25.0
+    breaker.admit('b')
+    breaker.release('b')  # p. ej. ya estaba en el índice: no hizo peticiones
+    assert breaker.ready()
+    breaker.admit('c')
+    breaker.record('private')
+    assert breaker.ready() and breaker.state == 'half_open'
+
+
+def test_environment_failures_abort_until_reset() -> None:
+    breaker = CircuitBreaker(20)
+    for category in ('js_runtime', None, 'js_runtime', 'js_runtime'):
+        breaker.record(category)
+    assert breaker.aborted == 'js_runtime' and not breaker.ready()
+    assert breaker.retry_in() is None
+
+    breaker.reset()
+    assert breaker.aborted is None and breaker.ready()
+
+
+def test_postprocessing_aborts_only_when_consecutive() -> None:
+    breaker = CircuitBreaker(20)
+    # Streams corruptos o fusiones fallidas sueltas entre descargas buenas.
+    for category in ('postprocessing', None, 'postprocessing', 'private', 'postprocessing', None,
+                     'postprocessing', 'postprocessing', None):
+        breaker.record(category)
+    assert breaker.aborted is None and breaker.ready()
+
+    for _ in range(3):
+        breaker.record('postprocessing')
+    assert breaker.aborted == 'postprocessing'
+
+
+def test_try_admit_hands_out_a_single_probe() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(4, cooldown=10.0, clock=clock)
+    for _ in range(4):
+        breaker.record('forbidden')
+    assert not breaker.try_admit('a')
+
+    clock.now = 10.0
+    assert breaker.try_admit('a')
+    assert not breaker.try_admit('b')
+    breaker.record(None)
+    assert breaker.try_admit('b') and breaker.try_admit('c')
@@ -37,6 +37,46 @@ def test_validate_cookies_browser() -> None:
         DownloadConfig(cookies_from_browser='netscape').validate()
 
 
+def test_validate_postprocess_backend() -> None:
+    DownloadConfig(postprocess_backend='process').validate()
+    with pytest.raises(ConfigError):
+        DownloadConfig(postprocess_backend='gpu').validate()
+
+
+def test_validate_rate_limits() -> None:
+    DownloadConfig(requests_per_second=1.5, max_bytes_per_second=1024).validate()
+    with pytest.raises(ConfigError):
+        DownloadConfig(requests_per_second=-1).validate()
+
+
+def test_validate_sync_requires_playlists() -> None:
+    DownloadConfig(sync=True, allow_playlist=True).validate()
+    with pytest.raises(ConfigError):
+        DownloadConfig(sync=True).validate()
+
+
+def test_validate_metrics_options() -> None:
+    DownloadConfig(metrics_port=9464, metrics_interval=5).validate()
+    with pytest.raises(ConfigError):
+        DownloadConfig(metrics_port=70000).validate()
+    with pytest.raises(ConfigError):
+        DownloadConfig(metrics_interval=0).validate()
+
+
+def test_validate_connections_per_file() -> None:
+    DownloadConfig(connections_per_file=8).validate()
+    with pytest.raises(ConfigError):
+        DownloadConfig(connections_per_file=0).validate()
+
+
+def test_validate_breaker_options() -> None:
+    DownloadConfig(breaker_window=0).validate()
+    with pytest.raises(ConfigError):
+        DownloadConfig(breaker_window=-1).validate()
+    with pytest.raises(ConfigError):
+        DownloadConfig(breaker_cooldown=0).validate()
+
+
 def test_load_config_ok(tmp_path) -> None:
     path = tmp_path / 'config.json'
     path.write_text(
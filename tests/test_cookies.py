@@ -0,0 +1,118 @@
+import http.cookiejar
+
+import pytest
+import yt_dlp
+from yt_dlp.cookies import CookieLoadError, YoutubeDLCookieJar
+
+from bajador_yt import downloader as downloader_module
+from bajador_yt.config import DownloadConfig
+from bajador_yt.cookies import SharedCookieJar
+from bajador_yt.downloader import Downloader
+from bajador_yt.errors import classify_error
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cookie(name: str, value: str) -> http.cookiejar.Cookie:
+    return http.cookiejar.Cookie(
+        0, name, value, None, False, '.youtube.com', True, True, '/', True, True, None, False, None, None, {},
+    )
+
+
+class _Loader:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.error = None
+
+    def __call__(self, cookie_file, browser, ydl) -> YoutubeDLCookieJar:
+        self.calls += 1
+        if self.error is not None:
+            try:
+                raise self.error
+            except OSError:
+                raise CookieLoadError('failed to load cookies')
+        jar = YoutubeDLCookieJar()
+        jar.set_cookie(_cookie('SID', f'v{self.calls}'))
+        return jar
+
+
+def test_real_youtubedl_uses_the_shared_jar(tmp_path) -> None:
+    path = tmp_path / 'cookies.txt'
+    path.write_text(
+        '# Netscape HTTP Cookie File\n.youtube.com\tTRUE\t/\tTRUE\t0\tSID\tabc\n', encoding='utf-8',
+    )
+    cookies = SharedCookieJar(None, str(path))
+    first = cookies.new_ydl({'cookiefile': str(path), 'quiet': True})
+    second = cookies.new_ydl({'cookiefile': str(path), 'quiet': True})
+    assert first.cookiejar is second.cookiejar is cookies.jar()
+    assert 'SID=abc' in first.cookiejar.get_cookie_header('https://www.youtube.com/')
+    first.close()
+    second.close()
+    assert cookies.loads == 1
+
+
+def test_locked_database_surfaces_as_cookie_locked_and_is_retried() -> None:
+    loader = _Loader()
+    loader.error = PermissionError('Could not copy Chrome cookie database. See issue 7271 for more info')
+    cookies = SharedCookieJar('chrome', None, loader=loader)
+    with pytest.raises(yt_dlp.utils.DownloadError) as excinfo:
+        cookies.jar()
+    assert classify_error(excinfo.value) == 'cookie_locked'
+
+    loader.error = None
+    assert next(iter(cookies.jar())).value == 'v2'
+
+
+def test_refresh_reloads_in_place_at_most_once_per_interval() -> None:
+    clock = _Clock()
+    loader = _Loader()
+    cookies = SharedCookieJar('chrome', None, loader=loader, clock=clock)
+    assert not cookies.refresh()  # sin cargar aún no hay nada que refrescar
+    jar = cookies.jar()
+    clock.now += 1
+    assert not cookies.refresh()
+    clock.now += cookies.min_refresh_interval
+    assert cookies.refresh()
+    assert cookies.jar() is jar and [c.value for c in jar] == ['v2']
+
+
+class _StubYoutubeDL:
+    def __init__(self, opts) -> None:
+        self.opts = opts
+
+    def extract_info(self, url, download=False):
+        return {'id': url[-11:], 'title': url[-11:], 'ext': 'webm'}
+
+    def prepare_filename(self, info):
+        return info['title']
+
+    def process_ie_result(self, info, download=True):
+        if 'login' in info['id']:
+            raise yt_dlp.utils.DownloadError('ERROR: Sign in to confirm you’re not a bot. Please sign in')
+        return info
+
+    def close(self) -> None:
+        pass
+
+
+def test_workers_share_one_load_and_login_required_refreshes(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _StubYoutubeDL)
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=4,
+                         metadata_cache=False, cookies_from_browser='chrome')
+    loader = _Loader()
+    with Downloader(cfg) as downloader:
+        downloader._cookies._loader = loader
+        downloader._cookies.min_refresh_interval = 0.0
+        results = downloader.download_many([f'https://youtu.be/video{i:06d}' for i in range(8)])
+        assert loader.calls == 1
+        results += downloader.download_many(['https://youtu.be/login000001'])
+
+    assert [r.status for r in results] == ['success'] * 8 + ['error']
+    assert results[-1].category == 'login_required'
+    assert loader.calls == 2
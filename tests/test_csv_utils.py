@@ -1,6 +1,11 @@
 import pytest
 
-from bajador_yt.csv_utils import CsvFormatError, extract_links_from_csv, extract_links_from_text
+from bajador_yt.csv_utils import (
+    CsvFormatError,
+    extract_links_from_csv,
+    extract_links_from_text,
+    iter_links_from_csv,
+)
 
 
 def test_extract_links_from_text_basic() -> None:
@@ -32,3 +37,18 @@ def test_extract_links_from_csv_empty_rows_ignored(tmp_path) -> None:
     csv_file = tmp_path / 'urls.csv'
     csv_file.write_text('link\n\nhttps://youtu.be/abc\n   \n', encoding='utf-8')
     assert extract_links_from_csv(csv_file) == ['https://youtu.be/abc']
+
+
+def test_iter_links_from_csv_validates_header_eagerly(tmp_path) -> None:
+    csv_file = tmp_path / 'bad.csv'
+    csv_file.write_text('url\nhttps://youtu.be/abc\n', encoding='utf-8')
+    with pytest.raises(CsvFormatError):
+        iter_links_from_csv(csv_file)
+
+
+def test_iter_links_from_csv_is_lazy(tmp_path) -> None:
+    csv_file = tmp_path / 'urls.csv'
+    csv_file.write_text('link\nhttps://youtu.be/abc\n\nhttps://youtu.be/def\n', encoding='utf-8')
+    links = iter_links_from_csv(csv_file)
+    assert next(links) == 'https://youtu.be/abc'
+    assert list(links) == ['https://youtu.be/def']
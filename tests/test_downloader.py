@@ -0,0 +1,584 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import yt_dlp
+
+from bajador_yt import downloader as downloader_module
+from bajador_yt.archive import ArchiveIndex, archive_key
+from bajador_yt.config import DownloadConfig
+from bajador_yt.downloader import Downloader
+from bajador_yt.journal import BatchJournal
+from bajador_yt.models import DownloadResult
+
+
+class _ExplodingYoutubeDL:
+    def __init__(self, *args, **kwargs) -> None:
+        raise AssertionError('No debería construirse un YoutubeDL.')
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _ExplodingYoutubeDL)
+
+
+def test_archive_hit_skips_without_youtubedl(tmp_path, no_network) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path))
+    media = tmp_path / 'song.mp3'
+    media.write_text('')
+    ArchiveIndex.for_config(cfg).add(archive_key('dQw4w9WgXcQ', cfg), str(media))
+
+    result = Downloader(cfg).download_one('https://youtu.be/dQw4w9WgXcQ')
+    assert result.status == 'skipped'
+    assert result.output_path == str(media)
+
+
+def test_download_many_collapses_duplicates(tmp_path, no_network) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path))
+    media = tmp_path / 'song.mp3'
+    media.write_text('')
+    ArchiveIndex.for_config(cfg).add(archive_key('dQw4w9WgXcQ', cfg), str(media))
+
+    results = Downloader(cfg).download_many([
+        'https://youtu.be/dQw4w9WgXcQ',
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30',
+        'https://www.youtube.com/shorts/dQw4w9WgXcQ',
+    ])
+    assert [r.status for r in results] == ['skipped']
+
+
+def test_invalid_url_never_builds_youtubedl(tmp_path, no_network) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path))
+    result = Downloader(cfg).download_one('https://vimeo.com/1')
+    assert result.status == 'invalid'
+
+
+class _StubYoutubeDL:
+    instances: list['_StubYoutubeDL'] = []
+    sanitize_info = staticmethod(yt_dlp.YoutubeDL.sanitize_info)
+
+    def __init__(self, opts) -> None:
+        self.opts = opts
+        self.closed = False
+        self.calls = 0
+        self.postprocessed_infos: list = []
+        _StubYoutubeDL.instances.append(self)
+
+    def extract_info(self, url, download=False):
+        self.calls += 1
+        return {'id': url[-11:], 'title': url[-11:], 'ext': 'webm'}
+
+    def prepare_filename(self, info):
+        return self.opts['outtmpl'] % info
+
+    def process_ie_result(self, info, download=True):
+        if 'postprocessors' in self.opts:
+            return info
+        download = {**info, 'filepath': self.prepare_filename(info)}
+        # Como process_video_result: la descarga pierde lo copiado del info dict.
+        for key, value in list(download.items()):
+            if info.get(key) == value:
+                del download[key]
+        return {**info, 'requested_downloads': [download]}
+
+    def post_process(self, filename, info):
+        self.postprocessed = filename
+        self.postprocessed_infos.append(info)
+        final = filename.rsplit('.', 1)[0] + '.mp3'
+        open(final, 'w').close()
+        return {**info, 'filepath': final}
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def stub_ydl(monkeypatch):
+    _StubYoutubeDL.instances = []
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _StubYoutubeDL)
+    return _StubYoutubeDL
+
+
+def test_skip_recognizes_legacy_output_names(tmp_path, stub_ydl) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path))
+    # Descargado por una versión anterior, con `%(title)s.%(ext)s`.
+    legacy = tmp_path / 'video000001.mp3'
+    legacy.write_text('')
+    with Downloader(cfg) as downloader:
+        result = downloader.download_one('https://youtu.be/video000001')
+        assert downloader.download_one('https://youtu.be/video000001').message.endswith('(índice local).')
+
+    assert (result.status, result.output_path) == ('skipped', str(legacy))
+    assert sum(y.calls for y in stub_ydl.instances) == 1
+
+
+def test_youtubedl_reused_across_urls(tmp_path, stub_ydl) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False)
+    with Downloader(cfg) as downloader:
+        results = downloader.download_many(
+            [f'https://youtu.be/video{i:06d}' for i in range(5)]
+        )
+    assert [r.status for r in results] == ['success'] * 5
+    assert len(stub_ydl.instances) == 1
+    assert stub_ydl.instances[0].calls == 5
+    assert stub_ydl.instances[0].closed
+
+
+def test_parallel_pool_bounded_by_workers(tmp_path, stub_ydl) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=3)
+    downloader = Downloader(cfg)
+    downloader.download_many([f'https://youtu.be/video{i:06d}' for i in range(20)])
+    assert 1 <= len(stub_ydl.instances) <= 3
+    downloader.close()
+    assert all(ydl.closed for ydl in stub_ydl.instances)
+
+
+def test_pipeline_mode_separates_fetch_and_postprocess(tmp_path, stub_ydl) -> None:
+    cfg = DownloadConfig(
+        output_folder=str(tmp_path), skip_existing=False, pipeline=True,
+        fetch_workers=2, postprocess_workers=2,
+    )
+    with Downloader(cfg) as downloader:
+        results = downloader.download_many([f'https://youtu.be/video{i:06d}' for i in range(6)])
+    assert sorted(r.status for r in results) == ['success'] * 6
+    assert all(r.output_path and r.output_path.endswith('.mp3') for r in results)
+    fetchers = [y for y in stub_ydl.instances if 'postprocessors' not in y.opts]
+    assert fetchers and all(not hasattr(y, 'postprocessed') for y in fetchers)
+
+
+def test_pipeline_postprocess_and_archive_keep_video_metadata(tmp_path, stub_ydl) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path), pipeline=True)
+    urls = [f'https://youtu.be/video{i:06d}' for i in range(3)]
+    with Downloader(cfg) as downloader:
+        assert sorted(r.status for r in downloader.download_many(urls)) == ['success'] * 3
+
+    seen = [info for y in stub_ydl.instances for info in y.postprocessed_infos]
+    assert sorted(info['id'] for info in seen) == [url[-11:] for url in urls]
+    assert all(info['title'] and info['filepath'] for info in seen)
+    archive = ArchiveIndex.for_config(cfg)
+    assert all(archive.lookup(archive_key(url[-11:], cfg)) for url in urls)
+
+
+class _ExpiringYoutubeDL(_StubYoutubeDL):
+    """Cada extract_info firma URLs nuevas; las de la primera ya caducaron."""
+
+    resolved = 0
+
+    def extract_info(self, url, download=False):
+        _ExpiringYoutubeDL.resolved += 1
+        return {**super().extract_info(url, download), 'url': f'https://signed/{_ExpiringYoutubeDL.resolved}'}
+
+    def process_ie_result(self, info, download=True):
+        if info['url'] == 'https://signed/1':
+            raise yt_dlp.utils.DownloadError('HTTP Error 403: Forbidden')
+        return super().process_ie_result(info, download)
+
+
+def test_pipeline_fetch_resolves_again_after_403(tmp_path, monkeypatch) -> None:
+    _StubYoutubeDL.instances = []
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _ExpiringYoutubeDL)
+    monkeypatch.setattr(_ExpiringYoutubeDL, 'resolved', 0)
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, pipeline=True, retry_backoff=0.01)
+    with Downloader(cfg) as downloader:
+        [result] = downloader.download_many(['https://youtu.be/video000001'])
+
+    assert (result.status, result.attempts) == ('success', 2)
+    assert _ExpiringYoutubeDL.resolved == 2
+
+
+def test_process_backend_reports_postprocess_timing(tmp_path, stub_ydl, monkeypatch) -> None:
+    # Hilos en lugar de procesos: el stub no existe en un hijo `spawn`.
+    monkeypatch.setattr(
+        downloader_module.postprocess, 'make_executor', lambda workers: ThreadPoolExecutor(workers),
+    )
+    cfg = DownloadConfig(output_folder=str(tmp_path), postprocess_backend='process', postprocess_workers=2)
+    with Downloader(cfg) as downloader:
+        results = downloader.download_many([f'https://youtu.be/video{i:06d}' for i in range(4)])
+    assert sorted(r.status for r in results) == ['success'] * 4
+    assert all(r.output_path and r.output_path.endswith('.mp3') for r in results)
+    assert all(r.postprocess_seconds is not None and r.postprocess_seconds >= 0 for r in results)
+    archive = ArchiveIndex.for_config(cfg)
+    assert all(archive.lookup(archive_key(r.url[-11:], cfg)) for r in results)
+
+
+def test_resume_only_schedules_unfinished_urls(tmp_path, stub_ydl) -> None:
+    urls = [f'https://www.youtube.com/watch?v=video{i:06d}' for i in range(4)]
+    journal = BatchJournal.for_config(DownloadConfig(output_folder=str(tmp_path))).open(resume=False)
+    journal.record(DownloadResult(url=urls[0], status='success', message='ok'))
+    journal.record(DownloadResult(url=urls[1], status='error', message='', category='network'))
+    journal.close()
+
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, resume=True)
+    seen: list[tuple[str, int, int]] = []
+    with Downloader(cfg, progress_callback=lambda r, i, t: seen.append((r.url, i, t))) as downloader:
+        results = downloader.download_many(urls)
+
+    assert [r.status for r in results] == ['success'] * 4
+    assert stub_ydl.instances[0].calls == 3
+    assert [(i, t) for _, i, t in seen] == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    assert set(BatchJournal.for_config(cfg).finished()) == set(urls)
+
+
+def test_open_batch_expands_replays_and_emits(tmp_path) -> None:
+    urls = [f'https://www.youtube.com/watch?v=video{i:06d}' for i in range(3)]
+    journal = BatchJournal.for_config(DownloadConfig(output_folder=str(tmp_path))).open(resume=False)
+    journal.record(DownloadResult(url=urls[0], status='success', message='ok'))
+    journal.close()
+
+    cfg = DownloadConfig(output_folder=str(tmp_path), resume=True)
+    seen: list[tuple[str, int]] = []
+    with Downloader(cfg, progress_callback=lambda r, i, t: seen.append((r.status, i))) as downloader:
+        with downloader.open_batch() as batch:
+            items = list(batch.expand(urls + ['https://youtu.be/video000001']))
+            for url in items[1:]:
+                batch.emit(DownloadResult(url=url, status='success', message='nuevo'))
+
+    assert isinstance(items[0], DownloadResult) and items[0].message == 'ok'
+    assert items[1:] == urls[1:]
+    assert batch.deduper.duplicates == 1
+    assert seen == [('success', 1), ('success', 2), ('success', 3)]
+    assert set(BatchJournal.for_config(cfg).finished()) == set(urls)
+
+
+def test_download_many_streams_iterators(tmp_path, stub_ydl) -> None:
+    read: list[str] = []
+    seen: list[tuple[int, int]] = []
+
+    def source():
+        for i in range(4):
+            url = f'https://youtu.be/video{i:06d}'
+            read.append(url)
+            yield url
+            yield url
+
+    def progress(result, index, total):
+        seen.append((index, total))
+        # La primera URL termina antes de que se lea la segunda.
+        assert len(read) == index
+
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False)
+    with Downloader(cfg, progress_callback=progress) as downloader:
+        results = downloader.download_many(source())
+    assert [r.status for r in results] == ['success'] * 4
+    assert seen == [(1, 1), (2, 2), (3, 3), (4, 4)]
+
+
+def test_parallel_window_bounds_reads_and_stops_on_cancel(tmp_path, monkeypatch) -> None:
+    cancel = threading.Event()
+    read = 0
+    max_ahead = 0
+    done = 0
+
+    def source():
+        nonlocal read, max_ahead
+        for i in range(1000):
+            read += 1
+            max_ahead = max(max_ahead, read - done)
+            yield f'https://youtu.be/video{i:06d}'
+
+    def fake_download_one(url):
+        return DownloadResult(url=url, status='success', message='')
+
+    def progress(result, index, total):
+        nonlocal done
+        done += 1
+        if index == 50:
+            cancel.set()
+
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=3)
+    downloader = Downloader(cfg, progress_callback=progress, cancel_event=cancel)
+    monkeypatch.setattr(downloader, 'download_one', fake_download_one)
+    results = downloader.download_many(source())
+
+    window = 3 * Downloader.inflight_per_worker
+    assert max_ahead <= window + 1
+    # Tras cancelar no se lee más entrada ni se emite nada por lo no leído.
+    assert len(results) == read <= 50 + window
+    assert all(r.status == 'success' for r in results)
+
+
+def test_sequential_cancel_stops_reading_streamed_input(tmp_path, monkeypatch, caplog) -> None:
+    cancel = threading.Event()
+    read = 0
+
+    def source():
+        nonlocal read
+        for i in range(1_000_000):
+            read += 1
+            yield f'https://youtu.be/video{i:06d}'
+
+    def progress(result, index, total):
+        if index == 5:
+            cancel.set()
+
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False)
+    downloader = Downloader(cfg, progress_callback=progress, cancel_event=cancel)
+    monkeypatch.setattr(downloader, 'download_one', lambda url: DownloadResult(url=url, status='success', message=''))
+    results = downloader.download_many(source())
+
+    assert read == len(results) == 5
+    assert 'el resto de la entrada queda sin leer' in caplog.text
+
+
+def test_byte_limit_hook_is_shared_and_not_sent_to_postprocess_children(tmp_path) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path), max_bytes_per_second=1000)
+    downloader = Downloader(cfg)
+    slept: list[float] = []
+    downloader._sleep_interruptible = slept.append  # type: ignore[method-assign]
+
+    assert downloader._throttle_bytes in downloader._build_ydl_opts()['progress_hooks']
+    assert 'progress_hooks' not in downloader._postprocess_opts()
+    assert 'postprocessor_hooks' not in downloader._postprocess_opts()
+    for done in (1000, 2000, 3000):
+        downloader._throttle_bytes({'status': 'downloading', 'tmpfilename': 'a', 'downloaded_bytes': done})
+    assert slept[-1] == pytest.approx(2.0, abs=0.05)
+
+
+def test_metadata_cache_serves_rerun_skip_and_probe_offline(tmp_path, stub_ydl, monkeypatch) -> None:
+    url = 'https://www.youtube.com/watch?v=video000001'
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False)
+    with Downloader(cfg) as downloader:
+        assert downloader.download_one(url).status == 'success'
+    assert stub_ydl.instances[0].calls == 1
+    (tmp_path / 'video000001.mp3').write_text('')
+
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _OfflineYoutubeDL)
+    with Downloader(cfg.merged({'skip_existing': True, 'archive_file': str(tmp_path / 'other.jsonl')})) as downloader:
+        assert downloader.download_one(url).status == 'skipped'
+        probed = downloader.probe(url)
+    assert probed.status == 'success'
+    assert 'video000001' in probed.message
+
+
+class _MutatingYoutubeDL(_StubYoutubeDL):
+    """Como yt-dlp: process_ie_result modifica el info dict que recibe."""
+
+    seen: list[dict] = []
+
+    def process_ie_result(self, info, download=True):
+        _MutatingYoutubeDL.seen.append(dict(info))
+        result = super().process_ie_result(info, download)
+        info['requested_downloads'] = result.get('requested_downloads')
+        info['__postprocessors'] = ['usado']
+        return result
+
+
+def test_metadata_cache_hit_is_not_polluted_by_previous_download(tmp_path, monkeypatch) -> None:
+    _StubYoutubeDL.instances = []
+    _MutatingYoutubeDL.seen = []
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _MutatingYoutubeDL)
+    url = 'https://www.youtube.com/watch?v=video000001'
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False)
+    with Downloader(cfg) as downloader:
+        # La primera usa el dict de extract_info; las dos siguientes, la misma entrada cacheada.
+        for _ in range(3):
+            assert downloader.download_one(url).status == 'success'
+
+    assert sum(instance.calls for instance in _StubYoutubeDL.instances) == 1
+    assert len(_MutatingYoutubeDL.seen) == 3
+    for info in _MutatingYoutubeDL.seen[1:]:
+        assert 'requested_downloads' not in info
+        assert '__postprocessors' not in info
+
+
+class _OfflineYoutubeDL(_StubYoutubeDL):
+    def extract_info(self, url, download=False):
+        raise AssertionError('Debería salir de la caché de metadatos.')
+
+
+class _PlaylistYoutubeDL(_StubYoutubeDL):
+    def extract_info(self, url, download=False, process=True):
+        if 'list=' in url:
+            assert self.opts.get('extract_flat') == 'in_playlist'
+            assert process is False
+            entries = ({'ie_key': 'Youtube', 'id': f'video{i:06d}'} for i in range(5))
+            return {'_type': 'playlist', 'id': 'PLtest', 'entries': entries}
+        return super().extract_info(url, download)
+
+
+def test_playlist_expanded_into_entries(tmp_path, monkeypatch) -> None:
+    _StubYoutubeDL.instances = []
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _PlaylistYoutubeDL)
+    cfg = DownloadConfig(
+        output_folder=str(tmp_path), skip_existing=False, allow_playlist=True, parallel_downloads=3,
+    )
+    with Downloader(cfg) as downloader:
+        results = downloader.download_many([
+            'https://www.youtube.com/watch?v=video000002',
+            'https://www.youtube.com/playlist?list=PLtest',
+        ])
+
+    assert sorted(r.url[-11:] for r in results) == [f'video{i:06d}' for i in range(5)]
+    assert all(r.status == 'success' for r in results)
+    tags = {r.url[-11:]: r.playlist_id for r in results}
+    assert tags['video000002'] is None
+    assert {tags[f'video{i:06d}'] for i in (0, 1, 3, 4)} == {'PLtest'}
+
+
+class _ChannelYoutubeDL(_StubYoutubeDL):
+    uploads: list[str] = []
+    listed: list[str] = []
+
+    def extract_info(self, url, download=False, process=True):
+        if '/@' in url:
+            def entries():
+                for video_id in _ChannelYoutubeDL.uploads:
+                    _ChannelYoutubeDL.listed.append(video_id)
+                    yield {'ie_key': 'Youtube', 'id': video_id}
+            return {'_type': 'playlist', 'id': 'UCchannel', 'entries': entries()}
+        return super().extract_info(url, download)
+
+
+def test_sync_downloads_only_new_entries_and_stops_early(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _ChannelYoutubeDL)
+    monkeypatch.setattr(Downloader, 'sync_stop_after', 3)
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, allow_playlist=True, sync=True)
+    channel = 'https://www.youtube.com/@canal/videos'
+
+    _ChannelYoutubeDL.uploads = [f'video{i:06d}' for i in range(20, 0, -1)]
+    with Downloader(cfg) as downloader:
+        first = downloader.download_many([channel])
+    assert len(first) == 20
+
+    _ChannelYoutubeDL.uploads = ['video000022', 'video000021'] + _ChannelYoutubeDL.uploads
+    _ChannelYoutubeDL.listed = []
+    with Downloader(cfg) as downloader:
+        second = downloader.download_many([channel])
+    assert sorted(r.url[-11:] for r in second) == ['video000021', 'video000022']
+    assert all(r.playlist_id == 'UCchannel' for r in second)
+    assert len(_ChannelYoutubeDL.listed) == 5
+
+
+class _TimedYoutubeDL(_StubYoutubeDL):
+    """Dispara los hooks de progreso y de postprocesado como yt-dlp."""
+
+    fail_first = 0
+
+    def process_ie_result(self, info, download=True):
+        if _TimedYoutubeDL.fail_first:
+            _TimedYoutubeDL.fail_first -= 1
+            raise yt_dlp.utils.DownloadError('HTTP Error 503: Service Unavailable')
+        for hook in self.opts['progress_hooks']:
+            hook({'status': 'downloading', 'filename': 'f', 'downloaded_bytes': 500})
+            hook({'status': 'finished', 'filename': 'f', 'downloaded_bytes': 1000})
+        for hook in self.opts['postprocessor_hooks']:
+            hook({'status': 'started', 'postprocessor': 'ExtractAudio'})
+            hook({'status': 'finished', 'postprocessor': 'ExtractAudio'})
+        return info
+
+
+def test_results_carry_phase_timings_bytes_and_attempts(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _TimedYoutubeDL)
+    monkeypatch.setattr(_TimedYoutubeDL, 'fail_first', 1)
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, retry_backoff=0.01)
+    with Downloader(cfg) as downloader:
+        # El reintento se difiere: la segunda URL termina antes que la primera.
+        second, first = downloader.download_many(
+            ['https://youtu.be/video000001', 'https://youtu.be/video000002']
+        )
+        assert not downloader._timers
+
+    assert 'video000001' in first.url and 'video000002' in second.url
+
+    assert (first.attempts, second.attempts) == (2, 1)
+    assert first.wait_seconds and first.wait_seconds > 0 and second.wait_seconds is None
+    for result in (first, second):
+        assert result.bytes_downloaded == 1000
+        assert result.resolve_seconds and result.download_seconds and result.postprocess_seconds
+        assert result.throughput == pytest.approx(1000 / result.download_seconds)
+
+
+def test_backoff_does_not_pin_a_worker_and_cancel_drops_pending_retries(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _TimedYoutubeDL)
+    monkeypatch.setattr(_TimedYoutubeDL, 'fail_first', 1)
+    # Un backoff de varios segundos: si el worker durmiera, el test lo notaría.
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=2, retry_backoff=5.0)
+    cancel = threading.Event()
+
+    def on_result(result, index, total):
+        if index == 5:
+            cancel.set()
+
+    with Downloader(cfg, progress_callback=on_result, cancel_event=cancel) as downloader:
+        results = downloader.download_many([f'https://youtu.be/video{i:06d}' for i in range(6)])
+        assert not downloader._timers
+
+    assert [r.status for r in results] == ['success'] * 5 + ['cancelled']
+    assert results[-1].attempts == 1 and results[-1].wait_seconds < 1
+
+
+class _ChunkedYoutubeDL(_StubYoutubeDL):
+    def process_ie_result(self, info, download=True):
+        for hook in self.opts['progress_hooks']:
+            for done in range(0, 100_000, 1000):
+                hook({'status': 'downloading', 'filename': info['id'], 'downloaded_bytes': done,
+                      'total_bytes': 100_000})
+            hook({'status': 'finished', 'filename': info['id'], 'downloaded_bytes': 100_000,
+                  'total_bytes': 100_000})
+        return info
+
+
+def test_byte_progress_is_coalesced_per_file(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _ChunkedYoutubeDL)
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=2)
+    events = []
+    with Downloader(cfg, byte_progress_callback=events.append) as downloader:
+        downloader.download_many([f'https://youtu.be/video{i:06d}' for i in range(4)])
+
+    by_url = {}
+    for event in events:
+        by_url.setdefault(event.url, []).append(event)
+    assert len(by_url) == 4
+    for updates in by_url.values():
+        # 100 hooks por archivo se quedan en la primera y la final.
+        assert len(updates) <= 3
+        assert updates[-1].status == 'finished' and updates[-1].fraction == 1.0
+        assert all(u.worker for u in updates)
+
+
+class _BlockedYoutubeDL(_StubYoutubeDL):
+    """Responde 403 o falla por falta de runtime de JS según `error`."""
+
+    error = 'HTTP Error 403: Forbidden'
+    calls: list = []
+
+    def process_ie_result(self, info, download=True):
+        _BlockedYoutubeDL.calls.append(info['id'])
+        if _BlockedYoutubeDL.error:
+            raise yt_dlp.utils.DownloadError(_BlockedYoutubeDL.error)
+        return info
+
+
+def test_breaker_pauses_on_403_wave_and_resumes_after_probe(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _BlockedYoutubeDL)
+    monkeypatch.setattr(_BlockedYoutubeDL, 'calls', [])
+    monkeypatch.setattr(_BlockedYoutubeDL, 'error', 'HTTP Error 403: Forbidden')
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, max_retries=1,
+                         parallel_downloads=2, breaker_window=4, breaker_cooldown=0.3)
+
+    def on_result(result, index, total):
+        if index == 4:
+            # El bloqueo se levanta: la sonda saldrá bien y se reanuda el lote.
+            _BlockedYoutubeDL.error = None
+
+    with Downloader(cfg, progress_callback=on_result) as downloader:
+        results = downloader.download_many([f'https://youtu.be/video{i:06d}' for i in range(8)])
+        assert downloader._breaker.state == 'closed'
+
+    assert [r.status for r in results] == ['error'] * 4 + ['success'] * 4
+    # Con el circuito abierto no se envió nada: solo los 4 fallos y las 4 descargas.
+    assert len(_BlockedYoutubeDL.calls) == 8
+
+
+def test_breaker_aborts_batch_on_environment_failure(tmp_path, monkeypatch, caplog) -> None:
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _BlockedYoutubeDL)
+    monkeypatch.setattr(_BlockedYoutubeDL, 'calls', [])
+    monkeypatch.setattr(_BlockedYoutubeDL, 'error', 'No supported JavaScript runtime could be found')
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False)
+    with Downloader(cfg) as downloader:
+        results = downloader.download_many([f'https://youtu.be/video{i:06d}' for i in range(10)])
+
+    assert [r.status for r in results] == ['error'] * 3
+    assert all(r.category == 'js_runtime' for r in results)
+    assert '7 URLs de la entrada quedan sin leer' in caplog.text
+    assert len(_BlockedYoutubeDL.calls) == 3
@@ -1,6 +1,20 @@
+import socket
+import time
+import urllib.error
+
 import pytest
+import yt_dlp
+
+from bajador_yt.errors import (
+    MAX_RETRY_DELAY,
+    classify_error,
+    is_retryable,
+    needs_fresh_formats,
+    retry_delay,
+    user_friendly_message,
+)
 
-from bajador_yt.errors import classify_error, is_retryable, user_friendly_message
+from .error_corpus import CORPUS
 
 
 @pytest.mark.parametrize(
@@ -27,6 +41,39 @@ def test_classify_error(message: str, expected: str) -> None:
     assert classify_error(Exception(message)) == expected
 
 
+def test_classify_corpus_accuracy() -> None:
+    wrong = [(message, expected, classify_error(Exception(message)))
+             for message, expected in CORPUS if classify_error(Exception(message)) != expected]
+    assert wrong == []
+
+
+def test_classify_corpus_speed() -> None:
+    errors = [Exception(message) for message, _ in CORPUS]
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for exc in errors:
+            classify_error(exc)
+    per_call = (time.perf_counter() - start) / (rounds * len(errors))
+    # Holgura amplia para máquinas lentas; en local ronda 1 µs.
+    assert per_call < 50e-6
+
+
+def test_classify_by_type_and_status_before_text() -> None:
+    http_403 = urllib.error.HTTPError('https://x', 403, 'Forbidden', {}, None)
+    try:
+        raise yt_dlp.utils.DownloadError('ERROR: Video unavailable', exc_info=(type(http_403), http_403, None))
+    except yt_dlp.utils.DownloadError as exc:
+        wrapped = exc
+    assert classify_error(wrapped) == 'forbidden'
+    assert classify_error(yt_dlp.utils.GeoRestrictedError('blocked')) == 'geo_blocked'
+    assert classify_error(yt_dlp.utils.PostProcessingError('x')) == 'postprocessing'
+    assert classify_error(socket.timeout('x')) == 'timeout'
+    assert classify_error(ConnectionResetError('x')) == 'network'
+    # Un código sin categoría propia deja decidir al texto.
+    assert classify_error(urllib.error.HTTPError('https://x', 404, 'Video unavailable', {}, None)) == 'unavailable'
+
+
 def test_classify_none() -> None:
     assert classify_error(None) == 'generic'
 
@@ -37,6 +84,12 @@ def test_is_retryable_network_yes() -> None:
     assert is_retryable('forbidden')
 
 
+def test_only_403_needs_fresh_formats() -> None:
+    assert needs_fresh_formats(classify_error(Exception('HTTP Error 403: Forbidden')))
+    assert not needs_fresh_formats('network')
+    assert not needs_fresh_formats('timeout')
+
+
 def test_is_retryable_private_no() -> None:
     assert not is_retryable('private')
     assert not is_retryable('unavailable')
@@ -50,3 +103,11 @@ def test_user_friendly_message_contains_detail() -> None:
     msg = user_friendly_message(exc, 'network')
     assert 'red' in msg.lower()
     assert 'boom' in msg
+
+
+def test_retry_delay_jitter_and_category_scale() -> None:
+    assert retry_delay('network', 2, 2.0, rng=lambda: 0.0) == pytest.approx(2.0)
+    assert retry_delay('network', 2, 2.0, rng=lambda: 1.0) == pytest.approx(6.0)
+    assert retry_delay('network', 2, 2.0, jitter=0) == pytest.approx(4.0)
+    assert retry_delay('forbidden', 2, 2.0, jitter=0) == pytest.approx(16.0)
+    assert retry_delay('timeout', 50, 2.0, jitter=0) == MAX_RETRY_DELAY
@@ -1,7 +1,17 @@
+import os
 from pathlib import Path
 
+import pytest
+
 from bajador_yt import ffmpeg_utils
-from bajador_yt.ffmpeg_utils import detect_ffmpeg_path, validate_ffmpeg_path
+from bajador_yt.config import ConfigError, DownloadConfig
+from bajador_yt.ffmpeg_utils import (
+    check_audio_encoder,
+    detect_ffmpeg_path,
+    detect_ffprobe_path,
+    ffmpeg_capabilities,
+    validate_ffmpeg_path,
+)
 
 
 def test_validate_ffmpeg_path_none() -> None:
@@ -39,3 +49,93 @@ def test_detect_ffmpeg_returns_none_when_nothing(monkeypatch) -> None:
     monkeypatch.setattr(ffmpeg_utils.shutil, 'which', lambda _: None)
     monkeypatch.setattr(ffmpeg_utils.os.path, 'exists', lambda _: False)
     assert detect_ffmpeg_path() is None
+
+
+def test_detect_ffprobe_next_to_ffmpeg(tmp_path) -> None:
+    ffmpeg = tmp_path / 'ffmpeg'
+    ffprobe = tmp_path / 'ffprobe'
+    ffmpeg.write_text('')
+    ffprobe.write_text('')
+    assert detect_ffprobe_path(str(ffmpeg)) == str(ffprobe)
+
+
+_ENCODERS = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ A....D aac                  AAC (Advanced Audio Coding)
+ A....D libopus              libopus Opus (codec opus)
+ A....D pcm_s16le            PCM signed 16-bit little-endian
+"""
+
+
+class _Runner:
+    def __init__(self, encoders: str = _ENCODERS) -> None:
+        self.encoders = encoders
+        self.calls: list[list[str]] = []
+
+    def __call__(self, cmd):
+        self.calls.append(cmd)
+        flag = cmd[-1]
+        if flag == '-version':
+            return 'ffmpeg version 6.1.1-3ubuntu5 Copyright (c) 2000-2023 the FFmpeg developers\n'
+        if flag == '-encoders':
+            return self.encoders
+        return 'Hardware acceleration methods:\nvaapi\ncuda\n\n'
+
+
+def test_probe_capabilities_parses_and_reuses_disk_cache(tmp_path) -> None:
+    ffmpeg = tmp_path / 'ffmpeg'
+    ffmpeg.write_text('')
+    cache = tmp_path / 'cache' / 'caps.json'
+    runner = _Runner()
+    caps = ffmpeg_utils.probe_capabilities(str(ffmpeg), cache_file=cache, runner=runner)
+    assert caps.version == '6.1.1-3ubuntu5'
+    assert caps.encoders == {'aac', 'libopus', 'pcm_s16le'}
+    assert caps.hwaccels == ('vaapi', 'cuda')
+    assert len(runner.calls) == 3
+
+    assert ffmpeg_utils.probe_capabilities(str(ffmpeg), cache_file=cache, runner=runner) == caps
+    assert len(runner.calls) == 3
+
+    # Un binario actualizado (otro mtime) se vuelve a sondear.
+    stat = ffmpeg.stat()
+    os.utime(ffmpeg, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    ffmpeg_utils.probe_capabilities(str(ffmpeg), cache_file=cache, runner=runner)
+    assert len(runner.calls) == 6
+
+
+def test_failed_probe_is_not_cached(tmp_path) -> None:
+    ffmpeg = tmp_path / 'ffmpeg'
+    ffmpeg.write_text('')
+    cache = tmp_path / 'caps.json'
+    caps = ffmpeg_utils.probe_capabilities(str(ffmpeg), cache_file=cache, runner=lambda cmd: None)
+    assert caps.encoders is None and caps.has_encoder('libmp3lame')
+    assert not cache.exists()
+
+
+def test_check_audio_encoder_rejects_mp3_without_lame(caplog) -> None:
+    caps = ffmpeg_utils.FfmpegCapabilities('/usr/bin/ffmpeg', None, '6.1', frozenset({'aac'}))
+    with pytest.raises(ConfigError, match='libmp3lame'):
+        check_audio_encoder(DownloadConfig(audio_format='mp3'), caps)
+    # opus puede copiarse tal cual desde YouTube: solo avisa.
+    check_audio_encoder(DownloadConfig(audio_format='opus'), caps)
+    assert 'libopus' in caplog.text
+    check_audio_encoder(DownloadConfig(audio_format='m4a'), caps)
+    check_audio_encoder(DownloadConfig(mode='video'), caps)
+    check_audio_encoder(DownloadConfig(audio_format='mp3'), None)
+
+
+def test_ffmpeg_capabilities_probed_once_per_process(monkeypatch, tmp_path) -> None:
+    ffmpeg = tmp_path / 'ffmpeg'
+    ffmpeg.write_text('')
+    probes = []
+    monkeypatch.setattr(ffmpeg_utils, '_MEMO', {})
+    monkeypatch.setattr(
+        ffmpeg_utils, 'probe_capabilities',
+        lambda path: probes.append(path) or ffmpeg_utils.FfmpegCapabilities(path, None, None, None),
+    )
+    first = ffmpeg_capabilities(str(ffmpeg))
+    assert ffmpeg_capabilities(str(ffmpeg)) is first
+    assert probes == [str(ffmpeg)]
@@ -0,0 +1,37 @@
+from bajador_yt.journal import BatchJournal, is_finished
+from bajador_yt.models import DownloadResult
+
+
+def test_journal_roundtrip_last_result_wins(tmp_path) -> None:
+    journal = BatchJournal(tmp_path / 'j.jsonl', sync_every=2).open(resume=False)
+    journal.record(DownloadResult(url='a', status='error', message='', category='network'))
+    journal.record(DownloadResult(url='a', status='success', message='ok', output_path='a.mp3'))
+    journal.record(DownloadResult(url='b', status='cancelled', message=''))
+    journal.close()
+
+    loaded = BatchJournal(tmp_path / 'j.jsonl').load()
+    assert loaded['a'].status == 'success'
+    assert loaded['a'].output_path == 'a.mp3'
+    assert set(BatchJournal(tmp_path / 'j.jsonl').finished()) == {'a'}
+
+
+def test_journal_ignores_truncated_line(tmp_path) -> None:
+    path = tmp_path / 'j.jsonl'
+    path.write_text(
+        '{"url": "a", "status": "skipped", "message": ""}\n{"url": "b", "sta',
+        encoding='utf-8',
+    )
+    assert list(BatchJournal(path).load()) == ['a']
+
+
+def test_journal_open_without_resume_truncates(tmp_path) -> None:
+    path = tmp_path / 'j.jsonl'
+    path.write_text('{"url": "a", "status": "success", "message": ""}\n', encoding='utf-8')
+    BatchJournal(path).open(resume=False).close()
+    assert BatchJournal(path).load() == {}
+
+
+def test_is_finished_reschedules_retryable_errors() -> None:
+    assert is_finished(DownloadResult(url='x', status='error', message='', category='private'))
+    assert not is_finished(DownloadResult(url='x', status='error', message='', category='network'))
+    assert not is_finished(DownloadResult(url='x', status='cancelled', message=''))
@@ -0,0 +1,79 @@
+from bajador_yt.metacache import MetadataCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cache(tmp_path, clock, **kwargs) -> MetadataCache:
+    options = {'format_ttl': 100, 'info_ttl': 1000, 'max_bytes': 10**6}
+    options.update(kwargs)
+    return MetadataCache(tmp_path / 'cache', clock=clock, **options).load()
+
+
+def test_two_level_ttl(tmp_path) -> None:
+    clock = _Clock()
+    cache = _cache(tmp_path, clock)
+    cache.put('abc', {'id': 'abc', 'title': 'T', 'formats': [{'url': 'x'}], 'subtitles': {'es': []}})
+
+    assert cache.get('abc')['formats'] == [{'url': 'x'}]
+    assert 'subtitles' not in cache.get('abc')
+
+    clock.now += 500
+    assert cache.get('abc') is None
+    assert cache.get('abc', formats=False) == {'id': 'abc', 'title': 'T'}
+
+    clock.now += 1000
+    assert cache.get('abc', formats=False) is None
+    assert len(cache) == 0
+
+
+def test_survives_reload_from_disk(tmp_path) -> None:
+    clock = _Clock()
+    _cache(tmp_path, clock).put('abc', {'id': 'abc', 'title': 'T'})
+    assert _cache(tmp_path, clock).get('abc') == {'id': 'abc', 'title': 'T'}
+
+
+def test_lru_eviction_by_size(tmp_path) -> None:
+    clock = _Clock()
+    cache = _cache(tmp_path, clock, max_bytes=300)
+    blob = 'x' * 80
+    cache.put('a', {'id': 'a', 'blob': blob})
+    cache.put('b', {'id': 'b', 'blob': blob})
+    assert cache.get('a') is not None
+    cache.put('c', {'id': 'c', 'blob': blob})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert not (tmp_path / 'cache' / 'b.json').exists()
+
+
+def test_hits_return_independent_copies(tmp_path) -> None:
+    clock = _Clock()
+    info = {'id': 'abc', 'formats': [{'url': 'x'}]}
+    cache = _cache(tmp_path, clock)
+    cache.put('abc', info)
+    info['formats'].clear()
+
+    first = cache.get('abc')
+    first['formats'].append({'url': 'elegido'})
+    first['requested_downloads'] = [{'filepath': 'a.webm'}]
+    assert cache.get('abc') == {'id': 'abc', 'formats': [{'url': 'x'}]}
+
+    reloaded = _cache(tmp_path, clock)
+    reloaded.get('abc')['formats'].clear()
+    assert reloaded.get('abc')['formats'] == [{'url': 'x'}]
+
+
+def test_titles_include_expired_entries(tmp_path) -> None:
+    clock = _Clock()
+    cache = _cache(tmp_path, clock)
+    cache.put('abc', {'id': 'abc', 'title': 'T'})
+    cache.put('def', {'id': 'def'})
+    clock.now += 5000
+    assert _cache(tmp_path, clock).titles() == {'abc': 'T'}
@@ -0,0 +1,112 @@
+import socket
+import urllib.request
+
+import yt_dlp
+
+from bajador_yt import downloader as downloader_module
+from bajador_yt.config import DownloadConfig
+from bajador_yt.downloader import Downloader
+from bajador_yt.metrics import DownloaderMetrics, MetricsExporter
+from bajador_yt.models import DownloadResult
+
+
+def _samples(text):
+    return {
+        line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+        for line in text.splitlines()
+        if line and not line.startswith('#')
+    }
+
+
+def test_render_is_openmetrics_text() -> None:
+    now = [100.0]
+    metrics = DownloaderMetrics(clock=lambda: now[0])
+    metrics.observe(DownloadResult(url='a', status='success', message='', download_seconds=2.5))
+    metrics.observe(DownloadResult(url='b', status='error', message=''))
+    metrics.retry('network')
+    metrics.add_bytes(5000)
+    metrics.gauge('queue_depth', 'URLs en cola.', lambda: 7)
+
+    text = metrics.render()
+    samples = _samples(text)
+    assert text.endswith('# EOF\n')
+    assert '# TYPE bajador_results counter' in text
+    assert samples['bajador_results_total{status="success"}'] == 1
+    assert samples['bajador_results_total{status="error"}'] == 1
+    assert samples['bajador_retries_total{category="network"}'] == 1
+    assert samples['bajador_phase_seconds_total{phase="download"}'] == 2.5
+    assert samples['bajador_downloaded_bytes_total'] == 5000
+    assert samples['bajador_download_bytes_per_second'] == 500
+    assert samples['bajador_queue_depth'] == 7
+
+    now[0] += 60
+    assert metrics.bytes_per_second() == 0
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_exporter_serves_http_and_writes_file(tmp_path) -> None:
+    metrics = DownloaderMetrics()
+    metrics.observe(DownloadResult(url='a', status='skipped', message=''))
+    path = tmp_path / 'metrics.prom'
+    exporter = MetricsExporter(metrics, port=_free_port(), path=str(path), interval=60)
+    try:
+        url = f'http://127.0.0.1:{exporter.port}/metrics'
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('application/openmetrics-text')
+            assert b'bajador_results_total{status="skipped"} 1' in response.read()
+    finally:
+        exporter.close()
+    # Al cerrar queda escrito el valor final aunque no haya pasado el intervalo.
+    assert 'bajador_results_total{status="skipped"} 1' in path.read_text(encoding='utf-8')
+
+
+class _FlakyYoutubeDL:
+    failures = 1
+
+    def __init__(self, opts) -> None:
+        self.opts = opts
+
+    def extract_info(self, url, download=False):
+        if _FlakyYoutubeDL.failures:
+            _FlakyYoutubeDL.failures -= 1
+            raise yt_dlp.utils.DownloadError('HTTP Error 503: Service Unavailable')
+        return {'id': url[-11:], 'title': url[-11:], 'ext': 'webm'}
+
+    def prepare_filename(self, info):
+        return f"{self.opts['outtmpl'].split('%', 1)[0]}{info['title']}.{info['ext']}"
+
+    def process_ie_result(self, info, download=True):
+        for hook in self.opts['progress_hooks']:
+            hook({'status': 'downloading', 'filename': 'f', 'downloaded_bytes': 400})
+            hook({'status': 'finished', 'filename': 'f', 'downloaded_bytes': 1000})
+        return info
+
+    sanitize_info = staticmethod(yt_dlp.YoutubeDL.sanitize_info)
+
+    def close(self) -> None:
+        pass
+
+
+def test_downloader_feeds_metrics(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(downloader_module.yt_dlp, 'YoutubeDL', _FlakyYoutubeDL)
+    monkeypatch.setattr(_FlakyYoutubeDL, 'failures', 1)
+    cfg = DownloadConfig(
+        output_folder=str(tmp_path), skip_existing=False, retry_backoff=0.01,
+        metrics_file=str(tmp_path / 'metrics.prom'),
+    )
+    with Downloader(cfg) as downloader:
+        downloader.download_many(['https://youtu.be/video000001', 'https://vimeo.com/1'])
+        samples = _samples(downloader.metrics.render())
+
+    assert samples['bajador_results_total{status="success"}'] == 1
+    assert samples['bajador_results_total{status="invalid"}'] == 1
+    assert samples['bajador_retries_total{category="generic"}'] == 1
+    assert samples['bajador_downloaded_bytes_total'] == 1000
+    assert samples['bajador_downloads_in_flight'] == 0
+    assert samples['bajador_queue_depth'] == 0
+    assert 'bajador_results_total{status="success"} 1' in (tmp_path / 'metrics.prom').read_text()
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from bajador_yt.models import DownloadResult
+from bajador_yt.pipeline import Stage, StagedPipeline
+
+
+def _never_cancelled() -> bool:
+    return False
+
+
+def test_pipeline_runs_all_stages() -> None:
+    stages = [
+        Stage('a', lambda url, payload: payload + '|a', 2),
+        Stage('b', lambda url, payload: payload + '|b', 3),
+        Stage('c', lambda url, payload: DownloadResult(url=url, status='success', message=payload), 1),
+    ]
+    results = list(StagedPipeline(stages, cancelled=_never_cancelled).run(['u1', 'u2', 'u3']))
+    assert sorted(r.message for r in results) == ['u1|a|b', 'u2|a|b', 'u3|a|b']
+
+
+def test_pipeline_short_circuits_terminal_results() -> None:
+    seen_by_last: list[str] = []
+
+    def first(url, payload):
+        if url == 'skip':
+            return DownloadResult(url=url, status='skipped', message='')
+        return payload
+
+    def last(url, payload):
+        seen_by_last.append(url)
+        return DownloadResult(url=url, status='success', message='')
+
+    stages = [Stage('a', first, 1), Stage('b', last, 1)]
+    results = list(StagedPipeline(stages, cancelled=_never_cancelled).run(['ok', 'skip']))
+    assert {r.url: r.status for r in results} == {'ok': 'success', 'skip': 'skipped'}
+    assert seen_by_last == ['ok']
+
+
+def test_pipeline_stage_exception_becomes_error() -> None:
+    def boom(url, payload):
+        raise RuntimeError('Connection reset')
+
+    results = list(StagedPipeline([Stage('a', boom, 1)], cancelled=_never_cancelled).run(['x']))
+    assert results[0].status == 'error'
+    assert results[0].category == 'network'
+
+
+def test_pipeline_stages_overlap() -> None:
+    active = {'fetch': 0, 'post': 0}
+    overlap = threading.Event()
+    lock = threading.Lock()
+
+    def tracked(name, result=False):
+        def func(url, payload):
+            with lock:
+                active[name] += 1
+                if active['fetch'] and active['post']:
+                    overlap.set()
+            time.sleep(0.02)
+            with lock:
+                active[name] -= 1
+            return DownloadResult(url=url, status='success', message='') if result else payload
+        return func
+
+    stages = [Stage('fetch', tracked('fetch'), 2), Stage('post', tracked('post', True), 2)]
+    results = list(StagedPipeline(stages, cancelled=_never_cancelled).run([str(i) for i in range(10)]))
+    assert len(results) == 10
+    assert overlap.is_set()
+
+
+def test_pipeline_cancel_stops_reading_input() -> None:
+    cancel = threading.Event()
+    read = []
+
+    def source():
+        for i in range(10_000):
+            read.append(i)
+            yield str(i)
+
+    def work(url, payload):
+        cancel.set()
+        return DownloadResult(url=url, status='success', message='')
+
+    results = list(StagedPipeline([Stage('a', work, 1)], cancelled=cancel.is_set).run(source()))
+    # Una URL por cada una leída: las encoladas salen canceladas, el resto no se lee.
+    assert len(results) == len(read) < 100
+    assert sum(r.status == 'success' for r in results) == 1
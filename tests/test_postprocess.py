@@ -0,0 +1,26 @@
+import yt_dlp
+
+from bajador_yt import postprocess
+
+
+class _FailingYoutubeDL:
+    def __init__(self, opts) -> None:
+        self.opts = opts
+
+    def post_process(self, filename, info):
+        raise yt_dlp.utils.PostProcessingError('ffmpeg exited with code 1')
+
+
+def test_run_postprocessors_returns_error_instead_of_raising(monkeypatch) -> None:
+    monkeypatch.setattr(postprocess.yt_dlp, 'YoutubeDL', _FailingYoutubeDL)
+    monkeypatch.setattr(postprocess, '_WORKER_YDL', {})
+    outcome = postprocess.run_postprocessors({'quiet': True}, 'song.webm', {'id': 'x'})
+    assert outcome.info is None
+    assert outcome.error == 'Postprocessing: ffmpeg exited with code 1'
+    assert outcome.seconds >= 0
+
+
+def test_serializable_info_drops_live_objects() -> None:
+    info = postprocess.serializable_info({'id': 'x', 'hook': lambda: None})
+    assert info['id'] == 'x'
+    assert not callable(info.get('hook'))
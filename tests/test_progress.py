@@ -0,0 +1,27 @@
+from bajador_yt.progress import ProgressGate, byte_progress
+
+
+def test_gate_coalesces_per_key_and_always_passes_final() -> None:
+    now = [0.0]
+    gate = ProgressGate(0.5, clock=lambda: now[0])
+    assert gate.due('a')
+    assert not gate.due('a')
+    assert gate.due('b')
+    now[0] += 0.5
+    assert gate.due('a')
+    assert gate.due('a', final=True)
+    assert gate.due('a')
+
+
+def test_byte_progress_from_hook_status() -> None:
+    progress = byte_progress('u', {
+        'status': 'downloading', 'downloaded_bytes': 250, 'total_bytes_estimate': 1000.0,
+        'speed': 50.0, 'eta': 15, 'filename': 'x.webm',
+    })
+    assert (progress.downloaded, progress.total, progress.fraction) == (250, 1000, 0.25)
+    assert (progress.speed, progress.eta, progress.filename) == (50.0, 15, 'x.webm')
+    assert progress.worker
+
+    finished = byte_progress('u', {'status': 'finished', 'downloaded_bytes': 1000})
+    assert finished.total == 1000 and finished.fraction == 1.0
+    assert byte_progress('u', {'status': 'error'}) is None
@@ -0,0 +1,138 @@
+import http.cookiejar
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import yt_dlp
+
+from bajador_yt.config import DownloadConfig
+from bajador_yt.downloader import Downloader
+from bajador_yt.rangefetch import RangeNotSupported, RemoteFile, SizeMismatch, chunks, fetch_files
+
+_FILES = {'/video': bytes(range(256)) * 4000, '/audio': b'audio' * 50_000}
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    ranges = True
+
+    def do_GET(self) -> None:
+        body = _FILES[self.path]
+        self.server.requests.append((self.path, self.headers.get('Range')))
+        self.server.cookies.append(self.headers.get('Cookie'))
+        match = re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers.get('Range') or '')
+        if match and self.ranges:
+            start, end = map(int, match.groups())
+            body_part = body[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(body)}')
+        else:
+            body_part = body
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body_part)))
+        self.end_headers()
+        try:
+            self.wfile.write(body_part)
+        except ConnectionError:
+            pass  # el cliente corta al recibir un 200
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class _NoRangeHandler(_RangeHandler):
+    ranges = False
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(handler=_RangeHandler):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.requests = []
+        server.cookies = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, 'http://127.0.0.1:%d' % server.server_address[1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_chunks_cover_the_file() -> None:
+    assert chunks(25, 10) == [(0, 9), (10, 19), (20, 24)]
+    assert chunks(0, 10) == []
+
+
+def test_fetch_files_downloads_streams_together_in_ranges(tmp_path, serve) -> None:
+    _, base = serve()
+    files = [RemoteFile(f'{base}/video', str(tmp_path / 'v.mp4')), RemoteFile(f'{base}/audio', str(tmp_path / 'a.m4a'))]
+    seen: dict[str, list[int]] = {}
+    threads = set()
+
+    def progress(remote, done, total):
+        seen.setdefault(remote.path, []).append(done)
+
+    sizes = fetch_files(files, connections=3, progress=progress, chunk_size=100_000,
+                        initializer=lambda: threads.add(threading.current_thread().name))
+
+    assert sizes == [len(_FILES['/video']), len(_FILES['/audio'])]
+    assert (tmp_path / 'v.mp4').read_bytes() == _FILES['/video']
+    assert (tmp_path / 'a.m4a').read_bytes() == _FILES['/audio']
+    assert sorted(os.listdir(tmp_path)) == ['a.m4a', 'v.mp4']
+    for remote, size in zip(files, sizes):
+        assert seen[remote.path] == sorted(seen[remote.path]) and seen[remote.path][-1] == size
+    assert len(threads) == 6
+
+
+def test_server_without_range_support_leaves_nothing(tmp_path, serve) -> None:
+    _, base = serve(_NoRangeHandler)
+    with pytest.raises(RangeNotSupported):
+        fetch_files([RemoteFile(f'{base}/video', str(tmp_path / 'v.mp4'))], connections=2)
+    assert os.listdir(tmp_path) == []
+
+
+def test_prefetched_streams_land_where_yt_dlp_looks(tmp_path, serve) -> None:
+    server, base = serve()
+    cfg = DownloadConfig(output_folder=str(tmp_path), mode='video', connections_per_file=2, concurrent_streams=True,
+                         skip_existing=False)
+    info = {
+        'id': 'video000001', 'title': 'Prueba', 'extractor': 'youtube', 'extractor_key': 'Youtube',
+        'webpage_url': 'https://www.youtube.com/watch?v=video000001',
+        'formats': [
+            {'format_id': '137', 'url': f'{base}/video', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'none',
+             'protocol': 'http', 'filesize': len(_FILES['/video'])},
+            {'format_id': '140', 'url': f'{base}/audio', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a',
+             'protocol': 'http'},
+        ],
+    }
+    with Downloader(cfg) as downloader:
+        # Sin ffmpeg yt-dlp no fusiona, pero con ignoreerrors baja cada formato por separado.
+        ydl = yt_dlp.YoutubeDL({**downloader._build_ydl_opts(), 'ignoreerrors': True})
+        ydl.cookiejar.set_cookie(http.cookiejar.Cookie(
+            0, 'SID', 'secreto', None, False, '127.0.0.1', False, False, '/', True, False,
+            None, False, None, None, {},
+        ))
+        downloader._prefetch(ydl, 'https://youtu.be/video000001', info)
+        assert sorted(os.listdir(tmp_path)) == ['Prueba [video000001].f137.mp4', 'Prueba [video000001].f140.m4a']
+        fetched = len(server.requests)
+        # Con `filesize` no hace falta sondear el video; el audio sí se sondea.
+        assert ('/video', 'bytes=0-0') not in server.requests
+        assert ('/audio', 'bytes=0-0') in server.requests
+        assert set(server.cookies) == {'SID=secreto'}
+        ydl.process_ie_result(info, download=True)
+
+    assert len(server.requests) == fetched
+    assert downloader.metrics._bytes == len(_FILES['/video']) + len(_FILES['/audio'])
+
+
+def test_wrong_known_size_is_rejected(tmp_path, serve) -> None:
+    _, base = serve()
+    remote = RemoteFile(f'{base}/audio', str(tmp_path / 'a.m4a'), size=len(_FILES['/audio']) - 1)
+    with pytest.raises(SizeMismatch):
+        fetch_files([remote], connections=2, chunk_size=100_000)
+    assert os.listdir(tmp_path) == []
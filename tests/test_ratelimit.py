@@ -0,0 +1,51 @@
+import pytest
+
+from bajador_yt.ratelimit import AdaptiveRateLimiter, TokenBucket
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_spaces_requests() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(2.0, capacity=1.0, clock=clock)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now = 1.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_token_bucket_allows_debt_for_large_chunks() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(1000, clock=clock)
+    assert bucket.reserve(3000) == pytest.approx(2.0)
+
+
+def test_adaptive_limiter_backs_off_once_per_burst_and_recovers() -> None:
+    clock = _Clock()
+    limiter = AdaptiveRateLimiter(4.0, recover_after=2, cooldown=1.0, clock=clock)
+    limiter.record('forbidden')
+    limiter.record('forbidden')
+    assert limiter.rate == pytest.approx(2.0)
+
+    clock.now = 5.0
+    for _ in range(5):
+        limiter.record('forbidden')
+        clock.now += 1.0
+    assert limiter.rate == pytest.approx(limiter.floor)
+
+    for _ in range(100):
+        limiter.record(None)
+    assert limiter.rate == pytest.approx(4.0)
+
+
+def test_adaptive_limiter_ignores_other_errors() -> None:
+    limiter = AdaptiveRateLimiter(4.0, clock=_Clock())
+    limiter.record('network')
+    assert limiter.rate == 4.0
@@ -0,0 +1,24 @@
+from bajador_yt.retryqueue import Retry, RetryQueue
+
+
+def test_pop_due_orders_by_due_time_and_respects_limit() -> None:
+    now = [0.0]
+    queue = RetryQueue(clock=lambda: now[0])
+    queue.push('b', 2, 5.0)
+    queue.push('a', 3, 1.0)
+    queue.push('c', 2, 1.0)
+    assert queue.next_due_in() == 1.0
+    assert queue.pop_due(10) == []
+
+    now[0] = 2.0
+    assert queue.pop_due(1) == [Retry('a', 3, 2.0)]
+    assert queue.pop_due(10) == [Retry('c', 2, 2.0)]
+    assert queue.next_due_in() == 3.0
+    assert len(queue) == 1
+
+
+def test_drain_empties_regardless_of_due_time() -> None:
+    queue = RetryQueue(clock=lambda: 0.0)
+    queue.push('x', 2, 100.0)
+    assert [r.url for r in queue.drain()] == ['x']
+    assert not queue and queue.next_due_in() is None
@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from bajador_yt.config import DownloadConfig
+from bajador_yt.server import DownloadService, make_server
+
+
+@pytest.fixture
+def service(tmp_path):
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, parallel_downloads=2)
+    service = DownloadService(cfg)
+    yield service
+    service.close()
+
+
+def _urls(prefix, n):
+    return [f'https://youtu.be/{prefix}{i:06d}' for i in range(n)]
+
+
+def test_jobs_share_workers_and_global_concurrency(service, fake_download_one) -> None:
+    service._downloader.download_one = fake_download_one
+
+    first = service.submit(_urls('aaaaa', 10) + _urls('aaaaa', 3))
+    second = service.submit(_urls('bbbbb', 10))
+
+    assert [r.status for r in first.follow(5)] == ['success'] * 10
+    assert len(list(second.follow(5))) == 10
+    assert first.summary()['state'] == 'finished'
+    assert 1 <= fake_download_one.peak <= 2
+    assert service._downloader._ydl_pool.created == 0
+
+
+def test_cancel_skips_queued_urls(service, fake_download_one) -> None:
+    release = fake_download_one.release = threading.Event()
+    service._downloader.download_one = fake_download_one
+
+    job = service.submit(_urls('ccccc', 8))
+    while service.status()['active'] < 2:
+        pass
+    service.cancel(job.id)
+    release.set()
+
+    statuses = [r.status for r in job.follow(5)]
+    assert statuses.count('success') == 2
+    assert statuses.count('cancelled') == 6
+    assert job.summary()['state'] == 'cancelled'
+
+
+def test_breaker_abort_cancels_queued_urls_until_next_job(service, flaky_ydl) -> None:
+    flaky_ydl.error = 'No supported JavaScript runtime could be found'
+    job = service.submit(_urls('eeeee', 10))
+    results = list(job.follow(5))
+
+    statuses = [r.status for r in results]
+    # Solo llegan a la red los fallos que abortan (y, como mucho, el que
+    # ya estaba en curso en el otro worker); el resto no se intenta.
+    assert len(flaky_ydl.calls) <= 4
+    assert statuses.count('error') == len(flaky_ydl.calls)
+    assert statuses.count('cancelled') == 10 - len(flaky_ydl.calls)
+    assert all(r.message.startswith('Lote abortado:') for r in results if r.status == 'cancelled')
+
+    while service._downloader._open_batches:
+        time.sleep(0.01)
+    # Entorno arreglado: el siguiente trabajo vuelve a probar.
+    flaky_ydl.error = None
+    assert [r.status for r in service.submit(_urls('fffff', 2)).follow(5)] == ['success'] * 2
+
+
+def test_breaker_pause_holds_workers(tmp_path, flaky_ydl) -> None:
+    flaky_ydl.errors = ['HTTP Error 403: Forbidden'] * 2
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, max_retries=1,
+                         parallel_downloads=1, breaker_window=4, breaker_cooldown=0.3)
+    with DownloadService(cfg) as service:
+        results = list(service.submit(_urls('ggggg', 5)).follow(5))
+
+    assert [r.status for r in results] == ['error'] * 2 + ['success'] * 3
+    # Con el circuito abierto no se envió nada hasta que pasó la pausa.
+    assert len(flaky_ydl.calls) == 5
+    assert flaky_ydl.calls[2][1] - flaky_ydl.calls[1][1] >= 0.25
+
+
+def test_retry_backoff_does_not_hold_a_worker(tmp_path, flaky_ydl) -> None:
+    flaky_ydl.errors = ['HTTP Error 503: Service Unavailable'] * 2
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False,
+                         parallel_downloads=1, retry_backoff=0.2)
+    with DownloadService(cfg) as service:
+        results = list(service.submit(_urls('hhhhh', 2)).follow(5))
+
+    # El único worker atiende la segunda URL mientras la primera espera su reintento.
+    assert [call[0] for call in flaky_ydl.calls[:2]] == ['hhhhh000000', 'hhhhh000001']
+    assert len(flaky_ydl.calls) == 4
+    assert [r.status for r in results] == ['success'] * 2
+    assert all(r.attempts == 2 and r.wait_seconds for r in results)
+
+
+def test_playlist_tags_do_not_outlive_their_job(tmp_path, monkeypatch, fake_download_one) -> None:
+    cfg = DownloadConfig(output_folder=str(tmp_path), skip_existing=False, allow_playlist=True)
+    entries = [f'https://www.youtube.com/watch?v=video{i:06d}' for i in range(3)]
+    with DownloadService(cfg) as service:
+        service._downloader.download_one = fake_download_one
+        monkeypatch.setattr(service._downloader, '_flat_entries', lambda url, known=frozenset(): ('PLtest', entries, 0))
+        first = list(service.submit(['https://www.youtube.com/playlist?list=PLtest']).follow(5))
+        # Trabajo suelto posterior con una URL que antes vino de la playlist.
+        second = list(service.submit(entries[:1]).follow(5))
+
+    assert {r.playlist_id for r in first} == {'PLtest'}
+    assert [r.playlist_id for r in second] == [None]
+
+
+def test_http_api_submits_streams_and_reports_status(service, fake_download_one) -> None:
+    service._downloader.download_one = fake_download_one
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = 'http://127.0.0.1:%d' % server.server_address[1]
+    try:
+        request = urllib.request.Request(
+            f'{base}/jobs',
+            data=json.dumps({'urls': _urls('ddddd', 5) + _urls('ddddd', 1)}).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.status == 202
+            job_id = json.load(response)['id']
+
+        with urllib.request.urlopen(f'{base}/jobs/{job_id}/results', timeout=5) as response:
+            lines = [json.loads(line) for line in response]
+        assert sorted(r['status'] for r in lines) == ['success'] * 5
+
+        with urllib.request.urlopen(f'{base}/status', timeout=5) as response:
+            status = json.load(response)
+        assert status == {'workers': 2, 'active': 0, 'queued': 0, 'jobs': {'running': 0, 'finished': 1}}
+
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            urllib.request.urlopen(f'{base}/jobs/missing', timeout=5)
+        assert exc.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,41 @@
+"""Presupuesto de arranque del CLI: `--validate-only` no debe cargar yt-dlp ni tqdm."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+CLI = Path(__file__).resolve().parents[1] / 'bajador-yt.py'
+HEAVY = ('yt_dlp', 'tqdm')
+# Import acumulado de bajador_yt en el camino --validate-only, en µs. Holgado
+# para máquinas lentas de CI; con yt-dlp cargado se pasa de largo.
+BUDGET_US = 80_000
+
+
+def _importtime(*args: str) -> list[tuple[str, int, bool]]:
+    """(módulo, µs acumulados, es de nivel superior) según `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(CLI), *args],
+        capture_output=True, text=True, timeout=60, check=False,
+    )
+    assert proc.returncode == 0, proc.stderr
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        entries.append((name.strip(), int(cumulative), not name[1:].startswith(' ')))
+    return entries
+
+
+def test_validate_only_skips_heavy_imports() -> None:
+    modules = {name for name, _, _ in _importtime(
+        '--validate-only', '--urls', 'https://youtu.be/dQw4w9WgXcQ',
+    )}
+    assert not {m for m in modules if m.split('.')[0] in HEAVY}
+    assert 'bajador_yt.downloader' not in modules
+
+
+def test_validate_only_import_budget() -> None:
+    entries = _importtime('--validate-only', '--urls', 'https://youtu.be/dQw4w9WgXcQ')
+    own = sum(us for name, us, top in entries if top and name.split('.')[0] == 'bajador_yt')
+    assert own < BUDGET_US, f'Import de bajador_yt: {own / 1000:.1f} ms'
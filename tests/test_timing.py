@@ -0,0 +1,58 @@
+import pytest
+
+from bajador_yt.models import DownloadResult
+from bajador_yt.timing import UrlTimer, format_performance, percentile, summarize_performance
+
+
+def test_percentile_nearest_rank() -> None:
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7.0], 90) == 7.0
+    with pytest.raises(ValueError):
+        percentile([], 50)
+
+
+def test_url_timer_phases_and_fields() -> None:
+    now = [0.0]
+    timer = UrlTimer(clock=lambda: now[0])
+    with timer.phase('resolve'):
+        now[0] += 2
+    timer.start('postprocess')
+    timer.start('postprocess')  # anidado: no reinicia la marca
+    now[0] += 3
+    timer.stop('postprocess')
+    timer.stop('postprocess')
+    timer.attempt(2)
+    timer.attempt(1)
+    timer.add_bytes(10)
+
+    assert timer.fields() == {
+        'resolve_seconds': 2,
+        'download_seconds': None,
+        'postprocess_seconds': 3,
+        'wait_seconds': None,
+        'bytes_downloaded': 10,
+        'attempts': 2,
+    }
+
+
+def test_summarize_performance_percentiles() -> None:
+    results = [
+        DownloadResult(
+            url=str(i), status='success', message='', attempts=1 + (i == 9),
+            resolve_seconds=float(i + 1), download_seconds=2.0, bytes_downloaded=2048 * (i + 1),
+        )
+        for i in range(10)
+    ]
+    results.append(DownloadResult(url='x', status='skipped', message=''))
+
+    summary = summarize_performance(results)
+    assert summary['count'] == 10
+    assert summary['retries'] == 1
+    assert summary['bytes'] == 2048 * 55
+    assert summary['phases']['resolve'] == {'p50': 5.0, 'p90': 9.0, 'p99': 10.0, 'max': 10.0, 'total': 55.0}
+    assert set(summary['phases']) == {'resolve', 'download'}
+    assert summary['throughput']['p50'] == 5120
+    assert format_performance(summary)[0].startswith('Rendimiento — 10 URLs, 110.0 KiB')
+    assert format_performance(summarize_performance([])) == []
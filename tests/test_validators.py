@@ -1,6 +1,10 @@
 import pytest
 
 from bajador_yt.validators import (
+    canonical_youtube_url,
+    dedupe_urls,
+    extract_playlist_id,
+    extract_video_id,
     is_supported_audio_format,
     is_supported_mode,
     is_supported_quality,
@@ -40,6 +44,60 @@ def test_invalid_urls(url) -> None:
     assert not is_valid_youtube_url(url or '')
 
 
+@pytest.mark.parametrize(
+    'url',
+    [
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+        'https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=30',
+        'https://youtu.be/dQw4w9WgXcQ?si=xyz',
+        'https://www.youtube.com/shorts/dQw4w9WgXcQ',
+        'https://www.youtube.com/embed/dQw4w9WgXcQ',
+    ],
+)
+def test_extract_video_id(url: str) -> None:
+    assert extract_video_id(url) == 'dQw4w9WgXcQ'
+
+
+@pytest.mark.parametrize(
+    'url',
+    [
+        'https://www.youtube.com/playlist?list=PL123',
+        'https://www.youtube.com/watch?v=short',
+        'https://vimeo.com/watch?v=dQw4w9WgXcQ',
+        '',
+    ],
+)
+def test_extract_video_id_none(url: str) -> None:
+    assert extract_video_id(url) is None
+
+
+def test_extract_playlist_id() -> None:
+    assert extract_playlist_id('https://www.youtube.com/playlist?list=PLabc_123') == 'PLabc_123'
+    assert extract_playlist_id('https://youtube.com/watch?v=dQw4w9WgXcQ&list=PLx1') == 'PLx1'
+    assert extract_playlist_id('https://youtu.be/dQw4w9WgXcQ') is None
+
+
+def test_canonical_url_video_vs_playlist() -> None:
+    mixed = 'https://youtube.com/watch?v=dQw4w9WgXcQ&list=PLx1'
+    assert canonical_youtube_url(mixed) == 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+    assert canonical_youtube_url(mixed, allow_playlist=True) == 'https://www.youtube.com/playlist?list=PLx1'
+    assert canonical_youtube_url('https://www.youtube.com/@canal') is None
+
+
+def test_dedupe_urls_collapses_variants() -> None:
+    unique, duplicates = dedupe_urls([
+        'https://youtu.be/dQw4w9WgXcQ',
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30',
+        'https://m.youtube.com/watch?v=dQw4w9WgXcQ',
+        'https://www.youtube.com/shorts/dQw4w9WgXcQ',
+        '',
+        'no-es-url',
+        'no-es-url',
+    ])
+    assert unique == ['https://www.youtube.com/watch?v=dQw4w9WgXcQ', 'no-es-url']
+    assert duplicates == 4
+
+
 def test_supported_sets() -> None:
     assert is_supported_mode('audio')
     assert is_supported_mode('video')